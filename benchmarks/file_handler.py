@@ -0,0 +1,97 @@
+"""
+File handler benchmark.
+
+Compares the throughput of the JsonLinesFileHandler with the stdlib RotatingFileHandler, both writing JsonLogFormatter
+output to a temporary directory with the same rotation size.
+
+Usage:
+    python -m benchmarks.file_handler --records 100000
+"""
+
+import argparse
+import logging
+import sys
+import tempfile
+import time
+from dataclasses import asdict, dataclass
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+from typing import Callable, Optional
+from uuid import uuid4
+
+from dans_log_formatter.formatter import JsonLogFormatter
+from dans_log_formatter.handlers.file import JsonLinesFileHandler
+
+DEFAULT_RECORDS = 100_000
+MAX_BYTES = 10 * 1024 * 1024
+BACKUP_COUNT = 3
+
+HandlerFactory = Callable[[Path], logging.Handler]
+
+
+@dataclass
+class FileHandlerResult:
+    records: int
+    ns_per_record: float
+    records_per_second: float
+    bytes_written: int
+
+
+HANDLERS: dict[str, HandlerFactory] = {
+    "stdlib": lambda path: RotatingFileHandler(path, maxBytes=MAX_BYTES, backupCount=BACKUP_COUNT),
+    "jsonlines": lambda path: JsonLinesFileHandler(path, max_bytes=MAX_BYTES, backup_count=BACKUP_COUNT),
+}
+
+
+def run_file_benchmark(handler_factory: HandlerFactory, records: int, directory: Path) -> FileHandlerResult:
+    path = directory / f"{uuid4()}.jsonl"
+    handler = handler_factory(path)
+    handler.setFormatter(JsonLogFormatter())
+    logger = logging.getLogger(f"benchmark.{uuid4()}")
+    logger.propagate = False
+    logger.setLevel(logging.DEBUG)
+    logger.addHandler(handler)
+    try:
+        start = time.perf_counter_ns()
+        for index in range(records):
+            logger.info("hello world! %d", index)
+        handler.close()  # Includes writing the buffered records
+        elapsed = time.perf_counter_ns() - start
+    finally:
+        logger.removeHandler(handler)
+        handler.close()
+
+    return FileHandlerResult(
+        records=records,
+        ns_per_record=elapsed / records,
+        records_per_second=records / (elapsed / 1_000_000_000),
+        bytes_written=sum(file.stat().st_size for file in directory.glob(f"{path.name}*")),
+    )
+
+
+def run_file_benchmarks(records: int = DEFAULT_RECORDS, handlers: Optional[list[str]] = None) -> dict:
+    with tempfile.TemporaryDirectory() as directory:
+        return {
+            name: asdict(run_file_benchmark(HANDLERS[name], records, Path(directory)))
+            for name in handlers or list(HANDLERS)
+        }
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--records", type=int, default=DEFAULT_RECORDS, help="Records per benchmark")
+    parser.add_argument("--handler", action="append", choices=list(HANDLERS), help="Handlers to run")
+    args = parser.parse_args(argv)
+
+    for name, result in run_file_benchmarks(args.records, args.handler).items():
+        print(  # noqa T201
+            f"{name:<12} {result['ns_per_record']:>10,.0f} ns/record"
+            f" {result['records_per_second']:>12,.0f} records/s"
+            f" {result['bytes_written']:>14,} B"
+        )
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,326 @@
+"""
+Formatter benchmark suite.
+
+Runs every formatter against production-like scenarios, and reports the time per record, the peak memory traced
+while formatting a record (above the memory in use before), and the peak memory of the whole scenario.
+
+Usage:
+    python -m benchmarks.suite --output results.json
+    python -m benchmarks.suite --output results.json --compare baseline.json --threshold 0.1
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import platform
+import sys
+import threading
+import time
+import tracemalloc
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Callable, Optional
+from uuid import uuid4
+
+from dans_log_formatter.formatter import DEFAULT_MESSAGE_SIZE_LIMIT, JsonLogFormatter, TextLogFormatter
+from dans_log_formatter.providers.abstract import AbstractProvider
+from dans_log_formatter.providers.context import ContextProvider, inject_log_context
+from dans_log_formatter.providers.extra import ExtraProvider
+from dans_log_formatter.providers.runtime import RuntimeProvider
+
+DEFAULT_RECORDS = 10_000
+DEFAULT_THRESHOLD = 0.1
+THREADS = 8
+TASKS = 8
+TRACEBACK_DEPTH = 50
+PEAK_MEMORY_RECORDS = 1_000
+
+FormatterFactory = Callable[[list[AbstractProvider]], logging.Formatter]
+# Emit about the given number of records, returning how many were emitted
+Emit = Callable[[logging.Logger, int], int]
+
+
+@dataclass
+class BenchmarkResult:
+    records: int
+    ns_per_record: float
+    peak_bytes_per_record: float
+    peak_memory_bytes: int
+
+
+@dataclass
+class Scenario:
+    providers: Callable[[], list[AbstractProvider]]
+    emit: Emit
+
+
+class NullStream:
+    def write(self, data: str) -> int:
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+
+def _text_formatter(providers: list[AbstractProvider]) -> logging.Formatter:
+    return TextLogFormatter("{timestamp} {status} {location} | {message}", style="{", providers=providers)
+
+
+def _orjson_formatter(providers: list[AbstractProvider]) -> logging.Formatter:
+    from dans_log_formatter.contrib.orjson import OrJsonLogFormatter
+
+    return OrJsonLogFormatter(providers)
+
+
+def _ujson_formatter(providers: list[AbstractProvider]) -> logging.Formatter:
+    from dans_log_formatter.contrib.ujson import UJsonLogFormatter
+
+    return UJsonLogFormatter(providers)
+
+
+FORMATTERS: dict[str, FormatterFactory] = {
+    "text": _text_formatter,
+    "json": JsonLogFormatter,
+    "orjson": _orjson_formatter,
+    "ujson": _ujson_formatter,
+}
+
+
+def _all_providers() -> list[AbstractProvider]:
+    return [ContextProvider(), ExtraProvider(), RuntimeProvider()]
+
+
+def _emit_simple(logger: logging.Logger, count: int) -> int:
+    for index in range(count):
+        logger.info("hello world! %d", index)
+    return count
+
+
+def _emit_with_context(logger: logging.Logger, count: int) -> int:
+    with inject_log_context({"request_id": str(uuid4()), "user_id": 123}):
+        for index in range(count):
+            logger.info("hello world! %d", index, extra={"attempt": index})
+    return count
+
+
+LARGE_EXTRA = {
+    f"key_{index}": {"value": index, "tags": ["a", "b", "c"], "name": f"name-{index}"} for index in range(50)
+}
+
+
+def _emit_large_extra(logger: logging.Logger, count: int) -> int:
+    for _ in range(count):
+        logger.info("hello world!", extra=LARGE_EXTRA)
+    return count
+
+
+def _recurse(depth: int) -> None:
+    if depth == 0:
+        raise ValueError("Something went wrong")
+    _recurse(depth - 1)
+
+
+def _emit_deep_exception(logger: logging.Logger, count: int) -> int:
+    try:
+        _recurse(TRACEBACK_DEPTH)
+    except ValueError:
+        for _ in range(count):
+            logger.exception("hello world!")
+    return count
+
+
+OVERSIZED_MESSAGE = "*" * (DEFAULT_MESSAGE_SIZE_LIMIT * 2)
+
+
+def _emit_oversized_message(logger: logging.Logger, count: int) -> int:
+    for _ in range(count):
+        logger.info(OVERSIZED_MESSAGE)
+    return count
+
+
+def _emit_threads(logger: logging.Logger, count: int) -> int:
+    per_thread = -(-count // THREADS)
+    threads = [
+        threading.Thread(target=_emit_with_context, args=(logger, per_thread), name=f"emitter-{index}")
+        for index in range(THREADS)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return per_thread * THREADS
+
+
+def _emit_tasks(logger: logging.Logger, count: int) -> int:
+    per_task = -(-count // TASKS)
+
+    async def emitter() -> None:
+        with inject_log_context({"request_id": str(uuid4()), "user_id": 123}):
+            for index in range(per_task):
+                logger.info("hello world! %d", index, extra={"attempt": index})
+                await asyncio.sleep(0)
+
+    async def main() -> None:
+        await asyncio.gather(*(emitter() for _ in range(TASKS)))
+
+    asyncio.run(main())
+    return per_task * TASKS
+
+
+SCENARIOS: dict[str, Scenario] = {
+    "no_providers": Scenario(list, _emit_simple),
+    "all_providers": Scenario(_all_providers, _emit_with_context),
+    "large_extra": Scenario(_all_providers, _emit_large_extra),
+    "deep_exception": Scenario(_all_providers, _emit_deep_exception),
+    "oversized_message": Scenario(_all_providers, _emit_oversized_message),
+    "threads": Scenario(_all_providers, _emit_threads),
+    "asyncio": Scenario(_all_providers, _emit_tasks),
+}
+
+
+class MemoryTracingHandler(logging.StreamHandler):
+    """
+    Measure the peak memory of every format() call while `trace_records` is set (with tracemalloc tracing), above
+    the memory in use before the call. Only the formatting is measured, not the scenario's setup (threads, event
+    loop, etc.) nor the logging call. format() runs with the handler's lock held, so the records of concurrent
+    threads are measured one at a time.
+    """
+
+    def __init__(self, stream: NullStream):
+        super().__init__(stream)
+        self.trace_records = False
+        self.traced_records = 0
+        self.traced_peak_bytes = 0
+
+    def format(self, record: logging.LogRecord) -> str:
+        if not self.trace_records:
+            return super().format(record)
+
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        text = super().format(record)
+        self.traced_peak_bytes += tracemalloc.get_traced_memory()[1] - current
+        self.traced_records += 1
+        return text
+
+
+@contextmanager
+def _logger(formatter: logging.Formatter) -> Iterator[tuple[logging.Logger, MemoryTracingHandler]]:
+    logger = logging.getLogger(f"benchmark.{uuid4()}")
+    logger.propagate = False
+    logger.setLevel(logging.DEBUG)
+    handler = MemoryTracingHandler(NullStream())
+    handler.setFormatter(formatter)
+    logger.addHandler(handler)
+    try:
+        yield logger, handler
+    finally:
+        logger.removeHandler(handler)
+
+
+def run_benchmark(formatter: logging.Formatter, scenario: Scenario, records: int) -> BenchmarkResult:
+    with _logger(formatter) as (logger, handler):
+        scenario.emit(logger, min(records, 100))  # Warm up caches
+
+        start = time.perf_counter_ns()
+        emitted = scenario.emit(logger, records)  # The threads and asyncio scenarios round up to a multiple
+        elapsed = time.perf_counter_ns() - start
+
+        # Memory is measured separately, as tracing slows down the timed run
+        tracemalloc.start()
+        try:
+            handler.trace_records = True
+            scenario.emit(logger, max(records // 100, 1))
+            handler.trace_records = False
+            peak_per_record = handler.traced_peak_bytes / handler.traced_records
+
+            tracemalloc.reset_peak()
+            scenario.emit(logger, min(records, PEAK_MEMORY_RECORDS))
+            peak_memory = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    return BenchmarkResult(
+        records=emitted,
+        ns_per_record=elapsed / emitted,
+        peak_bytes_per_record=peak_per_record,
+        peak_memory_bytes=peak_memory,
+    )
+
+
+def run_suite(
+    records: int = DEFAULT_RECORDS,
+    formatters: Optional[list[str]] = None,
+    scenarios: Optional[list[str]] = None,
+) -> dict:
+    results = {}
+    for formatter_name in formatters or list(FORMATTERS):
+        for scenario_name in scenarios or list(SCENARIOS):
+            scenario = SCENARIOS[scenario_name]
+            try:
+                formatter = FORMATTERS[formatter_name](scenario.providers())
+            except ImportError:
+                continue  # Optional serializer is not installed
+
+            results[f"{formatter_name}/{scenario_name}"] = asdict(run_benchmark(formatter, scenario, records))
+
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+
+
+def compare(results: dict, baseline: dict, threshold: float = DEFAULT_THRESHOLD) -> list[str]:
+    """Describe the benchmarks whose time per record regressed by more than the threshold (0.1 = 10%)."""
+    regressions = []
+    for name, result in results["results"].items():
+        if (baseline_result := baseline["results"].get(name)) is None:
+            continue
+
+        ratio = result["ns_per_record"] / baseline_result["ns_per_record"]
+        if ratio > 1 + threshold:
+            regressions.append(
+                f"{name}: {result['ns_per_record']:,.0f} ns/record "
+                f"(baseline {baseline_result['ns_per_record']:,.0f} ns/record, +{ratio - 1:.0%})"
+            )
+
+    return regressions
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--records", type=int, default=DEFAULT_RECORDS, help="Records per benchmark")
+    parser.add_argument("--formatter", action="append", choices=list(FORMATTERS), help="Formatters to run")
+    parser.add_argument("--scenario", action="append", choices=list(SCENARIOS), help="Scenarios to run")
+    parser.add_argument("--output", type=Path, help="Save the results as JSON")
+    parser.add_argument("--compare", type=Path, help="Compare against the JSON results of a previous run")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="Allowed slowdown ratio")
+    args = parser.parse_args(argv)
+
+    results = run_suite(args.records, args.formatter, args.scenario)
+    for name, result in results["results"].items():
+        print(  # noqa T201
+            f"{name:<30} {result['ns_per_record']:>12,.0f} ns/record"
+            f" {result['peak_bytes_per_record']:>12,.0f} B/record"
+            f" {result['peak_memory_bytes']:>14,} B peak"
+        )
+
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2))
+
+    if args.compare:
+        regressions = compare(results, json.loads(args.compare.read_text()), args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)  # noqa T201
+        return 1 if regressions else 0
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,24 @@
+from typing import TypeVar
+
+K = TypeVar("K")
+V = TypeVar("V")
+
+
+class BoundedDict(dict[K, V]):
+    """
+    A dict holding up to `limit` keys, cleared when a new key would exceed it.
+    Used by the caches keyed by values that are usually bounded (call sites, logger names and levels), so only dynamic
+    code (e.g. loggers named per request, or code generated with exec()) ever fills one. Starting over is cheaper than
+    tracking the usage of every key, and keeps the lookups of the hot path plain dict lookups.
+    """
+
+    __slots__ = ("limit",)
+
+    def __init__(self, limit: int):
+        super().__init__()
+        self.limit = limit
+
+    def __setitem__(self, key: K, value: V) -> None:
+        if len(self) >= self.limit and key not in self:
+            self.clear()
+        super().__setitem__(key, value)
@@ -0,0 +1,73 @@
+import reprlib
+from collections import deque
+from collections.abc import Mapping
+from logging import LogRecord
+from typing import Any
+
+# Containers are rendered with reprlib, so large ones never have their full repr built
+_CONTAINER_TYPES = (list, tuple, dict, set, frozenset, deque)
+_CONTAINER_ITEMS_LIMIT = 100
+
+
+class _Rendered(str):
+    """An argument already rendered, formatted as is by both %s and %r."""
+
+    def __repr__(self) -> str:
+        return str(self)
+
+
+def _get_repr(limit: int) -> reprlib.Repr:
+    bounded_repr = reprlib.Repr()
+    bounded_repr.maxstring = bounded_repr.maxother = max(limit, 10)
+    bounded_repr.maxlong = max(limit, 40)
+    bounded_repr.maxlist = bounded_repr.maxtuple = bounded_repr.maxdict = _CONTAINER_ITEMS_LIMIT
+    bounded_repr.maxset = bounded_repr.maxfrozenset = bounded_repr.maxdeque = _CONTAINER_ITEMS_LIMIT
+    return bounded_repr
+
+
+def cap_argument(value: Any, limit: int) -> tuple[Any, int, int]:
+    """
+    Cap a message argument to limit characters, returning it with its capped length (0 if unknown), and the number of
+    characters left out.
+    """
+    if isinstance(value, (str, bytes, bytearray)):
+        if len(value) > limit:
+            return value[:limit], limit, len(value) - limit
+        return value, len(value), 0
+
+    if isinstance(value, _CONTAINER_TYPES):
+        rendered = _get_repr(limit).repr(value)
+        if len(rendered) > limit:
+            return _Rendered(rendered[:limit]), limit, len(rendered) - limit
+        return _Rendered(rendered), len(rendered), 0
+
+    return value, 0, 0
+
+
+def get_bounded_message(record: LogRecord, limit: int) -> tuple[str, int]:
+    """
+    Like LogRecord.getMessage(), but with the arguments capped to the limit, so large arguments are not rendered in
+    full only to be truncated. Returns the message, and the number of characters left out of the arguments.
+    Arguments are capped by the budget remaining after the previous ones, plus one character, so a message missing
+    anything exceeds the limit and is still truncated and reported.
+    """
+    message = str(record.msg)
+    if not record.args:
+        return message, 0
+
+    omitted = 0
+    if isinstance(record.args, Mapping):
+        mapping = {}
+        for key, value in record.args.items():
+            mapping[key], _, omitted_characters = cap_argument(value, limit + 1)
+            omitted += omitted_characters
+        return message % mapping, omitted
+
+    remaining = limit
+    args = []
+    for arg in record.args:
+        capped, length, omitted_characters = cap_argument(arg, max(remaining, 0) + 1)
+        remaining -= length
+        omitted += omitted_characters
+        args.append(capped)
+    return message % tuple(args), omitted
@@ -0,0 +1,146 @@
+import threading
+import time
+from typing import Any, Callable, Literal, Optional
+
+from dans_log_formatter.formatter_error import FormatterError, current_errors
+from dans_log_formatter.providers.abstract import AbstractProvider
+
+DEFAULT_TIME_BUDGET = 0.01
+DEFAULT_FAILURE_THRESHOLD = 3
+DEFAULT_COOLDOWN = 30.0
+
+CircuitState = Literal["closed", "open", "half-open"]
+
+
+class _Circuit:
+    __slots__ = ("failures", "half_open", "opened_until", "provider", "skipped")
+
+    def __init__(self, provider: AbstractProvider):
+        self.provider = provider  # Referenced, so its id is not reused while the circuit exists
+        self.failures = 0
+        self.opened_until = 0.0  # Monotonic time, 0 when closed
+        self.half_open = False
+        self.skipped = 0  # Calls skipped while open
+
+
+class ProviderCircuitBreaker:
+    """
+    Skip providers that are too slow or keep failing, so a single provider cannot stall every log call.
+
+    A provider fails a call when it raises or takes longer than its time budget (the provider's `time_budget`
+    attribute, or else the breaker's). After `failure_threshold` consecutive failures its circuit is tripped open, and
+    the provider is skipped for `cooldown` seconds. Then it is half-open: the next call is a trial, closing the circuit
+    when it succeeds, or opening it for another cooldown when it fails.
+    Tripping is reported in the formatter_errors of the record that tripped it, skipped calls are counted, see
+    get_skipped().
+
+    A provider exceeding its budget is not interrupted, the call still completes and its attributes are used.
+
+    Example:
+        JsonLogFormatter([DjangoRequestProvider()], circuit_breaker=ProviderCircuitBreaker(time_budget=0.005))
+    """
+
+    def __init__(
+        self,
+        time_budget: Optional[float] = DEFAULT_TIME_BUDGET,
+        failure_threshold: int = DEFAULT_FAILURE_THRESHOLD,
+        cooldown: float = DEFAULT_COOLDOWN,
+    ):
+        self.time_budget = time_budget
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self._lock = threading.Lock()
+        self._circuits: dict[int, _Circuit] = {}
+
+    def guard(self, provider: AbstractProvider, method: Callable[..., Any]) -> Callable[..., Any]:
+        """Wrap a method of the provider (get_attributes, capture or render) with the provider's circuit."""
+        circuit = self._get_circuit(provider)
+        budget = provider.time_budget if provider.time_budget is not None else self.time_budget
+
+        def guarded(*arguments: Any) -> Any:
+            trial = False
+            if circuit.opened_until:
+                trial = self._try_half_open(circuit)
+                if not trial:
+                    return None
+
+            try:
+                start = time.perf_counter()
+                try:
+                    result = method(*arguments)
+                except Exception:
+                    self._fail(circuit, "raising an exception")
+                    raise
+
+                duration = time.perf_counter() - start
+                if budget is not None and duration > budget:
+                    self._fail(circuit, f"taking {duration * 1000:,.1f}ms (budget: {budget * 1000:,.1f}ms)")
+                elif circuit.failures or circuit.half_open:
+                    self._succeed(circuit)
+                return result
+            finally:
+                if trial:
+                    # Already ended by _fail() or _succeed(), unless interrupted by a BaseException
+                    circuit.half_open = False
+
+        return guarded
+
+    def get_state(self, provider: AbstractProvider) -> CircuitState:
+        circuit = self._get_circuit(provider)
+        if not circuit.opened_until:
+            return "closed"
+        if circuit.half_open or time.monotonic() >= circuit.opened_until:
+            return "half-open"
+        return "open"
+
+    def get_skipped(self, provider: AbstractProvider) -> int:
+        """The number of calls to the provider skipped while its circuit was open."""
+        return self._get_circuit(provider).skipped
+
+    def reset(self) -> None:
+        """Close all circuits."""
+        for circuit in list(self._circuits.values()):
+            self._succeed(circuit)
+
+    def _get_circuit(self, provider: AbstractProvider) -> _Circuit:
+        circuit = self._circuits.get(id(provider))
+        if circuit is None:
+            with self._lock:
+                circuit = self._circuits.setdefault(id(provider), _Circuit(provider))
+        return circuit
+
+    def _try_half_open(self, circuit: _Circuit) -> bool:
+        """
+        Whether this call is the trial of an open circuit, after its cooldown. One call at a time is a trial, the others
+        are skipped and counted.
+        """
+        with self._lock:
+            if circuit.half_open or time.monotonic() < circuit.opened_until:
+                circuit.skipped += 1
+                return False
+            circuit.half_open = True
+            return True
+
+    def _fail(self, circuit: _Circuit, reason: str) -> None:
+        with self._lock:
+            circuit.failures += 1
+            if not circuit.half_open and circuit.failures < self.failure_threshold:
+                return
+
+            failures = circuit.failures
+            circuit.failures = 0
+            circuit.half_open = False
+            circuit.opened_until = time.monotonic() + self.cooldown
+
+        errors = current_errors.get()
+        if errors is not None:
+            # Without exc_info, as an exception is already reported with its traceback by the formatter
+            errors.append(
+                FormatterError(f"Circuit is open for {self.cooldown:,}s, after {failures} failures, the last {reason}")
+            )
+
+    def _succeed(self, circuit: _Circuit) -> None:
+        with self._lock:
+            circuit.failures = 0
+            circuit.half_open = False
+            circuit.opened_until = 0.0
@@ -1,28 +1,50 @@
 from contextvars import ContextVar
+from functools import lru_cache
 from logging import LogRecord
 from typing import Any, Optional
 
+from django.conf import settings
+from django.core.signals import setting_changed
 from django.http import HttpRequest
-from django.urls import resolve, Resolver404
+from django.urls import get_urlconf, resolve, Resolver404
 
 from dans_log_formatter.providers.abstract_context import AbstractContextProvider
 
 django_request_context: ContextVar[Optional[HttpRequest]] = ContextVar("django_log_context", default=None)
 
+# Request attribute holding the computed request attributes, so they are computed once per request
+REQUEST_ATTRIBUTES_CACHE = "_log_formatter_attributes"
+
+ROUTE_CACHE_SIZE = 1024
+
+
+@lru_cache(maxsize=ROUTE_CACHE_SIZE)
+def resolve_route(urlconf: Any, path_info: str) -> Optional[str]:
+    """
+    Resolve the route template of a path, or None when it does not match any route.
+    Results are cached (including unmatched paths), use resolve_route.cache_info() for the hit and miss counters.
+    """
+    try:
+        return resolve(path_info, urlconf).route
+    except Resolver404:
+        return None
+
+
+def _clear_route_cache(*, setting: str, **kwargs: Any) -> None:  # noqa ARG001
+    if setting == "ROOT_URLCONF":
+        resolve_route.cache_clear()
+
+
+setting_changed.connect(_clear_route_cache)
+
 
 class DjangoRequestProvider(AbstractContextProvider):
     def __init__(self):
         super().__init__(django_request_context)
 
     def get_context_attributes(self, record: LogRecord, request: HttpRequest) -> Optional[dict[str, Any]]:  # noqa ARG002
-        result = {
-            "resource": self.get_resource(request),
-            "http.url": request.build_absolute_uri(),
-            "http.method": request.method,
-            "http.referrer": request.headers.get("referer"),
-            "http.useragent": request.headers.get("user-agent"),
-            "http.remote_addr": self.extract_remote_addr(request),
-        }
+        result = self.get_request_attributes(request).copy()
+        # The user may change mid-request (e.g. login), so it is never cached
         if user := getattr(request, "user", None):
             try:
                 result["user.id"] = user.id if user.is_authenticated else 0
@@ -33,10 +55,24 @@ class DjangoRequestProvider(AbstractContextProvider):
 
         return result
 
+    def get_request_attributes(self, request: HttpRequest) -> dict[str, Any]:
+        attributes = request.__dict__.get(REQUEST_ATTRIBUTES_CACHE)
+        if attributes is None:
+            attributes = {
+                "resource": self.get_resource(request),
+                "http.url": request.build_absolute_uri(),
+                "http.method": request.method,
+                "http.referrer": request.headers.get("referer"),
+                "http.useragent": request.headers.get("user-agent"),
+                "http.remote_addr": self.extract_remote_addr(request),
+            }
+            request.__dict__[REQUEST_ATTRIBUTES_CACHE] = attributes
+
+        return attributes
+
     def get_resource(self, request: HttpRequest) -> str:
-        try:
-            path = resolve(request.path_info).route
-        except Resolver404:
+        path = resolve_route(get_urlconf() or settings.ROOT_URLCONF, request.path_info)
+        if path is None:
             return f"{request.method} {request.path}"
         else:
             return f"{request.method} {path}"
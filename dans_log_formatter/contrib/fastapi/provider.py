@@ -9,20 +9,32 @@ from dans_log_formatter.providers.abstract_context import AbstractContextProvide
 
 fastapi_request_context: ContextVar[Optional[Request]] = ContextVar("fastapi_log_context", default=None)
 
+# ASGI scope key holding the computed request attributes, so they are computed once per request
+REQUEST_ATTRIBUTES_CACHE = "dans_log_formatter.attributes"
+
 
 class FastAPIRequestProvider(AbstractContextProvider):
     def __init__(self):
         super().__init__(fastapi_request_context)
 
     def get_context_attributes(self, record: LogRecord, request: Request):  # noqa ARG002
-        return {
-            "resource": self.get_resource(request),
-            "http.url": str(request.url),
-            "http.method": request.method,
-            "http.referrer": request.headers.get("referer"),
-            "http.useragent": request.headers.get("user-agent"),
-            "http.remote_addr": self.extract_remote_addr(request),
-        }
+        # The route is only matched after the middlewares, so the cache is invalidated once it is set
+        route = request.scope.get("route")
+        cached = request.scope.get(REQUEST_ATTRIBUTES_CACHE)
+        if cached is None or cached[0] is not route:
+            attributes = {
+                "resource": self.get_resource(request),
+                "http.url": str(request.url),
+                "http.method": request.method,
+                "http.referrer": request.headers.get("referer"),
+                "http.useragent": request.headers.get("user-agent"),
+                "http.remote_addr": self.extract_remote_addr(request),
+            }
+            cached = (route, attributes)
+            request.scope[REQUEST_ATTRIBUTES_CACHE] = cached
+
+        # A copy, so changes to the attributes of a record never leak into the cache
+        return cached[1].copy()
 
     def get_resource(self, request: Request) -> str:
         route = request.scope.get("route")
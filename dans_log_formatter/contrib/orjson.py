@@ -1,4 +1,4 @@
-from logging import LogRecord
+from typing import Any
 
 import orjson
 
@@ -6,5 +6,8 @@ from dans_log_formatter.formatter import JsonLogFormatter
 
 
 class OrJsonLogFormatter(JsonLogFormatter):
-    def format(self, record: LogRecord) -> str:
-        return str(orjson.dumps(self.get_attributes(record)), "utf-8")
+    def dumps(self, attributes: dict[str, Any]) -> str:
+        return str(orjson.dumps(attributes), "utf-8")
+
+    def dumps_bytes(self, attributes: dict[str, Any]) -> bytes:
+        return orjson.dumps(attributes)
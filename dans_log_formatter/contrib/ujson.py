@@ -1,4 +1,4 @@
-from logging import LogRecord
+from typing import Any
 
 import ujson
 
@@ -6,5 +6,5 @@ from dans_log_formatter.formatter import JsonLogFormatter
 
 
 class UJsonLogFormatter(JsonLogFormatter):
-    def format(self, record: LogRecord) -> str:
-        return ujson.dumps(self.get_attributes(record))
+    def dumps(self, attributes: dict[str, Any]) -> str:
+        return ujson.dumps(attributes, ensure_ascii=self.size_unit != "bytes")
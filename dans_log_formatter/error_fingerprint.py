@@ -0,0 +1,65 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from types import TracebackType
+from typing import Optional
+
+from dans_log_formatter.formatter_error import ExecInfo
+
+DEFAULT_WINDOW = 60.0
+DEFAULT_SIZE = 1024
+
+
+def fingerprint_exception(exception: BaseException, tb: Optional[TracebackType]) -> str:
+    """
+    Stable fingerprint of an exception, from its type and the module and function of each traceback frame.
+    Messages, paths and line numbers are left out, so it survives different values, hosts and deployments.
+    """
+    exception_type = type(exception)
+    parts = [f"{exception_type.__module__}.{exception_type.__qualname__}"]
+    while tb is not None:
+        frame = tb.tb_frame
+        parts.append(f"{frame.f_globals.get('__name__', '?')}.{frame.f_code.co_name}")
+        tb = tb.tb_next
+
+    return hashlib.blake2b("\n".join(parts).encode("utf-8"), digest_size=8).hexdigest()
+
+
+class ErrorDeduplicator:
+    """
+    Emit the full traceback of an exception only the first time its fingerprint is seen within the window (seconds).
+    Following occurrences carry only the exception line, the fingerprint and the occurrence count.
+    Keeps the most recently seen fingerprints, up to `size`.
+
+    Example:
+        JsonLogFormatter(error_deduplicator=ErrorDeduplicator(window=60))
+    """
+
+    def __init__(
+        self,
+        window: float = DEFAULT_WINDOW,
+        size: int = DEFAULT_SIZE,
+    ):
+        self.window = window
+        self.size = size
+        self._lock = threading.Lock()
+        # Fingerprint -> (start of the window, occurrences), least recently seen first
+        self._seen: OrderedDict[str, tuple[float, int]] = OrderedDict()
+
+    def fingerprint(self, exc_info: ExecInfo) -> str:
+        # Not cached across records, so no exception or frame is kept alive
+        return fingerprint_exception(exc_info[1], exc_info[2])
+
+    def count(self, fingerprint: str, now: float) -> int:
+        """Count an occurrence of the fingerprint, returning the occurrences within the current window."""
+        with self._lock:
+            start, occurrences = self._seen.get(fingerprint, (now, 0))
+            if now - start >= self.window:
+                start, occurrences = now, 0
+
+            self._seen[fingerprint] = (start, occurrences + 1)
+            self._seen.move_to_end(fingerprint)
+            if len(self._seen) > self.size:
+                self._seen.popitem(last=False)
+
+        return occurrences + 1
@@ -1,18 +1,136 @@
 import json
 import sys
-from datetime import datetime
+import time
+import traceback
+from collections import deque
+from collections.abc import Iterable, Mapping
+from contextvars import ContextVar
+from functools import partial
 from logging import Formatter, LogRecord
-from typing import Literal, Optional
+from types import TracebackType
+from typing import Any, Callable, ClassVar, Literal, NamedTuple, Optional, Union
 
+from dans_log_formatter.bounded_dict import BoundedDict
+from dans_log_formatter.bounded_message import get_bounded_message
+from dans_log_formatter.circuit_breaker import ProviderCircuitBreaker
+from dans_log_formatter.error_fingerprint import ErrorDeduplicator
 from dans_log_formatter.providers.abstract import AbstractProvider
-from dans_log_formatter.formatter_error import FormatterError
+from dans_log_formatter.formatter_error import FormatterError, current_errors, record_error
+from dans_log_formatter.record_attributes import MESSAGE_OMITTED_ATTRIBUTE, SAMPLE_RATE_ATTRIBUTE
+from dans_log_formatter.stats import FormatterStats
+from dans_log_formatter.structured_error import StructuredErrorFormatter
+from dans_log_formatter.template import TextTemplate
+from dans_log_formatter.timestamp import TimestampFormat, TimestampFormatter
+from dans_log_formatter.value_budget import ValueBudget
 
 DEFAULT_MESSAGE_SIZE_LIMIT = 64 * 1024
 DEFAULT_STACK_SIZE_LIMIT = 128 * 1024
+DEFAULT_RECENT_ERRORS_LIMIT = 100
+DEFAULT_LOCATION_CACHE_SIZE = 4096
+DEFAULT_DISPATCH_TABLE_SIZE = 4096
+
+SizeUnit = Literal["characters", "bytes"]
+ExcInfo = Union[tuple[type[BaseException], BaseException, Optional[TracebackType]], tuple[None, None, None]]
+# Attribute of the logged exceptions holding their formatted traceback, and the id of the traceback formatted
+EXCEPTION_TEXT_ATTRIBUTE = "_log_formatter_exc_text"
+TRUNCATED_SUFFIX = "...[TRUNCATED]"
+
+# A provider's bound get_attributes(), the label prefixed to its errors, the provider itself, and its bound capture()
+# and render(), all guarded by the circuit breaker and timed as the provider's stage when enabled
+ProviderStep = tuple[
+    Callable[[LogRecord], Optional[dict]],
+    str,
+    AbstractProvider,
+    Callable[[LogRecord], Any],
+    Callable[[LogRecord, Any], Optional[Mapping[str, Any]]],
+]
+AttributeStep = tuple[str, Callable[[LogRecord], Any]]
+
+
+class _ProviderList(list[AbstractProvider]):
+    """A list of providers calling on_change after every in-place mutation, so the formatter compiles them again."""
+
+    def __init__(self, providers: Iterable[AbstractProvider], on_change: Callable[[], None]):
+        super().__init__(providers)
+        self._on_change = on_change
+
+    def __setitem__(self, index: Any, value: Any) -> None:
+        super().__setitem__(index, value)
+        self._on_change()
+
+    def __delitem__(self, index: Any) -> None:
+        super().__delitem__(index)
+        self._on_change()
+
+    def __iadd__(self, providers: Iterable[AbstractProvider]) -> "_ProviderList":  # type: ignore[misc,override]
+        super().__iadd__(providers)
+        self._on_change()
+        return self
+
+    def __imul__(self, count: Any) -> "_ProviderList":  # type: ignore[misc]
+        super().__imul__(count)
+        self._on_change()
+        return self
+
+    def append(self, provider: AbstractProvider) -> None:
+        super().append(provider)
+        self._on_change()
+
+    def extend(self, providers: Iterable[AbstractProvider]) -> None:
+        super().extend(providers)
+        self._on_change()
+
+    def insert(self, index: Any, provider: AbstractProvider) -> None:
+        super().insert(index, provider)
+        self._on_change()
+
+    def pop(self, index: Any = -1) -> AbstractProvider:
+        provider = super().pop(index)
+        self._on_change()
+        return provider
+
+    def remove(self, provider: AbstractProvider) -> None:
+        super().remove(provider)
+        self._on_change()
+
+    def clear(self) -> None:
+        super().clear()
+        self._on_change()
+
+    def reverse(self) -> None:
+        super().reverse()
+        self._on_change()
+
+    def sort(self, *args: Any, **kwargs: Any) -> None:
+        super().sort(*args, **kwargs)
+        self._on_change()
+
+
+class RecordSnapshot(NamedTuple):
+    provider_plan: tuple[ProviderStep, ...]
+    snapshots: tuple[Any, ...]
+    errors: tuple[FormatterError, ...]
+
+
+# Snapshots taken by TextLogFormatter.capture(), by id of their record, rendered instead of calling the providers.
+# Set by the handlers formatting the records, so the snapshots are never stored on the records
+captured_snapshots: ContextVar[Optional[dict[int, RecordSnapshot]]] = ContextVar("captured_snapshots", default=None)
 
 
 # noinspection PyMethodMayBeStatic
 class TextLogFormatter(Formatter):
+    # Methods timed by their stage when collecting stats
+    instrumented_stages: ClassVar[tuple[tuple[str, str], ...]] = (
+        ("format_timestamp", "timestamp"),
+        ("format_status", "status"),
+        ("format_message", "message"),
+        ("format_location", "location"),
+        ("format_file", "file"),
+        ("format_error", "error"),
+        ("format_error_stack", "error.stack"),
+        ("format_stack_info", "stack_info"),
+    )
+
     def __init__(
         self,
         fmt: Optional[str] = None,
@@ -21,66 +139,410 @@ class TextLogFormatter(Formatter):
         validate: bool = True,  # noqa FBT001, FBT002
         providers: Optional[list[AbstractProvider]] = None,
         *,
-        message_size_limit: Optional[int] = DEFAULT_MESSAGE_SIZE_LIMIT,
-        stack_size_limit: Optional[int] = DEFAULT_STACK_SIZE_LIMIT,
+        # Text is not truncated by default, like the logging.Formatter. The JsonLogFormatter has default limits
+        message_size_limit: Optional[int] = None,
+        stack_size_limit: Optional[int] = None,
+        size_unit: SizeUnit = "characters",
+        bounded_message: bool = False,
+        recent_errors_limit: int = DEFAULT_RECENT_ERRORS_LIMIT,
+        location_cache_size: int = DEFAULT_LOCATION_CACHE_SIZE,
+        error_deduplicator: Optional[ErrorDeduplicator] = None,
+        structured_errors: Optional[StructuredErrorFormatter] = None,
+        value_budget: Optional[ValueBudget] = None,
+        collect_stats: bool = False,
+        circuit_breaker: Optional[ProviderCircuitBreaker] = None,
     ):
         super().__init__(fmt, datefmt, style, validate)  # "defaults" argument is added in Python 3.10
+        # Opt-in: per stage timing and counters, read with stats(). Set first, as compile() instruments the stages
+        self.stats_collector = FormatterStats() if collect_stats else None
+        # Opt-in: skip providers that are too slow or keep failing. Set first, as compile() guards the providers
+        self.circuit_breaker = circuit_breaker
+        self._provider_plan: tuple[ProviderStep, ...] = ()
+        self._attribute_plan: tuple[AttributeStep, ...] = ()
+        self._template_attribute_plan: tuple[AttributeStep, ...] = ()
+        # Provider plan per (logger name, levelno), when a provider is gated by level or logger name
+        self._dispatch_table: Optional[BoundedDict[tuple[str, int], tuple[ProviderStep, ...]]] = None
         self.providers = providers or []
         self.message_size_limit = message_size_limit
         self.stack_size_limit = stack_size_limit
-        self._formatter_errors: list[FormatterError] = []
+        # Unit of the size limits, "bytes" measures the UTF-8 encoded values
+        self.size_unit = size_unit
+        # Cap the message arguments to the message size limit before formatting them
+        self.bounded_message = bounded_message
+        # Bounded history of formatter errors across all records, kept for diagnostics only
+        self.recent_errors: deque[FormatterError] = deque(maxlen=recent_errors_limit)
+        # Location strings interned per call site (pathname, funcName, lineno)
+        self._location_cache: BoundedDict[tuple[str, str, int], str] = BoundedDict(location_cache_size)
+        # Opt-in: full tracebacks only for the first occurrence of an exception fingerprint within a window
+        self.error_deduplicator = error_deduplicator
+        # Opt-in: error.kind, error.message and error.stack instead of the error attribute
+        self.structured_errors = structured_errors
+        # Opt-in: size limits for the providers' attribute values
+        self.value_budget = value_budget
+        # (second, datefmt, formatted time) of the last formatTime() call, replaced as a whole
+        self._time_cache: tuple[int, Optional[str], str] = (-1, None, "")
+
+    @property
+    def location_cache_size(self) -> int:
+        return self._location_cache.limit
+
+    @location_cache_size.setter
+    def location_cache_size(self, location_cache_size: int) -> None:
+        self._location_cache.limit = location_cache_size
+
+    @property
+    def providers(self) -> list[AbstractProvider]:
+        return self._providers
+
+    @providers.setter
+    def providers(self, providers: list[AbstractProvider]) -> None:
+        # A copy, compiled again whenever it is mutated in place (e.g. formatter.providers.append(...))
+        self._providers = _ProviderList(providers, self.compile)
+        self.compile()
+
+    def compile(self) -> None:
+        """
+        Resolve the providers, the bound attribute methods and the format string once, so formatting a record is a
+        flat loop.
+        Called automatically when `providers` is reassigned or mutated in place; call it manually after changing a
+        provider's settings, like its gating with when().
+        """
+        if self.stats_collector is not None:
+            self._instrument(self.stats_collector)
+        self._provider_plan = self._compile_providers(self._providers)
+        gated = any(provider.is_gated() for provider in self._providers)
+        self._dispatch_table = BoundedDict(DEFAULT_DISPATCH_TABLE_SIZE) if gated else None
+        self._attribute_plan = (
+            ("timestamp", self.format_timestamp),
+            ("status", self.format_status),
+            ("message", self.format_message),
+            ("location", self.format_location),
+            ("file", self.format_file),
+        )
+        self._template = TextTemplate(self._style)
+        if self.stats_collector is not None:
+            self._template.render = self.stats_collector.timed("serialization", self._template.render)
+        # Text rendering only computes the attributes referenced by the format string
+        self._template_attribute_plan = tuple(
+            (attribute, format_attribute)
+            for attribute, format_attribute in self._attribute_plan
+            if attribute in self._template.fields
+        )
+
+    def _instrument(self, stats_collector: FormatterStats) -> None:
+        # Bound from the class every time, so compiling again never wraps a wrapper. Disabled stats cost nothing
+        cls = type(self)
+        for name, stage in self.instrumented_stages:
+            if hasattr(cls, name):
+                setattr(self, name, stats_collector.timed(stage, getattr(cls, name).__get__(self)))
+        # Separate stages, as format() returns characters and the others bytes
+        for name in ("format", "format_bytes", "format_batch"):
+            if hasattr(cls, name):
+                setattr(self, name, stats_collector.timed(name, getattr(cls, name).__get__(self), count_output=True))
+
+    def _compile_providers(self, providers: list[AbstractProvider]) -> tuple[ProviderStep, ...]:
+        provider_plan = self._compile_provider_steps(providers)
+        if self.circuit_breaker is None and self.stats_collector is None:
+            return provider_plan
+
+        # capture() and render() go through the same circuit and stats stage as get_attributes()
+        return tuple(
+            (
+                self._wrap_provider_method(index, provider, get_attributes),
+                label,
+                provider,
+                self._wrap_provider_method(index, provider, capture),
+                self._wrap_provider_method(index, provider, render),
+            )
+            for index, (get_attributes, label, provider, capture, render) in enumerate(provider_plan)
+        )
+
+    def _wrap_provider_method(self, index: int, provider: AbstractProvider, method: Callable[..., Any]) -> Any:
+        if self.circuit_breaker is not None:
+            method = self.circuit_breaker.guard(provider, method)
+        if self.stats_collector is not None:
+            method = self.stats_collector.timed(f"provider:{index}:{provider.__class__.__name__}", method)
+        return method
+
+    def _compile_provider_steps(self, providers: list[AbstractProvider]) -> tuple[ProviderStep, ...]:
+        if type(self).get_provider_attributes is not TextLogFormatter.get_provider_attributes:
+            return tuple(
+                (
+                    partial(self.get_provider_attributes, index, provider),
+                    self._get_provider_label(index, provider),
+                    provider,
+                    provider.capture,
+                    provider.render,
+                )
+                for index, provider in enumerate(providers)
+            )
+
+        return tuple(
+            (
+                provider.get_attributes,
+                self._get_provider_label(index, provider),
+                provider,
+                provider.capture,
+                provider.render,
+            )
+            for index, provider in enumerate(providers)
+        )
+
+    def get_providers(self, record: LogRecord) -> list[AbstractProvider]:
+        return [step[2] for step in self._dispatch(record)]
+
+    def _get_provider_plan(self, record: LogRecord) -> tuple[ProviderStep, ...]:
+        if type(self).get_providers is TextLogFormatter.get_providers:
+            return self._dispatch(record)
 
-    def get_providers(self, record: LogRecord) -> list[AbstractProvider]:  # noqa ARG002
-        return self.providers
+        # get_providers() is overridden, so the providers may differ for each record
+        return self._compile_providers(self.get_providers(record))
+
+    def _dispatch(self, record: LogRecord) -> tuple[ProviderStep, ...]:
+        dispatch_table = self._dispatch_table
+        if dispatch_table is None:
+            return self._provider_plan
+
+        key = (record.name, record.levelno)
+        provider_plan = dispatch_table.get(key)
+        if provider_plan is None:
+            provider_plan = tuple(step for step in self._provider_plan if step[2].applies_to(*key))
+            dispatch_table[key] = provider_plan
+        return provider_plan
 
     def format(self, record: LogRecord) -> str:
-        for attribute, value in self.get_attributes(record).items():
-            if not hasattr(record, attribute):
-                try:  # noqa SIM105
-                    setattr(record, attribute, value)
-                except AttributeError:
-                    pass
+        if type(self).get_attributes is TextLogFormatter.get_attributes:
+            attributes = self._get_attributes_with_errors(record, self._template_attribute_plan)
+        else:
+            attributes = self.get_attributes(record)
+
+        # Attributes of the record take precedence, like when they were set on the record for logging.Formatter
+        values = {**attributes, **record.__dict__}
+        fields = self._template.fields
+        if "message" in fields:
+            values["message"] = attributes["message"] if "message" in attributes else record.getMessage()
+        if "asctime" in fields:
+            values["asctime"] = self.formatTime(record, self.datefmt)
+
+        text = self._template.render(values)
+        # Append the error and stack like logging.Formatter, formatted once by get_attributes()
+        error = attributes.get("error", attributes.get("error.stack")) if record.exc_info else record.exc_text
+        if error:
+            text = text + error if text[-1:] == "\n" else f"{text}\n{error}"
+        if record.stack_info:
+            stack_info = attributes.get("stack_info") or self.format_stack_info(record)
+            text = text + stack_info if text[-1:] == "\n" else f"{text}\n{stack_info}"
+        return text
+
+    def capture(self, record: LogRecord) -> RecordSnapshot:
+        """
+        Snapshot the providers' state on the logging thread.
+        Formatting the record later, or on another thread, with the snapshot set in `captured_snapshots` renders it
+        instead of calling the providers. Used by handlers that format off the logging thread, like the
+        BackgroundStreamHandler. The snapshot is returned rather than stored on the record, so the record can still
+        be pickled (e.g. by a SocketHandler).
+        """
+        provider_plan = self._get_provider_plan(record)
+        errors: list[FormatterError] = []
+        token = current_errors.set(errors)
+        try:
+            snapshots = tuple(
+                self._call_provider(capture, (record,), label, errors) for _, label, _, capture, _ in provider_plan
+            )
+        finally:
+            current_errors.reset(token)
 
-        return super().format(record)
+        return RecordSnapshot(provider_plan, snapshots, tuple(errors))
 
     def get_attributes(self, record: LogRecord) -> dict:
-        result = {}
-        for index, provider in enumerate(self.get_providers(record)):
-            provider_data = self.get_provider_attributes(index, provider, record)
-            if provider_data is not None:
-                result.update(provider_data)
+        return self._get_attributes_with_errors(record, self._attribute_plan)
+
+    def _get_attributes_with_errors(self, record: LogRecord, attribute_plan: tuple[AttributeStep, ...]) -> dict:
+        errors: list[FormatterError] = []
+        token = current_errors.set(errors)
+        try:
+            result = self._get_attributes(record, errors, attribute_plan)
+        finally:
+            current_errors.reset(token)
+
+        if errors:
+            result["formatter_errors"] = self._get_formatter_errors(errors)
+            # Without their exc_info, so the history never keeps an exception or the frames of its traceback alive
+            self.recent_errors.extend(FormatterError(error.message) for error in errors)
+            if self.stats_collector is not None:
+                self.stats_collector.count_formatter_errors(len(errors))
+
+        return result
+
+    def _get_attributes(
+        self, record: LogRecord, errors: list[FormatterError], attribute_plan: tuple[AttributeStep, ...]
+    ) -> dict:
+        result: dict[str, Any] = {}
+        snapshots = captured_snapshots.get()
+        snapshot = snapshots.get(id(record)) if snapshots else None
+        if snapshot is not None:
+            self._render_snapshot(record, snapshot, result, errors)
+        else:
+            self._get_providers_attributes(record, result, errors)
+
+        if self.value_budget is not None and result:
+            self.value_budget.limit_attributes(result)
 
-        result["timestamp"] = self.format_timestamp(record)
-        result["status"] = self.format_status(record)
-        result["message"] = self.format_message(record)
-        result["location"] = self.format_location(record)
-        result["file"] = self.format_file(record)
+        for attribute, format_attribute in attribute_plan:
+            result[attribute] = format_attribute(record)
+
+        if SAMPLE_RATE_ATTRIBUTE in record.__dict__:
+            result["sample_rate"] = record.__dict__[SAMPLE_RATE_ATTRIBUTE]
 
         if record.exc_info is not None:
-            result["error"] = self.format_error(record)
+            if record.exc_info[1] is not None and (self.error_deduplicator or self.structured_errors) is not None:
+                self._add_error_attributes(record, result)
+            else:
+                result["error"] = self.format_error(record)
 
         if record.stack_info is not None:
             result["stack_info"] = self.format_stack_info(record)
 
-        if self._formatter_errors:
-            result["formatter_errors"] = self._get_formatter_errors()
-
         return result
 
+    def _get_providers_attributes(self, record: LogRecord, result: dict, errors: list[FormatterError]) -> None:
+        for get_provider_attributes, label, _, _, _ in self._get_provider_plan(record):
+            errors_count = len(errors)
+            try:
+                provider_data = get_provider_attributes(record)
+            except Exception as e:  # noqa BLE001
+                provider_data = None
+                self._label_provider_errors(errors, errors_count, label)
+                errors.append(FormatterError(f"{label} raised an exception: {e}", sys.exc_info()))
+            else:
+                if len(errors) != errors_count:
+                    self._label_provider_errors(errors, errors_count, label)
+
+            if provider_data:
+                result.update(provider_data)
+
+    def _render_snapshot(
+        self, record: LogRecord, snapshot: RecordSnapshot, result: dict, errors: list[FormatterError]
+    ) -> None:
+        errors.extend(snapshot.errors)
+        for (_, label, _, _, render), provider_snapshot in zip(snapshot.provider_plan, snapshot.snapshots):
+            provider_data = self._call_provider(render, (record, provider_snapshot), label, errors)
+            if provider_data:
+                result.update(provider_data)
+
+    def _call_provider(
+        self, method: Callable[..., Any], arguments: tuple[Any, ...], label: str, errors: list[FormatterError]
+    ) -> Any:
+        errors_count = len(errors)
+        try:
+            return method(*arguments)
+        except Exception as e:  # noqa BLE001
+            errors.append(FormatterError(f"{label} raised an exception: {e}", sys.exc_info()))
+            return None
+        finally:
+            self._label_provider_errors(errors, errors_count, label)
+
     def format_timestamp(self, record: LogRecord):
         return self.formatTime(record)
 
+    def formatTime(self, record: LogRecord, datefmt: Optional[str] = None) -> str:  # noqa N802
+        # time.strftime() has no sub-second directives, so the formatted time changes once per second
+        seconds = int(record.created)
+        cached_seconds, cached_datefmt, formatted = self._time_cache
+        if cached_seconds != seconds or cached_datefmt != datefmt:
+            formatted = time.strftime(datefmt or self.default_time_format, self.converter(seconds))
+            self._time_cache = (seconds, datefmt, formatted)
+
+        if not datefmt and self.default_msec_format:
+            return self.default_msec_format % (formatted, record.msecs)
+        return formatted
+
     def format_status(self, record: LogRecord) -> str:
         return record.levelname
 
     def format_message(self, record: LogRecord) -> str:
-        return self.truncate_string(record.getMessage(), self.message_size_limit, "message")
+        if self.bounded_message and record.args and self.message_size_limit is not None:
+            message, omitted = get_bounded_message(record, self.message_size_limit)
+            return self.truncate_string(message, self.message_size_limit, "message", omitted=omitted)
+        omitted = record.__dict__.get(MESSAGE_OMITTED_ATTRIBUTE, 0)
+        return self.truncate_string(record.getMessage(), self.message_size_limit, "message", omitted=omitted)
+
+    def render_message(self, record: LogRecord) -> tuple[str, int]:
+        """
+        The record's message, with its arguments capped when bounded_message is set, before truncation. Returns the
+        message, and the number of characters left out of the arguments.
+        """
+        if self.bounded_message and record.args and self.message_size_limit is not None:
+            return get_bounded_message(record, self.message_size_limit)
+        return record.getMessage(), 0
 
     def format_error(self, record: LogRecord) -> str:
         if record.exc_info is None:
             return ""
-        exception = self.formatException(record.exc_info)
-        return self.truncate_string(exception, self.stack_size_limit, "error")
+        if not record.exc_text:
+            # Shared with the following handlers, like logging.Formatter does
+            record.exc_text = self.get_exception_text(record.exc_info)
+        return self.truncate_string(record.exc_text, self.stack_size_limit, "error")
+
+    def get_exception_text(self, exc_info: ExcInfo) -> str:
+        """
+        formatException(), cached on the exception itself by the identity of its traceback, so an exception logged by
+        many records is formatted once. The text lives exactly as long as the exception, and a re-raised exception
+        (with a longer traceback) is formatted again. Overridden formatException() methods are never cached.
+        """
+        exception, tb = exc_info[1], exc_info[2]
+        if exception is None or type(self).formatException is not Formatter.formatException:
+            return self.formatException(exc_info)
+
+        cached = exception.__dict__.get(EXCEPTION_TEXT_ATTRIBUTE)
+        if cached is not None and cached[0] == id(tb):
+            return cached[1]
+
+        text = self.formatException(exc_info)
+        exception.__dict__[EXCEPTION_TEXT_ATTRIBUTE] = (id(tb), text)
+        return text
+
+    def format_error_line(self, record: LogRecord) -> str:
+        if record.exc_info is None:
+            return ""
+        line = "".join(traceback.format_exception_only(record.exc_info[0], record.exc_info[1])).strip()
+        return self.truncate_string(line, self.message_size_limit, "error")
+
+    def format_error_stack(self, record: LogRecord) -> str:
+        if record.exc_info is None or record.exc_info[1] is None:
+            return ""
+        structured_errors = self.structured_errors or StructuredErrorFormatter()
+        stack, truncated = structured_errors.format_stack(record.exc_info[1], record.exc_info[2], self.stack_size_limit)
+        if self.size_unit == "bytes" and not truncated:
+            # The stack stops at the limit in characters, which may still exceed it in bytes
+            limited_stack = self._truncate(stack, self.stack_size_limit)
+            stack, truncated = limited_stack, limited_stack is not stack
+
+        if truncated:
+            self.record_error(f"Attribute 'error.stack' value is too long (limit: {self.stack_size_limit:,})")
+            if self.stats_collector is not None:
+                self.stats_collector.count_truncation("error.stack")
+        return stack
+
+    def _add_error_attributes(self, record: LogRecord, result: dict) -> None:
+        exc_info: Any = record.exc_info
+        occurrences = 1
+        if self.error_deduplicator is not None:
+            fingerprint = self.error_deduplicator.fingerprint(exc_info)
+            occurrences = self.error_deduplicator.count(fingerprint, record.created)
+
+        if self.structured_errors is not None:
+            result["error.kind"] = self.structured_errors.format_kind(exc_info[1])
+            message = self.structured_errors.format_message(exc_info[1])
+            result["error.message"] = self.truncate_string(message, self.message_size_limit, "error.message")
+            if occurrences == 1:
+                result["error.stack"] = self.format_error_stack(record)
+        else:
+            result["error"] = self.format_error(record) if occurrences == 1 else self.format_error_line(record)
+
+        if self.error_deduplicator is not None:
+            result["error.fingerprint"] = fingerprint
+            result["error.occurrences"] = occurrences
 
     def format_stack_info(self, record: LogRecord) -> str:
         if record.stack_info is None:
@@ -88,62 +550,217 @@ class TextLogFormatter(Formatter):
         stack = self.formatStack(record.stack_info)
         return self.truncate_string(stack, self.stack_size_limit, "stack_info")
 
-    def truncate_string(self, value: str, limit: Optional[int], attribute_name: str) -> str:
-        length = len(value)
-        if limit is not None and length > limit:
-            self.record_error(f"Attribute '{attribute_name}' value is too long: {length:,} (limit: {limit:,})")
-            return value[: limit - 14] + "...[TRUNCATED]"
+    def truncate_string(self, value: str, limit: Optional[int], attribute_name: str, *, omitted: int = 0) -> str:
+        """Truncate the value to the limit, reporting its length plus the characters already omitted from it."""
+        if limit is None:
+            return value
+
+        length = self._measure(value, limit)
+        if length > limit:
+            self._record_truncation(attribute_name, length + omitted, limit)
+            return self._cut(value, limit - len(TRUNCATED_SUFFIX)) + TRUNCATED_SUFFIX
         else:
             return value
 
+    def _truncate(self, value: str, limit: Optional[int]) -> str:
+        if limit is not None and self._measure(value, limit) > limit:
+            return self._cut(value, limit - len(TRUNCATED_SUFFIX)) + TRUNCATED_SUFFIX
+        return value
+
+    def _measure(self, value: str, limit: Optional[int]) -> int:
+        """
+        Size of the value in the size unit.
+        In bytes, the value is only encoded when its length in characters cannot tell whether it fits the limit, as
+        a character is 1 to 4 bytes in UTF-8. Otherwise, the length in characters is returned as a lower bound.
+        """
+        length = len(value)
+        if self.size_unit == "bytes" and limit is not None and length <= limit < length * 4:
+            return len(value.encode("utf-8", "surrogatepass"))
+        return length
+
+    def _cut(self, value: str, size: int) -> str:
+        if self.size_unit == "bytes":
+            # Slicing the characters first bounds the encoded copy, and a partial character at the end is dropped
+            return value[:size].encode("utf-8", "surrogatepass")[:size].decode("utf-8", "ignore")
+        return value[:size]
+
+    def _record_truncation(self, attribute_name: str, length: int, limit: Optional[int]) -> None:
+        self.record_error(f"Attribute '{attribute_name}' value is too long: {length:,} (limit: {limit:,})")
+        if self.stats_collector is not None:
+            self.stats_collector.count_truncation(attribute_name)
+
     def format_location(self, record: LogRecord):
-        return f"{record.module}-{record.funcName}#{record.lineno}"
+        key = (record.pathname, record.funcName, record.lineno)
+        location = self._location_cache.get(key)
+        if location is None:
+            location = f"{record.module}-{record.funcName}#{record.lineno}"
+            self._location_cache[key] = location
+        return location
 
     def format_file(self, record: LogRecord):
         return record.pathname
 
     def get_provider_attributes(self, index: int, provider: AbstractProvider, record: LogRecord) -> Optional[dict]:
+        errors = current_errors.get()
+        errors_count = len(errors) if errors is not None else 0
+        label = self._get_provider_label(index, provider)
         try:
             provider_data = provider.get_attributes(record)
         except Exception as e:  # noqa BLE001
-            self.record_error(f"Provider index {index} ({provider.__class__.__name__}) raised an exception: {e}")
+            self._label_provider_errors(errors, errors_count, label)
+            self.record_error(f"{label} raised an exception: {e}")
             return None
         else:
-            self._formatter_errors.extend(
-                FormatterError(
-                    f"Provider index {index} ({provider.__class__.__name__}): {error.message}",
-                    error.exc_info,
-                )
-                for error in provider.get_errors()
-            )
+            self._label_provider_errors(errors, errors_count, label)
             return provider_data
 
+    def _get_provider_label(self, index: int, provider: AbstractProvider) -> str:
+        return f"Provider index {index} ({provider.__class__.__name__})"
+
+    def _label_provider_errors(self, errors: Optional[list[FormatterError]], start: int, label: str) -> None:
+        if errors is None:
+            return
+
+        for error_index in range(start, len(errors)):
+            message, exc_info = errors[error_index]
+            if not message.startswith(label):
+                errors[error_index] = FormatterError(f"{label}: {message}", exc_info)
+
     def record_error(self, message: str) -> None:
-        self._formatter_errors.append(FormatterError(message, sys.exc_info()))
-
-    def _get_formatter_errors(self) -> str:
-        return self.truncate_string(
-            "\n\n".join(
-                f"{error.message}\n{self.formatException(error.exc_info)}" if error.exc_info else error.message
-                for error in self._formatter_errors
-            ),
-            self.stack_size_limit,
-            "formatter_errors",
-        )
+        record_error(message)
+
+    def stats(self) -> dict[str, Any]:
+        """Snapshot of the stats collected with `collect_stats=True`, empty when disabled."""
+        return self.stats_collector.snapshot() if self.stats_collector is not None else {}
+
+    def _get_formatter_errors(self, errors: list[FormatterError]) -> str:
+        # Stop rendering errors once the size limit is exceeded, so the cost is bounded per record
+        parts: list[str] = []
+        size = 0
+        for error in errors:
+            part = (
+                f"{error.message}\n{self._truncate(self.formatException(error.exc_info), self.stack_size_limit)}"
+                if error.exc_info[0]
+                else error.message
+            )
+            parts.append(part)
+            size += len(part) + 2
+            if self.stack_size_limit is not None and size > self.stack_size_limit:
+                break
+
+        return self.truncate_string("\n\n".join(parts), self.stack_size_limit, "formatter_errors")
 
 
 class JsonLogFormatter(TextLogFormatter):
+    instrumented_stages = (
+        *TextLogFormatter.instrumented_stages,
+        ("dumps", "serialization"),
+        ("dumps_bytes", "serialization.bytes"),
+    )
+
     def __init__(
         self,
         providers: Optional[list[AbstractProvider]] = None,
         *,
         message_size_limit: Optional[int] = DEFAULT_MESSAGE_SIZE_LIMIT,
         stack_size_limit: Optional[int] = DEFAULT_STACK_SIZE_LIMIT,
+        size_unit: SizeUnit = "characters",
+        bounded_message: bool = False,
+        recent_errors_limit: int = DEFAULT_RECENT_ERRORS_LIMIT,
+        location_cache_size: int = DEFAULT_LOCATION_CACHE_SIZE,
+        error_deduplicator: Optional[ErrorDeduplicator] = None,
+        structured_errors: Optional[StructuredErrorFormatter] = None,
+        value_budget: Optional[ValueBudget] = None,
+        collect_stats: bool = False,
+        circuit_breaker: Optional[ProviderCircuitBreaker] = None,
+        timestamp_format: TimestampFormat = "iso",
+        static_attributes: Optional[dict[str, Any]] = None,
     ):
-        super().__init__(providers=providers, message_size_limit=message_size_limit, stack_size_limit=stack_size_limit)
+        super().__init__(
+            providers=providers,
+            message_size_limit=message_size_limit,
+            stack_size_limit=stack_size_limit,
+            size_unit=size_unit,
+            bounded_message=bounded_message,
+            recent_errors_limit=recent_errors_limit,
+            location_cache_size=location_cache_size,
+            error_deduplicator=error_deduplicator,
+            structured_errors=structured_errors,
+            value_budget=value_budget,
+            collect_stats=collect_stats,
+            circuit_breaker=circuit_breaker,
+        )
+        self.timestamp_formatter = TimestampFormatter(timestamp_format)
+        self.static_attributes = static_attributes or {}
+
+    @property
+    def static_attributes(self) -> dict[str, Any]:
+        return self._static_attributes
+
+    @static_attributes.setter
+    def static_attributes(self, static_attributes: dict[str, Any]) -> None:
+        # Serialized once, and spliced at the start of every log line
+        self._static_attributes = static_attributes
+        self._static_keys = frozenset(static_attributes)
+        self._static_prefix = "{" + self.dumps(static_attributes)[1:-1] + "," if static_attributes else ""
+        self._static_prefix_bytes = (
+            b"{" + self.dumps_bytes(static_attributes)[1:-1] + b"," if static_attributes else b""
+        )
 
     def format(self, record: LogRecord) -> str:
-        return json.dumps(self.get_attributes(record))
+        attributes = self.get_attributes(record)
+        if not self._static_prefix:
+            return self.dumps(attributes)
+        elif attributes and self._static_keys.isdisjoint(attributes):
+            return self._static_prefix + self.dumps(attributes)[1:]
+        else:
+            # Attributes of the record override the static attributes
+            return self.dumps({**self._static_attributes, **attributes})
+
+    def format_bytes(self, record: LogRecord) -> bytes:
+        return self._dumps_line(self.get_attributes(record))
+
+    def format_batch(
+        self, records: Iterable[LogRecord], on_error: Optional[Callable[[LogRecord], None]] = None
+    ) -> bytes:
+        """
+        Format records into a single newline-delimited JSON buffer, every line ending with a newline.
+        The lines are joined once. Used by handlers that write records in batches, like the BackgroundStreamHandler.
+        A record failing to format is passed to `on_error` and left out, or else the error is raised.
+        """
+        get_attributes = self.get_attributes
+        dumps_line = self._dumps_line
+
+        lines: list[bytes] = []
+        for record in records:
+            try:
+                lines.append(dumps_line(get_attributes(record)))
+            except RecursionError:
+                raise
+            except Exception:
+                if on_error is None:
+                    raise
+                on_error(record)
+                continue
+            lines.append(b"\n")
+        return b"".join(lines)
+
+    def _dumps_line(self, attributes: dict[str, Any]) -> bytes:
+        if not self._static_prefix_bytes:
+            return self.dumps_bytes(attributes)
+        elif attributes and self._static_keys.isdisjoint(attributes):
+            return self._static_prefix_bytes + memoryview(self.dumps_bytes(attributes))[1:]
+        else:
+            # Attributes of the record override the static attributes
+            return self.dumps_bytes({**self._static_attributes, **attributes})
+
+    def dumps(self, attributes: dict[str, Any]) -> str:
+        # Limits in bytes measure UTF-8, so the characters are not escaped, or the line could be 6 times larger
+        return json.dumps(attributes, ensure_ascii=self.size_unit != "bytes")
+
+    def dumps_bytes(self, attributes: dict[str, Any]) -> bytes:
+        # Lone surrogates become \udcxx, the same JSON escape as with ensure_ascii
+        return self.dumps(attributes).encode("utf-8", "backslashreplace")
 
     def format_timestamp(self, record: LogRecord):
-        return datetime.fromtimestamp(record.created).isoformat()
+        return self.timestamp_formatter.format(record.created)
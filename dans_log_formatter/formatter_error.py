@@ -1,5 +1,7 @@
+import sys
+from contextvars import ContextVar
 from types import TracebackType
-from typing import NamedTuple, Union
+from typing import NamedTuple, Optional, Union
 
 ExecInfo = tuple[type[BaseException], BaseException, TracebackType]
 
@@ -7,3 +9,19 @@ ExecInfo = tuple[type[BaseException], BaseException, TracebackType]
 class FormatterError(NamedTuple):
     message: str
     exc_info: Union[ExecInfo, tuple[None, None, None]] = (None, None, None)
+
+
+# Errors of the log record currently being formatted. Each format() call sets its own list,
+# so errors never leak between records, threads or asyncio tasks.
+current_errors: ContextVar[Optional[list[FormatterError]]] = ContextVar("formatter_errors", default=None)
+
+
+def record_error(message: str) -> None:
+    errors = current_errors.get()
+    if errors is not None:
+        errors.append(FormatterError(message, sys.exc_info()))
+
+
+def get_current_errors() -> list[FormatterError]:
+    errors = current_errors.get()
+    return errors if errors is not None else []
@@ -0,0 +1,193 @@
+import copy
+import random
+import threading
+from logging import NOTSET, WARNING, Formatter, LogRecord
+from queue import Empty, Full, Queue
+from typing import Any, BinaryIO, Literal, Optional, Union
+
+from dans_log_formatter.formatter import captured_snapshots
+from dans_log_formatter.handlers.stream import BytesStreamHandler
+from dans_log_formatter.record_attributes import MESSAGE_OMITTED_ATTRIBUTE
+
+DEFAULT_MAX_QUEUE_SIZE = 10_000
+DEFAULT_BATCH_SIZE = 500
+
+OverflowPolicy = Literal["block", "drop", "sample"]
+# A queued record, with its snapshot taken by the formatter's capture(), if any
+QueueItem = tuple[LogRecord, Any]
+
+_DEFAULT_FORMATTER = Formatter()
+
+
+class BackgroundStreamHandler(BytesStreamHandler):
+    """
+    Format and write log records on a background thread, in batches joined into a single write().
+    The caller only captures the providers' snapshots (see TextLogFormatter.capture()), queued along with the
+    record, so providers reading context bound state (ContextProvider, FastAPIRequestProvider, CeleryTaskProvider,
+    etc.) still see the values of the logging call site. Like QueueHandler.prepare(), the caller also merges the
+    message arguments into the message and formats the exception, so arguments mutated after the logging call are
+    not rendered late.
+
+    When the queue is full, the overflow policy decides what happens:
+        * "block" - wait for room in the queue
+        * "drop" - drop the record
+        * "sample" - from half full, keep records below WARNING with a probability of the remaining capacity,
+                     and wait for room for WARNING and above
+
+    Remaining records are written when the handler is closed (logging.shutdown() closes it on exit).
+
+    Example:
+        handler = BackgroundStreamHandler(sys.stdout.buffer, overflow="drop")
+        handler.setFormatter(OrJsonLogFormatter([ContextProvider()]))
+    """
+
+    def __init__(
+        self,
+        stream: Union[BinaryIO, int, None] = None,
+        level: int = NOTSET,
+        *,
+        max_queue_size: int = DEFAULT_MAX_QUEUE_SIZE,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        overflow: OverflowPolicy = "block",
+    ):
+        super().__init__(stream, level)
+        self.max_queue_size = max_queue_size
+        self.batch_size = batch_size
+        self.overflow = overflow
+        self.dropped = 0  # Only counted in emit(), which runs with the handler's lock held
+        self._closed = False
+        self.queue: Queue[Optional[QueueItem]] = Queue(max_queue_size)
+        self._thread = threading.Thread(target=self._run, name=f"{self.__class__.__name__}-worker", daemon=True)
+        self._thread.start()
+
+    def emit(self, record: LogRecord) -> None:
+        # Called with the handler's lock held by handle(), like close(), so no record is queued after the worker stops
+        if self._closed:
+            # The background thread is stopped, write synchronously
+            super().emit(record)
+            return
+
+        if self.overflow == "block":
+            self.queue.put(self._capture(record))
+        elif self.overflow == "drop":
+            self._put_or_drop(record)
+        elif record.levelno >= WARNING:
+            self.queue.put(self._capture(record))
+        elif self._should_sample():
+            self._put_or_drop(record)
+        else:
+            self._count_dropped()
+
+    def _capture(self, record: LogRecord) -> QueueItem:
+        try:
+            record = self.prepare(record)
+            if self.formatter is not None and (capture := getattr(self.formatter, "capture", None)) is not None:
+                return record, capture(record)
+        except Exception:  # noqa BLE001
+            self.handleError(record)
+        return record, None
+
+    def prepare(self, record: LogRecord) -> LogRecord:
+        """
+        Render the parts of the record that can change after the logging call, on the calling thread, into a copy
+        queued instead of the record, which the following handlers still see unchanged (like QueueHandler.prepare()).
+        The message arguments are merged into the message, and the exception is formatted into exc_text. exc_info is
+        kept, for formatters rendering structured or deduplicated errors from the exception.
+        """
+        formatter = self.formatter or _DEFAULT_FORMATTER
+        if not record.args and not (record.exc_info and not record.exc_text):
+            return record
+
+        record = copy.copy(record)
+        if record.args:
+            render_message = getattr(formatter, "render_message", None)
+            if render_message is not None:
+                record.msg, omitted = render_message(record)
+                if omitted:
+                    # Reported by the formatter when the message is truncated
+                    setattr(record, MESSAGE_OMITTED_ATTRIBUTE, omitted)
+            else:
+                record.msg = record.getMessage()
+            record.args = None
+        if record.exc_info and not record.exc_text:
+            get_exception_text = getattr(formatter, "get_exception_text", formatter.formatException)
+            record.exc_text = get_exception_text(record.exc_info)
+        return record
+
+    def _put_or_drop(self, record: LogRecord) -> None:
+        if self.queue.full():
+            self._count_dropped()
+            return
+
+        item = self._capture(record)
+        try:
+            self.queue.put_nowait(item)
+        except Full:
+            self._count_dropped()
+
+    def _count_dropped(self) -> None:
+        self.dropped += 1
+
+    def _should_sample(self) -> bool:
+        threshold = self.max_queue_size // 2
+        size = self.queue.qsize()
+        if size <= threshold:
+            return True
+
+        return random.random() < (self.max_queue_size - size) / (self.max_queue_size - threshold)
+
+    def _run(self) -> None:
+        while True:
+            item = self.queue.get()
+            batch = [item]
+            while item is not None and len(batch) < self.batch_size:
+                try:
+                    item = self.queue.get_nowait()
+                except Empty:
+                    break
+                batch.append(item)
+
+            try:
+                self._write_batch([item for item in batch if item is not None])
+            finally:
+                for _ in batch:
+                    self.queue.task_done()
+
+            if batch[-1] is None:
+                return
+
+    def _write_batch(self, items: list[QueueItem]) -> None:
+        if not items:
+            return
+
+        batch = [record for record, _ in items]
+        token = captured_snapshots.set({id(record): snapshot for record, snapshot in items if snapshot is not None})
+        try:
+            # Failing records are reported and left out by format_batch(), the others are formatted once
+            data = self.format_batch(batch)
+            if data:
+                self.write(data)
+        except Exception:  # noqa BLE001
+            self.handleError(batch[-1])
+        finally:
+            captured_snapshots.reset(token)
+
+    def flush(self) -> None:
+        if not self._closed:
+            self.queue.join()
+        super().flush()
+
+    def close(self) -> None:
+        self.acquire()
+        try:
+            # With the lock held, no emit() can queue a record after the sentinel
+            stopping = not self._closed
+            if stopping:
+                self._closed = True
+                self.queue.put(None)
+        finally:
+            self.release()
+
+        if stopping:
+            self._thread.join()
+        super().close()
@@ -0,0 +1,187 @@
+import os
+import threading
+import time
+from logging import NOTSET, LogRecord
+from pathlib import Path
+from typing import Literal, Optional, Union
+
+from dans_log_formatter.handlers.stream import BytesStreamHandler
+
+DEFAULT_BUFFER_SIZE = 64 * 1024
+DEFAULT_FLUSH_INTERVAL = 1.0
+DEFAULT_BACKUP_COUNT = 5
+
+FsyncPolicy = Literal["never", "rotate", "flush"]
+
+
+class JsonLinesFileHandler(BytesStreamHandler):
+    """
+    Write log records as JSON lines to a file, buffered and rotated by size or time.
+    A companion of the JsonLogFormatter, whose format_bytes() output is written without a str round trip.
+
+    The handler counts the bytes it writes, so rotation never needs a tell() or stat() per record, and lines are
+    buffered whole, so a line is never split across files. A line larger than `max_bytes` gets a file of its own.
+
+    * `max_bytes` - Rotate before the file exceeds this size (default `None`, no size rotation)
+    * `interval` - Rotate every this many seconds, by the records' creation time (default `None`, no time rotation)
+    * `backup_count` - Rotated files kept as `<filename>.1` (newest) to `<filename>.<backup_count>` (default `5`),
+                       `0` keeps every rotated file, as `<filename>.<rotation time>`
+    * `buffer_size` - Write when this many bytes are buffered (default `65536`, `0` writes every record)
+    * `flush_interval` - Write the buffer every this many seconds from a daemon thread (default `1.0`, `None` never)
+    * `fsync` - `"never"` (default), `"rotate"` before a file is rotated or closed, or `"flush"` after every write
+
+    Example:
+        handler = JsonLinesFileHandler("/var/log/app/app.jsonl", max_bytes=100 * 1024 * 1024, interval=3600)
+        handler.setFormatter(OrJsonLogFormatter([ContextProvider()]))
+    """
+
+    def __init__(
+        self,
+        filename: Union[str, os.PathLike],
+        level: int = NOTSET,
+        *,
+        max_bytes: Optional[int] = None,
+        interval: Optional[float] = None,
+        backup_count: int = DEFAULT_BACKUP_COUNT,
+        buffer_size: int = DEFAULT_BUFFER_SIZE,
+        flush_interval: Optional[float] = DEFAULT_FLUSH_INTERVAL,
+        fsync: FsyncPolicy = "never",
+    ):
+        self.filename = Path(filename).absolute()
+        self.max_bytes = max_bytes
+        self.interval = interval
+        self.backup_count = backup_count
+        self.buffer_size = buffer_size
+        self.flush_interval = flush_interval
+        self.fsync = fsync
+        self._buffer: list[bytes] = []
+        self._buffered = 0  # Bytes in the buffer
+        self._size = 0  # Bytes of the current file, including the buffer
+        self._rollover_at: Optional[float] = None
+        self._closed = False
+        super().__init__(self._open(), level)
+
+        self._stop = threading.Event()
+        if flush_interval is not None:
+            threading.Thread(target=self._run_flusher, name=f"{self.__class__.__name__}-flusher", daemon=True).start()
+
+    def _open(self) -> int:
+        fd = os.open(self.filename, os.O_WRONLY | os.O_CREAT | os.O_APPEND | getattr(os, "O_BINARY", 0), 0o644)
+        self._size = os.fstat(fd).st_size  # Once per file, counted from here on
+        self._rollover_at = time.time() + self.interval if self.interval is not None else None
+        return fd
+
+    def emit(self, record: LogRecord) -> None:
+        try:
+            line = self.format_bytes(record) + self.terminator
+            if self._closed:
+                # Closed handlers write synchronously, like the BackgroundStreamHandler, and never rotate
+                self._write_closed(line)
+                return
+
+            if self._size and (
+                (self.max_bytes is not None and self._size + len(line) > self.max_bytes)
+                or (self._rollover_at is not None and record.created >= self._rollover_at)
+            ):
+                try:
+                    self.rotate()
+                except RecursionError:
+                    raise
+                except Exception:  # noqa BLE001
+                    self.handleError(record)  # Reported, and still written to the current file
+
+            self._buffer.append(line)
+            self._buffered += len(line)
+            self._size += len(line)
+            if self._buffered >= self.buffer_size or self._stop.is_set():
+                self._write_buffer()  # Unbuffered once closed, as the flusher is stopped
+        except RecursionError:
+            raise
+        except Exception:  # noqa BLE001
+            self.handleError(record)
+
+    def _write_buffer(self) -> None:
+        if not self._buffer:
+            return
+
+        data = b"".join(self._buffer)
+        self._buffer.clear()
+        self._buffered = 0
+        self.write(data)
+        if self.fsync == "flush":
+            os.fsync(self.stream)
+
+    def _write_closed(self, line: bytes) -> None:
+        fd = self._open()
+        try:
+            self.stream = fd
+            self.write(line)
+            if self.fsync != "never":
+                os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    def rotate(self) -> None:
+        """
+        Shift the backups, open a new file and close the previous one. Called with the handler's lock held.
+        When rotating fails, the handler keeps writing to the previous file, and tries again after another `max_bytes`
+        or `interval`.
+        """
+        self._write_buffer()
+        if self.fsync != "never":
+            os.fsync(self.stream)
+
+        try:
+            if self.backup_count > 0:
+                for index in range(self.backup_count - 1, 0, -1):
+                    backup = self.filename.with_name(f"{self.filename.name}.{index}")
+                    if backup.exists():
+                        backup.replace(self.filename.with_name(f"{self.filename.name}.{index + 1}"))
+                self.filename.replace(self.filename.with_name(f"{self.filename.name}.1"))
+            else:
+                self.filename.replace(self._get_timestamped_name())
+            fd = self._open()
+        except OSError:
+            self._size = 0
+            self._rollover_at = time.time() + self.interval if self.interval is not None else None
+            raise
+
+        previous, self.stream = self.stream, fd
+        os.close(previous)  # type: ignore[arg-type]
+
+    def _get_timestamped_name(self) -> Path:
+        name = f"{self.filename.name}.{time.strftime('%Y-%m-%d_%H-%M-%S')}"
+        backup = self.filename.with_name(name)
+        index = 1
+        while backup.exists():
+            # Rotated more than once in the same second
+            backup = self.filename.with_name(f"{name}.{index}")
+            index += 1
+        return backup
+
+    def _run_flusher(self) -> None:
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+
+    def flush(self) -> None:
+        self.acquire()
+        try:
+            if not self._closed:
+                self._write_buffer()
+        finally:
+            self.release()
+
+    def close(self) -> None:
+        # The flusher is not joined, as logging.shutdown() closes handlers with their lock held
+        self._stop.set()
+        self.acquire()
+        try:
+            if not self._closed:
+                self._write_buffer()
+                if self.fsync != "never":
+                    os.fsync(self.stream)
+                os.close(self.stream)  # type: ignore[arg-type]
+                self._closed = True
+        finally:
+            self.release()
+        super().close()
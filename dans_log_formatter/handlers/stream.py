@@ -0,0 +1,77 @@
+import os
+import sys
+from logging import NOTSET, Handler, LogRecord
+from typing import BinaryIO, Union
+
+
+class BytesStreamHandler(Handler):
+    """
+    Write log records as bytes to a binary stream or a file descriptor.
+    When the formatter has a format_bytes() method (like JsonLogFormatter), its output is written as-is,
+    skipping the str decode and encode round trip of the logging.StreamHandler.
+
+    Example:
+        handler = BytesStreamHandler(sys.stdout.buffer)
+        handler.setFormatter(OrJsonLogFormatter())
+    """
+
+    terminator = b"\n"
+
+    def __init__(self, stream: Union[BinaryIO, int, None] = None, level: int = NOTSET):
+        super().__init__(level)
+        self.stream: Union[BinaryIO, int] = sys.stderr.buffer if stream is None else stream
+
+    def format_bytes(self, record: LogRecord) -> bytes:
+        formatter = self.formatter
+        if formatter is not None and (format_bytes := getattr(formatter, "format_bytes", None)) is not None:
+            return format_bytes(record)
+
+        return self.format(record).encode("utf-8")
+
+    def format_batch(self, records: list[LogRecord]) -> bytes:
+        """
+        Format records into a single buffer, each ending with the terminator.
+        A record failing to format is reported with handleError() and left out.
+        """
+        formatter = self.formatter
+        if (
+            self.terminator == b"\n"
+            and formatter is not None
+            and (format_batch := getattr(formatter, "format_batch", None)) is not None
+        ):
+            return format_batch(records, on_error=self.handleError)
+
+        lines = []
+        for record in records:
+            try:
+                lines.append(self.format_bytes(record) + self.terminator)
+            except RecursionError:
+                raise
+            except Exception:  # noqa BLE001
+                self.handleError(record)
+        return b"".join(lines)
+
+    def emit(self, record: LogRecord) -> None:
+        try:
+            self.write(self.format_bytes(record) + self.terminator)
+        except RecursionError:
+            raise
+        except Exception:  # noqa BLE001
+            self.handleError(record)
+
+    def write(self, data: bytes) -> None:
+        if isinstance(self.stream, int):
+            view = memoryview(data)
+            while view:
+                view = view[os.write(self.stream, view) :]
+        else:
+            self.stream.write(data)
+            self.stream.flush()
+
+    def flush(self) -> None:
+        self.acquire()
+        try:
+            if not isinstance(self.stream, int) and hasattr(self.stream, "flush"):
+                self.stream.flush()
+        finally:
+            self.release()
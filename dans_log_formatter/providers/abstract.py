@@ -1,21 +1,90 @@
-import sys
 from abc import ABC, abstractmethod
-from logging import LogRecord
-from typing import Any, Optional
+from collections.abc import Mapping
+from logging import NOTSET, LogRecord
+from typing import Any, Optional, TypeVar
 
-from dans_log_formatter.formatter_error import FormatterError
+from dans_log_formatter.formatter_error import FormatterError, get_current_errors, record_error
+
+P = TypeVar("P", bound="AbstractProvider")
 
 
 class AbstractProvider(ABC):
-    def __init__(self):
-        self._formatter_errors: list[FormatterError] = []
+    # Seconds a call may take before it counts as a failure of a ProviderCircuitBreaker, None for the breaker's budget
+    time_budget: Optional[float] = None
+    # Records the provider runs for, see when()
+    min_level: int = NOTSET
+    include_loggers: tuple[str, ...] = ()
+    exclude_loggers: tuple[str, ...] = ()
 
     @abstractmethod
     def get_attributes(self, record: LogRecord) -> Optional[dict[str, Any]]:
         raise NotImplementedError()
 
+    def when(
+        self: P,
+        *,
+        min_level: Optional[int] = None,
+        include_loggers: Optional[tuple[str, ...]] = None,
+        exclude_loggers: Optional[tuple[str, ...]] = None,
+    ) -> P:
+        """
+        Run the provider only for records of min_level and above, from the included loggers (all when empty) and not
+        from the excluded loggers. Loggers match by name and parent names, like "myapp" matches "myapp.views".
+        The formatter resolves the providers once per logger name and level, so gated providers cost nothing for the
+        records they skip.
+
+        Example:
+            CeleryTaskProvider(include_args=True).when(min_level=logging.WARNING, include_loggers=("myapp.tasks",))
+        """
+        if min_level is not None:
+            self.min_level = min_level
+        if include_loggers is not None:
+            self.include_loggers = tuple(include_loggers)
+        if exclude_loggers is not None:
+            self.exclude_loggers = tuple(exclude_loggers)
+        return self
+
+    def is_gated(self) -> bool:
+        return self.min_level > NOTSET or bool(self.include_loggers) or bool(self.exclude_loggers)
+
+    def applies_to(self, name: str, levelno: int) -> bool:
+        """Whether the provider runs for records of the logger name and level."""
+        if levelno < self.min_level:
+            return False
+        if self.include_loggers and not _matches_logger(name, self.include_loggers):
+            return False
+        return not (self.exclude_loggers and _matches_logger(name, self.exclude_loggers))
+
+    def capture(self, record: LogRecord) -> Any:
+        """
+        Take a snapshot on the logging thread, of plain data copied from the state the attributes are built from.
+        Providers reading thread or context bound state must capture it here, so it is not lost when the record
+        is formatted later or on another thread. Everything else is deferred to render().
+        By default, the attributes are built here, and their containers are copied.
+        """
+        return copy_snapshot(self.get_attributes(record))
+
+    def render(self, record: LogRecord, snapshot: Any) -> Optional[Mapping[str, Any]]:  # noqa ARG002
+        """Render the attributes from a snapshot taken by capture(), wherever the record is formatted."""
+        return snapshot
+
     def record_error(self, message: str) -> None:
-        self._formatter_errors.append(FormatterError(message, sys.exc_info()))
+        """Add an error to the formatter_errors attribute of the log record currently being formatted."""
+        record_error(message)
 
     def get_errors(self) -> list[FormatterError]:
-        return self._formatter_errors
+        """Errors recorded so far for the log record currently being formatted."""
+        return get_current_errors()
+
+
+def _matches_logger(name: str, loggers: tuple[str, ...]) -> bool:
+    return any(name == logger or name.startswith(f"{logger}.") for logger in loggers)
+
+
+def copy_snapshot(value: Any) -> Any:
+    """Copy the dicts, lists, tuples and sets of a value recursively, so later mutations are not rendered."""
+    if isinstance(value, dict):
+        return {key: copy_snapshot(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return type(value)(copy_snapshot(item) for item in value)
+    return value
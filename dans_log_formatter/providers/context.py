@@ -32,7 +32,7 @@ class ContextProvider(AbstractContextProvider):
 def inject_log_context(attributes: dict[str, Any], /, *, override: bool = False):
     original_context = _context.get()
     if original_context is None:
-        context = attributes
+        context = attributes.copy()
     else:
         context = original_context.copy()
         if not override and (existing_attributes := set(original_context).intersection(set(attributes))):
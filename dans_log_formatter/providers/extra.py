@@ -1,7 +1,23 @@
-from logging import LogRecord
+from collections.abc import Mapping
+from logging import Logger, LogRecord
 from typing import Any, ClassVar, Optional
 
 from dans_log_formatter.providers.abstract import AbstractProvider
+from dans_log_formatter.record_attributes import (
+    EXTRA_KEYS_ATTRIBUTE,
+    MESSAGE_OMITTED_ATTRIBUTE,
+    SAMPLE_RATE_ATTRIBUTE,
+)
+
+# Attributes of a fresh LogRecord on the running interpreter, plus the ones added while handling it
+BUILTIN_ATTRIBUTES = frozenset(LogRecord("", 0, "", 0, "", (), None).__dict__) | {
+    "message",
+    "asctime",
+    "taskName",
+    SAMPLE_RATE_ATTRIBUTE,
+    EXTRA_KEYS_ATTRIBUTE,
+    MESSAGE_OMITTED_ATTRIBUTE,
+}
 
 
 class ExtraProvider(AbstractProvider):
@@ -12,39 +28,53 @@ class ExtraProvider(AbstractProvider):
         logger.info("message", extra={"attribute": "value"})
     """
 
-    builtin_attrs: ClassVar[set[str]] = {
-        "args",
-        "asctime",
-        "created",
-        "exc_info",
-        "exc_text",
-        "filename",
-        "funcName",
-        "levelname",
-        "levelno",
-        "lineno",
-        "module",
-        "msecs",
-        "message",
-        "msg",
-        "name",
-        "pathname",
-        "process",
-        "processName",
-        "relativeCreated",
-        "stack_info",
-        "thread",
-        "threadName",
-        "taskName",
-    }
+    builtin_attrs: ClassVar[frozenset[str]] = BUILTIN_ATTRIBUTES
 
     def extract_extra(self, record: LogRecord) -> dict:
-        return {
-            attr_name: record.__dict__[attr_name]
-            for attr_name in record.__dict__
-            if attr_name not in self.builtin_attrs
-        }
+        record_dict = record.__dict__
+        if (extra_keys := record_dict.get(EXTRA_KEYS_ATTRIBUTE)) is not None:
+            # Captured by ExtraLogger.makeRecord()
+            return {key: record_dict[key] for key in extra_keys if key in record_dict}
+
+        if record_dict.keys() <= self.builtin_attrs:
+            return {}
+
+        return {key: value for key, value in record_dict.items() if key not in self.builtin_attrs}
 
     def get_attributes(self, record: LogRecord) -> Optional[dict[str, Any]]:
         extra = self.extract_extra(record)
         return extra if extra else None
+
+    def capture(self, record: LogRecord) -> Any:  # noqa ARG002
+        return None  # Read from the record only, so everything is deferred to render()
+
+    def render(self, record: LogRecord, snapshot: Any) -> Optional[Mapping[str, Any]]:  # noqa ARG002
+        return self.get_attributes(record)
+
+
+class ExtraLogger(Logger):
+    """
+    Logger capturing the keys of the extra argument when the record is made, so ExtraProvider does not need to scan
+    the record's attributes.
+    Attributes set on the record later (e.g. by filters) are not included.
+
+    Example:
+        logging.setLoggerClass(ExtraLogger)
+    """
+
+    def makeRecord(  # noqa N802
+        self,
+        name: str,
+        level: int,
+        fn: str,
+        lno: int,
+        msg: object,
+        args: Any,
+        exc_info: Any,
+        func: Optional[str] = None,
+        extra: Optional[Mapping[str, object]] = None,
+        sinfo: Optional[str] = None,
+    ) -> LogRecord:
+        record = super().makeRecord(name, level, fn, lno, msg, args, exc_info, func, extra, sinfo)
+        record.__dict__[EXTRA_KEYS_ATTRIBUTE] = tuple(extra) if extra else ()
+        return record
@@ -1,3 +1,4 @@
+from collections.abc import Mapping
 from logging import LogRecord
 from typing import Any, Optional
 
@@ -9,10 +10,15 @@ class RuntimeProvider(AbstractProvider):
     Add runtime information about thread, process and asyncio task to the log record.
     """
 
+    def __init__(self):
+        super().__init__()
+        # (processName, process, formatted) - the process rarely changes, so it is formatted once
+        self._process_cache: tuple[Optional[str], Optional[int], str] = (None, None, "")
+
     def get_attributes(self, record: LogRecord) -> Optional[dict[str, Any]]:
         result = {}
         if record.process is not None:
-            result["process"] = f"{record.processName} ({record.process})"
+            result["process"] = self.format_process(record)
 
         if record.thread is not None:
             result["thread"] = f"{record.threadName} ({record.thread})"
@@ -21,3 +27,16 @@ class RuntimeProvider(AbstractProvider):
             result["task"] = task_name
 
         return result if result else None
+
+    def capture(self, record: LogRecord) -> Any:  # noqa ARG002
+        return None  # Read from the record only, so everything is deferred to render()
+
+    def render(self, record: LogRecord, snapshot: Any) -> Optional[Mapping[str, Any]]:  # noqa ARG002
+        return self.get_attributes(record)
+
+    def format_process(self, record: LogRecord) -> str:
+        process_name, process, formatted = self._process_cache
+        if process_name != record.processName or process != record.process:
+            formatted = f"{record.processName} ({record.process})"
+            self._process_cache = (record.processName, record.process, formatted)
+        return formatted
@@ -0,0 +1,8 @@
+# Attributes set on the log records by this package, so they are never mistaken for logger extra attributes
+
+# Sample rate of the records kept by a Sampler, emitted by the formatters as `sample_rate`
+SAMPLE_RATE_ATTRIBUTE = "_log_formatter_sample_rate"
+# Keys of the logger extra argument, set by ExtraLogger.makeRecord()
+EXTRA_KEYS_ATTRIBUTE = "_log_formatter_extra_keys"
+# Characters left out of the message arguments, when they were merged by BackgroundStreamHandler.prepare()
+MESSAGE_OMITTED_ATTRIBUTE = "_log_formatter_message_omitted"
@@ -0,0 +1,197 @@
+import copy
+import random
+import sys
+import threading
+import time
+import zlib
+from collections import Counter
+from collections.abc import Mapping
+from contextvars import ContextVar
+from logging import WARNING, Filter, LogRecord
+from typing import Any, Callable, Optional
+
+from dans_log_formatter.bounded_dict import BoundedDict
+from dans_log_formatter.providers.abstract import AbstractProvider
+from dans_log_formatter.providers.abstract_context import AbstractContextProvider
+from dans_log_formatter.record_attributes import SAMPLE_RATE_ATTRIBUTE
+
+DEFAULT_CALL_SITES_LIMIT = 4096
+# Since Python 3.12, a filter may return a record to use instead for the rest of its handler's (or logger's) handling
+_FILTER_RETURNS_RECORD = sys.version_info >= (3, 12)
+
+SampleKey = Callable[[LogRecord], Any]
+
+
+def attribute_key(provider: AbstractProvider, attribute: str) -> SampleKey:
+    """
+    Sample by an attribute of a provider, so all the records of the same request, task, etc. are kept or dropped
+    together. The key of a context provider whose context value is a dict (like the ContextProvider's) is read from
+    the value directly, and records outside of a context get no key, without calling the provider. For other context
+    values (like a request), prefer context_key(), as the provider builds all of its attributes for every record.
+
+    Example:
+        Sampler({logging.INFO: 0.1}, key=attribute_key(ContextProvider(), "request_id"))
+        Sampler({logging.INFO: 0.1}, key=attribute_key(CeleryTaskProvider(), "task.id"))
+    """
+    if isinstance(provider, AbstractContextProvider):
+        context = provider.context
+
+        def get_context_key(record: LogRecord) -> Any:
+            value = context.get()
+            if value is None:
+                return None
+            if isinstance(value, Mapping):
+                return value.get(attribute)
+            attributes = provider.get_context_attributes(record, value)
+            return attributes.get(attribute) if attributes else None
+
+        return get_context_key
+
+    def get_key(record: LogRecord) -> Any:
+        attributes = provider.get_attributes(record)
+        return attributes.get(attribute) if attributes else None
+
+    return get_key
+
+
+def context_key(context: ContextVar, get_key: Callable[[Any], Any]) -> SampleKey:
+    """
+    Sample by a part of a context value, read directly, so dropped records cost a context lookup and no provider
+    call. Records outside of a context get no key.
+
+    Example:
+        Sampler({logging.INFO: 0.1}, key=context_key(django_request_context, lambda r: r.headers.get("x-request-id")))
+    """
+
+    def get_context_key(record: LogRecord) -> Any:  # noqa ARG001
+        value = context.get()
+        return get_key(value) if value is not None else None
+
+    return get_context_key
+
+
+class Sampler(Filter):
+    """
+    Drop records before they are formatted, keeping DEBUG and INFO volume affordable under load.
+    Add it to a handler (or logger) with addFilter(), so dropped records are never formatted.
+
+    Records at always_keep_level (WARNING by default) and above are always kept. Below it, records go through:
+        * Probabilistic sampling - keep records with the rate of their logger (`logger_rates`, matched by name and
+          parent names) or else their level (`level_rates`). With a `key`, the decision is made by a hash of the key,
+          so records sharing it (e.g. the same request id) are kept or dropped together.
+        * Rate limiting - keep up to `rate_limit` records per second per call site (pathname:lineno), with bursts up
+          to `burst` records, using a token bucket.
+
+    Kept records get a `sample_rate` attribute when sampled, on a copy seen only by the handler of the filter since
+    Python 3.12, and on the record itself (seen by all the handlers of its logger) before. Dropped records are counted
+    in `dropped` by reason. A key that raises is counted in `key_errors`, and its record is sampled at random.
+
+    Example:
+        handler.addFilter(Sampler({logging.DEBUG: 0.01, logging.INFO: 0.1}, {"noisy.module": 0.001}, rate_limit=100))
+    """
+
+    def __init__(
+        self,
+        level_rates: Optional[dict[int, float]] = None,
+        logger_rates: Optional[dict[str, float]] = None,
+        *,
+        always_keep_level: int = WARNING,
+        key: Optional[SampleKey] = None,
+        rate_limit: Optional[float] = None,
+        burst: Optional[float] = None,
+        call_sites_limit: int = DEFAULT_CALL_SITES_LIMIT,
+    ):
+        super().__init__()
+        self.level_rates = level_rates or {}
+        self.logger_rates = logger_rates or {}
+        self.always_keep_level = always_keep_level
+        self.key = key
+        self.rate_limit = rate_limit
+        self.burst = burst if burst is not None else rate_limit
+        self.dropped: Counter[str] = Counter()
+        self.key_errors = 0
+        self._lock = threading.Lock()
+        # Rates resolved per (logger name, level)
+        self._rates: BoundedDict[tuple[str, int], float] = BoundedDict(call_sites_limit)
+        # Call site -> (tokens, last refill time)
+        self._buckets: BoundedDict[str, tuple[float, float]] = BoundedDict(call_sites_limit)
+
+    @property
+    def call_sites_limit(self) -> int:
+        return self._buckets.limit
+
+    @call_sites_limit.setter
+    def call_sites_limit(self, call_sites_limit: int) -> None:
+        self._rates.limit = self._buckets.limit = call_sites_limit
+
+    def filter(self, record: LogRecord) -> bool:
+        if record.levelno >= self.always_keep_level:
+            return True
+
+        rate = self.get_rate(record)
+        if rate < 1 and not self._should_keep(record, rate):
+            self._count("sampled")
+            return False
+
+        if self.rate_limit is not None and not self._take_token(f"{record.pathname}:{record.lineno}"):
+            self._count("rate_limited")
+            return False
+
+        if rate < 1:
+            if _FILTER_RETURNS_RECORD:
+                # The handler (or logger) of this filter goes on with the copy, so the record seen by the other
+                # handlers never gets the sample rate
+                record = copy.copy(record)
+                record.__dict__[SAMPLE_RATE_ATTRIBUTE] = rate
+                return record  # type: ignore[return-value]
+            record.__dict__[SAMPLE_RATE_ATTRIBUTE] = rate
+        return True
+
+    def get_rate(self, record: LogRecord) -> float:
+        cache_key = (record.name, record.levelno)
+        rate = self._rates.get(cache_key)
+        if rate is None:
+            rate = self._resolve_rate(record.name, record.levelno)
+            self._rates[cache_key] = rate
+        return rate
+
+    def _resolve_rate(self, name: str, levelno: int) -> float:
+        logger_name: Optional[str] = name
+        while logger_name:
+            if logger_name in self.logger_rates:
+                return self.logger_rates[logger_name]
+            logger_name = logger_name.rpartition(".")[0]
+
+        return self.level_rates.get(levelno, 1.0)
+
+    def _should_keep(self, record: LogRecord, rate: float) -> bool:
+        if self.key is not None and (key := self._get_key(record)) is not None:
+            # Deterministic, so every record with the same key gets the same decision
+            return zlib.crc32(str(key).encode("utf-8")) / 0x1_0000_0000 < rate
+        return random.random() < rate
+
+    def _get_key(self, record: LogRecord) -> Any:
+        try:
+            return self.key(record)  # type: ignore[misc]
+        except Exception:  # noqa BLE001
+            # A filter must never raise into the logging call, the record is sampled at random instead
+            with self._lock:
+                self.key_errors += 1
+            return None
+
+    def _take_token(self, call_site: str) -> bool:
+        now = time.monotonic()
+        burst = self.burst or 0
+        with self._lock:
+            tokens, last = self._buckets.get(call_site, (burst, now))
+            tokens = min(burst, tokens + (now - last) * (self.rate_limit or 0))
+            if tokens < 1:
+                self._buckets[call_site] = (tokens, now)
+                return False
+
+            self._buckets[call_site] = (tokens - 1, now)
+            return True
+
+    def _count(self, reason: str) -> None:
+        with self._lock:
+            self.dropped[reason] += 1
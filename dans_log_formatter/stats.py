@@ -0,0 +1,227 @@
+import threading
+import time
+from collections import Counter
+from functools import wraps
+from typing import Any, Callable, ClassVar, TypeVar
+
+from dans_log_formatter.formatter_error import current_errors
+
+# Upper bounds of the latency histogram buckets, in seconds
+HISTOGRAM_BUCKETS = (1e-6, 5e-6, 1e-5, 5e-5, 1e-4, 5e-4, 1e-3, 5e-3, 1e-2, 5e-2, 0.1, 0.5, 1.0)
+_HISTOGRAM_BUCKETS_NS = tuple(int(bucket * 1_000_000_000) for bucket in HISTOGRAM_BUCKETS)
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+class StageStats:
+    __slots__ = ("buckets", "calls", "errors", "output_size", "total_ns")
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.total_ns = 0
+        self.output_size = 0
+        self.buckets = [0] * (len(HISTOGRAM_BUCKETS) + 1)  # The last bucket is +Inf
+
+    def observe(self, duration_ns: int, errors: int) -> None:
+        self.calls += 1
+        self.errors += errors
+        self.total_ns += duration_ns
+        for index, bound in enumerate(_HISTOGRAM_BUCKETS_NS):
+            if duration_ns <= bound:
+                self.buckets[index] += 1
+                return
+        self.buckets[-1] += 1
+
+    def merge(self, other: "StageStats") -> None:
+        self.calls += other.calls
+        self.errors += other.errors
+        self.total_ns += other.total_ns
+        self.output_size += other.output_size
+        for index, bucket in enumerate(other.buckets):
+            self.buckets[index] += bucket
+
+    def snapshot(self) -> dict[str, Any]:
+        histogram = {}
+        count = 0
+        for bound, bucket in zip((*HISTOGRAM_BUCKETS, "+Inf"), self.buckets):
+            count += bucket
+            histogram[str(bound)] = count
+
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "seconds": self.total_ns / 1_000_000_000,
+            "histogram": histogram,  # Cumulative, like Prometheus histograms
+        }
+
+
+class _ThreadStats:
+    """Counters of a single thread, only written by that thread, so counting takes no lock."""
+
+    __slots__ = ("formatter_errors", "stages", "thread", "truncations")
+
+    def __init__(self, thread: threading.Thread):
+        self.thread = thread
+        self.stages: dict[str, StageStats] = {}
+        self.truncations: Counter[str] = Counter()
+        self.formatter_errors = 0
+
+    def merge(self, other: "_ThreadStats") -> None:
+        # Copied first, as the other thread may add a stage or an attribute meanwhile
+        for stage, stage_stats in list(other.stages.items()):
+            self.stages.setdefault(stage, StageStats()).merge(stage_stats)
+        self.truncations.update(dict(other.truncations))
+        self.formatter_errors += other.formatter_errors
+
+
+class FormatterStats:
+    """
+    Self-metrics of a formatter, collected when it is created with `collect_stats=True`.
+
+    Every stage (each provider, each attribute, error formatting, serialization and the whole format() call) counts
+    its calls, the formatter errors recorded while it ran (including raised exceptions), its cumulative time and a
+    latency histogram. The formatter also counts the size of its output, truncated attributes and formatter errors.
+
+    Each thread counts in its own counters, so the formatting threads never contend for a lock. snapshot() merges them.
+    """
+
+    # The size of the output of these stages, by unit
+    output_units: ClassVar[dict[str, str]] = {"format": "characters", "format_bytes": "bytes", "format_batch": "bytes"}
+
+    def __init__(self):
+        self._lock = threading.Lock()  # Only taken by snapshot(), and once per thread to register its counters
+        self._local = threading.local()
+        self._threads: list[_ThreadStats] = []
+        self._stage_names: dict[str, None] = {}  # Every timed stage, in order, so the stages never called are listed
+        self._finished = _ThreadStats(threading.main_thread())  # Counters of the threads that have finished
+
+    def _get_thread_stats(self) -> _ThreadStats:
+        thread_stats = getattr(self._local, "stats", None)
+        if thread_stats is None:
+            thread_stats = self._local.stats = _ThreadStats(threading.current_thread())
+            with self._lock:
+                # Merged once their thread is gone, so short-lived threads do not accumulate
+                for finished in [other for other in self._threads if not other.thread.is_alive()]:
+                    self._finished.merge(finished)
+                    self._threads.remove(finished)
+                self._threads.append(thread_stats)
+        return thread_stats
+
+    def timed(self, stage: str, function: F, *, count_output: bool = False) -> F:
+        """Wrap a function to time its calls as the stage."""
+        with self._lock:
+            self._stage_names.setdefault(stage, None)
+
+        stage_local = threading.local()  # The stage's counters of each thread, resolved once per thread
+
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            errors = current_errors.get()
+            errors_count = len(errors) if errors is not None else 0
+            start = time.perf_counter_ns()
+            try:
+                result = function(*args, **kwargs)
+            except BaseException:
+                duration = time.perf_counter_ns() - start
+                self._get_stage_stats(stage).observe(duration, 1)
+                raise
+
+            duration = time.perf_counter_ns() - start
+            try:
+                stage_stats = stage_local.stats
+            except AttributeError:
+                stage_stats = stage_local.stats = self._get_stage_stats(stage)
+            stage_stats.observe(duration, len(errors) - errors_count if errors is not None else 0)
+            if count_output:
+                stage_stats.output_size += len(result)
+            return result
+
+        return wrapper  # type: ignore[return-value]
+
+    def _get_stage_stats(self, stage: str) -> StageStats:
+        stages = self._get_thread_stats().stages
+        stage_stats = stages.get(stage)
+        if stage_stats is None:
+            stage_stats = stages[stage] = StageStats()
+        return stage_stats
+
+    def count_truncation(self, attribute_name: str) -> None:
+        self._get_thread_stats().truncations[attribute_name] += 1
+
+    def count_formatter_errors(self, count: int) -> None:
+        self._get_thread_stats().formatter_errors += count
+
+    def snapshot(self) -> dict[str, Any]:
+        total = _ThreadStats(threading.current_thread())
+        with self._lock:
+            for stage in self._stage_names:
+                total.stages[stage] = StageStats()
+            # Other threads may count meanwhile, so a snapshot may miss their latest calls
+            for thread_stats in (self._finished, *self._threads):
+                total.merge(thread_stats)
+
+        output = {"characters": 0, "bytes": 0}
+        for stage, unit in self.output_units.items():
+            if stage in total.stages:
+                output[unit] += total.stages[stage].output_size
+        return {
+            "stages": {stage: stage_stats.snapshot() for stage, stage_stats in total.stages.items()},
+            "output_characters": output["characters"],  # Of format()
+            "output_bytes": output["bytes"],  # Of format_bytes() and format_batch()
+            "truncations": dict(total.truncations),
+            "formatter_errors": total.formatter_errors,
+        }
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def render_prometheus(snapshot: dict[str, Any], prefix: str = "dans_log_formatter") -> str:
+    """Render a stats() snapshot in the Prometheus text exposition format."""
+    lines = [
+        f"# HELP {prefix}_stage_calls_total Calls of each formatter stage.",
+        f"# TYPE {prefix}_stage_calls_total counter",
+    ]
+    stages = [(_escape_label(stage), stage_stats) for stage, stage_stats in snapshot["stages"].items()]
+    lines += [f'{prefix}_stage_calls_total{{stage="{stage}"}} {stats["calls"]}' for stage, stats in stages]
+
+    lines += [
+        f"# HELP {prefix}_stage_errors_total Formatter errors recorded in each formatter stage.",
+        f"# TYPE {prefix}_stage_errors_total counter",
+    ]
+    lines += [f'{prefix}_stage_errors_total{{stage="{stage}"}} {stats["errors"]}' for stage, stats in stages]
+
+    lines += [
+        f"# HELP {prefix}_stage_seconds Latency of each formatter stage.",
+        f"# TYPE {prefix}_stage_seconds histogram",
+    ]
+    for stage, stats in stages:
+        lines += [
+            f'{prefix}_stage_seconds_bucket{{stage="{stage}",le="{bound}"}} {count}'
+            for bound, count in stats["histogram"].items()
+        ]
+        lines.append(f'{prefix}_stage_seconds_sum{{stage="{stage}"}} {stats["seconds"]}')
+        lines.append(f'{prefix}_stage_seconds_count{{stage="{stage}"}} {stats["calls"]}')
+
+    lines += [
+        f"# HELP {prefix}_output_characters_total Characters of the log lines formatted as text.",
+        f"# TYPE {prefix}_output_characters_total counter",
+        f"{prefix}_output_characters_total {snapshot['output_characters']}",
+        f"# HELP {prefix}_output_bytes_total Bytes of the log lines formatted as bytes.",
+        f"# TYPE {prefix}_output_bytes_total counter",
+        f"{prefix}_output_bytes_total {snapshot['output_bytes']}",
+        f"# HELP {prefix}_truncations_total Truncated attribute values.",
+        f"# TYPE {prefix}_truncations_total counter",
+    ]
+    lines += [
+        f'{prefix}_truncations_total{{attribute="{_escape_label(attribute)}"}} {count}'
+        for attribute, count in snapshot["truncations"].items()
+    ]
+    lines += [
+        f"# HELP {prefix}_formatter_errors_total Formatter errors added to log records.",
+        f"# TYPE {prefix}_formatter_errors_total counter",
+        f"{prefix}_formatter_errors_total {snapshot['formatter_errors']}",
+    ]
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,155 @@
+import builtins
+import linecache
+import traceback
+from collections import deque
+from types import TracebackType
+from typing import Optional
+
+DEFAULT_FRAME_LIMIT = 100
+DEFAULT_CHAIN_LIMIT = 5
+
+_CAUSE_MESSAGE = "The above exception was the direct cause of the following exception:"
+_CONTEXT_MESSAGE = "During handling of the above exception, another exception occurred:"
+_TRUNCATED = "...[TRUNCATED]"
+# Added in Python 3.11
+_BASE_EXCEPTION_GROUP: Optional[type] = getattr(builtins, "BaseExceptionGroup", None)
+
+
+class _StackWriter:
+    """Collect the stack parts until the size limit is reached, after which writes are ignored."""
+
+    def __init__(self, size_limit: Optional[int]):
+        self.size_limit = size_limit
+        self.parts: list[str] = []
+        self.size = 0
+        self.full = False
+
+    def write(self, text: str) -> None:
+        if self.full:
+            return
+
+        self.parts.append(text)
+        self.size += len(text)
+        if self.size_limit is not None and self.size > self.size_limit:
+            self.full = True
+
+    def getvalue(self) -> str:
+        stack = "".join(self.parts)
+        if self.full and self.size_limit is not None:
+            return stack[: self.size_limit - len(_TRUNCATED)] + _TRUNCATED
+        return stack[:-1] if stack.endswith("\n") else stack  # Like formatException(), without the trailing newline
+
+
+class StructuredErrorFormatter:
+    """
+    Format exceptions as the `error.kind`, `error.message` and `error.stack` attributes.
+
+    The stack is rendered like `logging.Formatter.formatException()`, but frame by frame, and stops once the size
+    limit is reached instead of rendering everything and truncating it.
+    Each exception in the chain (`__cause__` / `__context__`) and in an `ExceptionGroup` keeps up to `frame_limit`
+    frames (the outermost and innermost halves), and up to `chain_limit` chained or grouped exceptions are included.
+
+    Example:
+        JsonLogFormatter(structured_errors=StructuredErrorFormatter(frame_limit=50))
+    """
+
+    def __init__(self, frame_limit: int = DEFAULT_FRAME_LIMIT, chain_limit: int = DEFAULT_CHAIN_LIMIT):
+        self.frame_limit = frame_limit
+        self.chain_limit = chain_limit
+
+    def format_kind(self, exception: BaseException) -> str:
+        return type(exception).__qualname__
+
+    def format_message(self, exception: BaseException) -> str:
+        try:
+            return str(exception)
+        except Exception:  # noqa BLE001
+            return f"<exception str() failed for {type(exception).__qualname__}>"
+
+    def format_stack(
+        self, exception: BaseException, tb: Optional[TracebackType], size_limit: Optional[int]
+    ) -> tuple[str, bool]:
+        """Render the stack up to size_limit characters (None for unlimited), and whether it was truncated."""
+        writer = _StackWriter(size_limit)
+        self._write_chain(writer, exception, tb, "")
+        return writer.getvalue(), writer.full
+
+    def _write_chain(
+        self, writer: _StackWriter, exception: BaseException, tb: Optional[TracebackType], indent: str
+    ) -> None:
+        chain = [(exception, tb, "")]
+        seen = {id(exception)}
+        current = exception
+        while len(chain) < self.chain_limit:
+            if current.__cause__ is not None:
+                current, message = current.__cause__, _CAUSE_MESSAGE
+            elif current.__context__ is not None and not current.__suppress_context__:
+                current, message = current.__context__, _CONTEXT_MESSAGE
+            else:
+                break
+            if id(current) in seen:
+                break  # Cyclic chain
+            seen.add(id(current))
+            chain.append((current, current.__traceback__, message))
+
+        # Like the logging.Formatter, the first exception of the chain is rendered first
+        for index, (chained, chained_tb, _) in enumerate(reversed(chain)):
+            if writer.full:
+                return
+            if index:
+                writer.write(f"{indent}\n{indent}{chain[len(chain) - index][2]}\n{indent}\n")
+            self._write_exception(writer, chained, chained_tb, indent)
+
+    def _write_exception(
+        self, writer: _StackWriter, exception: BaseException, tb: Optional[TracebackType], indent: str
+    ) -> None:
+        if tb is not None:
+            writer.write(f"{indent}Traceback (most recent call last):\n")
+            self._write_frames(writer, tb, indent)
+
+        for line in traceback.format_exception_only(type(exception), exception):
+            writer.write(indent + line.rstrip("\n").replace("\n", f"\n{indent}") + "\n")
+
+        if _BASE_EXCEPTION_GROUP is not None and isinstance(exception, _BASE_EXCEPTION_GROUP):
+            sub_exceptions: tuple[BaseException, ...] = exception.exceptions  # type: ignore[attr-defined]
+            for index, sub_exception in enumerate(sub_exceptions):
+                if writer.full:
+                    return
+                if index >= self.chain_limit:
+                    writer.write(f"{indent}+---------------- ... ----------------\n")
+                    writer.write(f"{indent}| and {len(sub_exceptions) - index} more exceptions\n")
+                    return
+                writer.write(f"{indent}+---------------- {index + 1} ----------------\n")
+                self._write_chain(writer, sub_exception, sub_exception.__traceback__, f"{indent}| ")
+
+    def _write_frames(self, writer: _StackWriter, tb: TracebackType, indent: str) -> None:
+        head_limit = (self.frame_limit + 1) // 2
+        tail: deque[TracebackType] = deque(maxlen=self.frame_limit - head_limit)
+        omitted = 0
+        current: Optional[TracebackType] = tb
+        index = 0
+        while current is not None:
+            if index < head_limit:
+                self._write_frame(writer, current, indent)
+                if writer.full:
+                    return
+            else:
+                if len(tail) == tail.maxlen:
+                    omitted += 1
+                tail.append(current)  # Only kept, the innermost frames are rendered once the walk is done
+            current = current.tb_next
+            index += 1
+
+        if omitted:
+            writer.write(f"{indent}  ... {omitted} frames omitted ...\n")
+        for frame_tb in tail:
+            if writer.full:
+                return
+            self._write_frame(writer, frame_tb, indent)
+
+    def _write_frame(self, writer: _StackWriter, tb: TracebackType, indent: str) -> None:
+        code = tb.tb_frame.f_code
+        writer.write(f'{indent}  File "{code.co_filename}", line {tb.tb_lineno}, in {code.co_name}\n')
+        line = linecache.getline(code.co_filename, tb.tb_lineno, tb.tb_frame.f_globals).strip()
+        if line:
+            writer.write(f"{indent}    {line}\n")
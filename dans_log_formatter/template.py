@@ -0,0 +1,41 @@
+import re
+import string
+from collections.abc import Iterator
+from logging import PercentStyle, StrFormatStyle, StringTemplateStyle
+from typing import Any, Callable
+
+_PERCENT_FIELD = re.compile(r"%\((\w+)\)")
+_FIELD_ROOT = re.compile(r"[^.\[]*")
+
+
+class TextTemplate:
+    """
+    A logging format string parsed once, rendered from a mapping of values instead of the log record's attributes.
+
+    Fields are the root names referenced by the format string (e.g. "user" for "{user.name}"), so only the values
+    actually used need to be computed.
+    """
+
+    def __init__(self, style: PercentStyle):
+        self.fmt: str = style._fmt
+        if isinstance(style, StrFormatStyle):
+            self.fields = frozenset(self._parse_format_fields(self.fmt))
+            self.render: Callable[[dict[str, Any]], str] = self.fmt.format_map
+        elif isinstance(style, StringTemplateStyle):
+            self.fields = frozenset(
+                match.group("named") or match.group("braced")
+                for match in string.Template.pattern.finditer(self.fmt)
+                if match.group("named") or match.group("braced")
+            )
+            self.render = string.Template(self.fmt).substitute
+        else:
+            self.fields = frozenset(_PERCENT_FIELD.findall(self.fmt))
+            self.render = self.fmt.__mod__
+
+    def _parse_format_fields(self, fmt: str) -> Iterator[str]:
+        for _, field_name, format_spec, _ in string.Formatter().parse(fmt):
+            if field_name:
+                yield _FIELD_ROOT.match(field_name).group()  # type: ignore[union-attr]
+            if format_spec and "{" in format_spec:
+                # Nested replacement fields, e.g. "{message:>{width}}"
+                yield from self._parse_format_fields(format_spec)
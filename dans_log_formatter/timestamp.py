@@ -0,0 +1,60 @@
+import time
+from typing import Callable, Literal, Union
+
+TimestampFormat = Literal["iso", "iso_utc", "epoch_millis", "epoch_nanos"]
+
+
+class TimestampFormatter:
+    """
+    Format record timestamps, caching the formatted date and time of the current second.
+    Records created within the same second only format their fraction.
+
+    Formats:
+        * "iso" - ISO-8601 local time (e.g. `2025-01-01T00:00:00.000000`)
+        * "iso_utc" - ISO-8601 UTC time (e.g. `2025-01-01T00:00:00.000000Z`)
+        * "epoch_millis" - Milliseconds since the epoch (e.g. `1735689600000`)
+        * "epoch_nanos" - Nanoseconds since the epoch (e.g. `1735689600000000000`), as precise as record.created
+    """
+
+    def __init__(self, timestamp_format: TimestampFormat = "iso"):
+        self.timestamp_format = timestamp_format
+        # (second, formatted second) replaced as a whole, so concurrent readers always see a consistent pair
+        self._cache: tuple[int, str] = (-1, "")
+        formats: dict[str, Callable[[float], Union[str, int]]] = {
+            "iso": self._format_iso,
+            "iso_utc": self._format_iso_utc,
+            "epoch_millis": self._format_epoch_millis,
+            "epoch_nanos": self._format_epoch_nanos,
+        }
+        if timestamp_format not in formats:
+            raise ValueError(f"Unknown timestamp format {timestamp_format!r}, expected one of {list(formats)}")
+        self.format = formats[timestamp_format]
+
+    def _format_iso(self, created: float) -> str:
+        seconds, microseconds = self._split(created)
+        return f"{self._get_prefix(seconds, time.localtime)}.{microseconds:06d}"
+
+    def _format_iso_utc(self, created: float) -> str:
+        seconds, microseconds = self._split(created)
+        return f"{self._get_prefix(seconds, time.gmtime)}.{microseconds:06d}Z"
+
+    def _format_epoch_millis(self, created: float) -> int:
+        return int(created * 1_000)
+
+    def _format_epoch_nanos(self, created: float) -> int:
+        seconds = int(created)
+        return seconds * 1_000_000_000 + round((created - seconds) * 1_000_000_000)
+
+    def _split(self, created: float) -> tuple[int, int]:
+        seconds = int(created)
+        microseconds = round((created - seconds) * 1_000_000)
+        if microseconds == 1_000_000:
+            return seconds + 1, 0
+        return seconds, microseconds
+
+    def _get_prefix(self, seconds: int, converter: Callable[[float], time.struct_time]) -> str:
+        cached_seconds, prefix = self._cache
+        if cached_seconds != seconds:
+            prefix = time.strftime("%Y-%m-%dT%H:%M:%S", converter(seconds))
+            self._cache = (seconds, prefix)
+        return prefix
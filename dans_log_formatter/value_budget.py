@@ -0,0 +1,138 @@
+from collections.abc import Mapping
+from typing import Any, Optional
+
+from dans_log_formatter.formatter_error import record_error
+
+DEFAULT_ATTRIBUTE_SIZE_LIMIT = 16 * 1024
+DEFAULT_RECORD_SIZE_LIMIT = 256 * 1024
+DEFAULT_MAX_DEPTH = 8
+DEFAULT_MAX_LENGTH = 100
+
+TRUNCATED = "...[TRUNCATED]"
+# Estimated serialized size of values other than strings (numbers, booleans, None, etc.)
+SCALAR_SIZE = 8
+
+
+class _Walker:
+    """Copy a value within a size budget, walking only the parts that fit."""
+
+    def __init__(self, budget: Optional[int], max_depth: int, max_length: int):
+        self.budget = budget
+        self.max_depth = max_depth
+        self.max_length = max_length
+        self.used = 0
+        self.reasons: set[str] = set()
+
+    def limit(self, value: Any, depth: int) -> Any:
+        if isinstance(value, str):
+            return self._limit_string(value)
+        if isinstance(value, Mapping):
+            return self._limit_mapping(value, depth)
+        if isinstance(value, (list, tuple, set, frozenset)):
+            return self._limit_collection(value, depth)
+
+        self.used += SCALAR_SIZE
+        return value
+
+    def _is_full(self) -> bool:
+        return self.budget is not None and self.used >= self.budget
+
+    def _limit_string(self, value: str) -> str:
+        size = len(value) + 2  # Quoted
+        if self.budget is not None and self.used + size > self.budget:
+            self.reasons.add("size")
+            value = value[: max(self.budget - self.used - len(TRUNCATED) - 2, 0)] + TRUNCATED
+            self.used = self.budget
+            return value
+
+        self.used += size
+        return value
+
+    def _limit_mapping(self, value: Mapping, depth: int) -> Any:
+        if depth >= self.max_depth:
+            self.reasons.add("depth")
+            self.used += len(TRUNCATED)
+            return TRUNCATED
+
+        result = {}
+        changed = False
+        for index, (key, item) in enumerate(value.items()):
+            if index >= self.max_length or self._is_full():
+                self.reasons.add("length" if index >= self.max_length else "size")
+                result["..."] = f"[{len(value) - index} more items]"
+                return result
+
+            self.used += len(str(key)) + 4  # Quoted, with a colon and a comma
+            limited = self.limit(item, depth + 1)
+            changed = changed or limited is not item
+            result[key] = limited
+
+        return result if changed or not isinstance(value, dict) else value
+
+    def _limit_collection(self, value: Any, depth: int) -> Any:
+        if depth >= self.max_depth:
+            self.reasons.add("depth")
+            self.used += len(TRUNCATED)
+            return TRUNCATED
+
+        result = []
+        changed = False
+        for index, item in enumerate(value):
+            if index >= self.max_length or self._is_full():
+                self.reasons.add("length" if index >= self.max_length else "size")
+                result.append(f"...[{len(value) - index} more items]")
+                return result
+
+            self.used += 1  # Comma
+            limited = self.limit(item, depth + 1)
+            changed = changed or limited is not item
+            result.append(limited)
+
+        return result if changed or not isinstance(value, list) else value
+
+
+class ValueBudget:
+    """
+    Limit the size of attribute values from providers before they are serialized.
+    Nested dicts and lists are walked only as far as the budgets allow, and the parts beyond are replaced by
+    "...[TRUNCATED]" markers, so oversized structures are never fully materialized in the log line.
+    Every limited attribute is reported in formatter_errors.
+
+    Sizes are estimated as serialized JSON, in characters.
+
+    Example:
+        JsonLogFormatter([ExtraProvider()], value_budget=ValueBudget(attribute_size_limit=4096))
+    """
+
+    def __init__(
+        self,
+        attribute_size_limit: Optional[int] = DEFAULT_ATTRIBUTE_SIZE_LIMIT,
+        record_size_limit: Optional[int] = DEFAULT_RECORD_SIZE_LIMIT,
+        max_depth: int = DEFAULT_MAX_DEPTH,
+        max_length: int = DEFAULT_MAX_LENGTH,
+    ):
+        self.attribute_size_limit = attribute_size_limit
+        self.record_size_limit = record_size_limit
+        self.max_depth = max_depth
+        self.max_length = max_length
+
+    def limit_attributes(self, attributes: dict[str, Any]) -> dict[str, Any]:
+        remaining = self.record_size_limit
+        for key, value in attributes.items():
+            if remaining is not None and remaining <= 0:
+                attributes[key] = TRUNCATED
+                record_error(f"Attribute '{key}' value is dropped, the record size limit is reached")
+                continue
+
+            budget = self.attribute_size_limit
+            if remaining is not None:
+                budget = remaining if budget is None else min(budget, remaining)
+
+            walker = _Walker(budget, self.max_depth, self.max_length)
+            attributes[key] = walker.limit(value, 0)
+            if remaining is not None:
+                remaining -= walker.used
+            if walker.reasons:
+                record_error(f"Attribute '{key}' value is limited by {', '.join(sorted(walker.reasons))}")
+
+        return attributes
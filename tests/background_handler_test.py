@@ -0,0 +1,182 @@
+import json
+import logging
+import threading
+from io import BytesIO
+
+from dans_log_formatter.formatter import JsonLogFormatter
+from dans_log_formatter.handlers.background import BackgroundStreamHandler
+from dans_log_formatter.providers.context import ContextProvider, inject_log_context
+from tests.utils import handler_logger_factory
+
+
+class BlockingStream(BytesIO):
+    def __init__(self):
+        super().__init__()
+        self.writing = threading.Event()
+        self.release = threading.Event()
+
+    def write(self, data) -> int:
+        self.writing.set()
+        self.release.wait()
+        return super().write(data)
+
+
+def read_lines(stream: BytesIO) -> list[dict]:
+    return [json.loads(line) for line in stream.getvalue().splitlines()]
+
+
+def test_background_handler():
+    stream = BytesIO()
+    handler = BackgroundStreamHandler(stream)
+    handler.setFormatter(JsonLogFormatter())
+    logger = handler_logger_factory(handler)
+
+    for index in range(100):
+        logger.info("hello world! %d", index)
+    handler.close()
+
+    records = read_lines(stream)
+    assert [record["message"] for record in records] == [f"hello world! {index}" for index in range(100)]
+
+
+def test_background_handler_flush():
+    stream = BytesIO()
+    handler = BackgroundStreamHandler(stream)
+    handler.setFormatter(JsonLogFormatter())
+    logger = handler_logger_factory(handler)
+
+    logger.info("hello world!")
+    handler.flush()
+
+    assert read_lines(stream)[0]["message"] == "hello world!"
+    handler.close()
+
+
+def test_background_handler_captures_context():
+    stream = BytesIO()
+    handler = BackgroundStreamHandler(stream)
+    handler.setFormatter(JsonLogFormatter([ContextProvider()]))
+    logger = handler_logger_factory(handler)
+
+    with inject_log_context({"a": 1}):
+        logger.info("inside")
+    logger.info("outside")
+    handler.close()
+
+    inside, outside = read_lines(stream)
+    assert inside["a"] == 1
+    assert "a" not in outside
+
+
+def test_background_handler_drop():
+    stream = BlockingStream()
+    handler = BackgroundStreamHandler(stream, max_queue_size=1, overflow="drop")
+    handler.setFormatter(JsonLogFormatter())
+    logger = handler_logger_factory(handler)
+
+    logger.info("written")
+    assert stream.writing.wait(timeout=5)
+    logger.info("queued")
+    logger.info("dropped")
+    stream.release.set()
+    handler.close()
+
+    assert handler.dropped == 1
+    assert [record["message"] for record in read_lines(stream)] == ["written", "queued"]
+
+
+def test_background_handler_sample_keeps_warnings():
+    stream = BlockingStream()
+    handler = BackgroundStreamHandler(stream, max_queue_size=2, overflow="sample")
+    handler.setFormatter(JsonLogFormatter())
+    logger = handler_logger_factory(handler)
+
+    logger.info("written")
+    assert stream.writing.wait(timeout=5)
+    logger.info("queued")
+    logger.info("queued")
+    logger.info("dropped")
+    threading.Timer(0.1, stream.release.set).start()
+    logger.warning("warning")
+    handler.close()
+
+    assert handler.dropped == 1
+    assert read_lines(stream)[-1]["status"] == "WARNING"
+
+
+def test_background_handler_after_close():
+    stream = BytesIO()
+    handler = BackgroundStreamHandler(stream)
+    handler.setFormatter(JsonLogFormatter())
+    logger = handler_logger_factory(handler)
+
+    handler.close()
+    logger.log(logging.INFO, "hello world!")
+
+    assert read_lines(stream)[0]["message"] == "hello world!"
+
+
+def test_background_handler_prepares_records():
+    stream = BlockingStream()
+    handler = BackgroundStreamHandler(stream)
+    handler.setFormatter(JsonLogFormatter())
+    logger = handler_logger_factory(handler)
+
+    logger.info("written")
+    assert stream.writing.wait(timeout=5)
+    items = ["before"]
+    logger.info("items: %s", items)
+    items.append("after")  # Mutated before the record is formatted
+    try:
+        raise ValueError("Something went wrong")
+    except ValueError:
+        logger.exception("failed")
+    stream.release.set()
+    handler.close()
+
+    records = read_lines(stream)
+    assert records[1]["message"] == "items: ['before']"
+    assert "ValueError: Something went wrong" in records[2]["error"]
+
+
+def test_background_handler_leaves_record_unchanged():
+    handler = BackgroundStreamHandler(BytesIO())
+    handler.setFormatter(JsonLogFormatter(message_size_limit=30, bounded_message=True))
+    logger = handler_logger_factory(handler)
+    records: list[logging.LogRecord] = []
+
+    class ListHandler(logging.Handler):
+        def emit(self, record: logging.LogRecord) -> None:
+            records.append(record)
+
+    logger.addHandler(ListHandler())
+
+    logger.info("payload %s", "A" * 100)
+    handler.close()
+
+    assert records[0].getMessage() == "payload " + "A" * 100  # The following handlers see the original record
+    assert records[0].args == ("A" * 100,)
+    (line,) = read_lines(handler.stream)  # type: ignore[arg-type]
+    assert line["message"].endswith("...[TRUNCATED]")
+    assert "Attribute 'message' value is too long: 108 (limit: 30)" in line["formatter_errors"]
+
+
+def test_background_handler_close_while_emitting():
+    stream = BytesIO()
+    handler = BackgroundStreamHandler(stream, max_queue_size=10)
+    handler.setFormatter(JsonLogFormatter())
+    logger = handler_logger_factory(handler)
+
+    def emit_records():
+        for index in range(200):
+            logger.info("hello world! %d", index)
+
+    threads = [threading.Thread(target=emit_records) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    handler.close()
+    for thread in threads:
+        thread.join(timeout=10)
+
+    assert not any(thread.is_alive() for thread in threads)  # No put() blocked after the worker stopped
+    assert len(read_lines(stream)) == 800  # Records emitted after close() are written synchronously
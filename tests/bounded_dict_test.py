@@ -0,0 +1,23 @@
+from dans_log_formatter.bounded_dict import BoundedDict
+
+
+def test_bounded_dict():
+    cache: BoundedDict[int, str] = BoundedDict(3)
+
+    for key in range(3):
+        cache[key] = str(key)
+    cache[2] = "two"  # An existing key never clears the dict
+
+    assert cache == {0: "0", 1: "1", 2: "two"}
+    cache[3] = "3"
+    assert cache == {3: "3"}  # Started over, rather than tracking the usage of every key
+
+
+def test_bounded_dict_limit_changed():
+    cache: BoundedDict[int, int] = BoundedDict(10)
+    cache.update({key: key for key in range(5)})  # update() is not bounded, only setting a key is
+
+    cache.limit = 5
+    cache[5] = 5
+
+    assert cache == {5: 5}
@@ -1,3 +1,4 @@
+import json
 import socket
 
 from celery import Celery
@@ -5,17 +6,21 @@ from celery.result import EagerResult
 
 from dans_log_formatter.contrib.celery.provider import CeleryTaskProvider
 from dans_log_formatter.formatter import JsonLogFormatter
-from tests.utils import logger_factory, read_stream_log_line
+from tests.utils import background_logger_factory, logger_factory, read_stream_log_line
 
 app = Celery("test_app", broker="memory://", backend="cache+memory://")
 app.conf.task_always_eager = True
 
 logger, stream = logger_factory(JsonLogFormatter([CeleryTaskProvider(include_args=True)]))
+background_logger, background_handler, background_stream = background_logger_factory(
+    JsonLogFormatter([CeleryTaskProvider()])
+)
 
 
 @app.task(name="my_task")
 def sample_task(param: int):  # noqa ARG001
     logger.info("Log example from a Celery task!")
+    background_logger.info("Log example from a Celery task!")
 
 
 def test_celery_integration():
@@ -35,3 +40,12 @@ def test_celery_integration():
     assert record["task.worker"] == socket.gethostname()
     assert record["task.args"] == []
     assert record["task.kwargs"] == {"param": 1}
+
+
+def test_celery_captured_off_thread():
+    result: EagerResult = sample_task.delay(param=1)
+    background_handler.flush()
+
+    record = json.loads(background_stream.getvalue().splitlines()[-1])
+    assert record["resource"] == "my_task"
+    assert record["task.id"] == result.id
@@ -0,0 +1,187 @@
+import json
+import time
+from logging import LogRecord
+
+import pytest
+
+from dans_log_formatter.circuit_breaker import ProviderCircuitBreaker
+from dans_log_formatter.formatter import JsonLogFormatter
+from dans_log_formatter.providers.abstract import AbstractProvider
+from tests.utils import background_logger_factory, logger_factory
+
+
+class FlakyProvider(AbstractProvider):
+    def __init__(self):
+        self.calls = 0
+        self.failing = True
+
+    def get_attributes(self, record: LogRecord):  # noqa ARG002
+        self.calls += 1
+        if self.failing:
+            raise ValueError("Something went wrong")
+        return {"flaky": True}
+
+
+class FailingRenderProvider(AbstractProvider):
+    def __init__(self):
+        self.renders = 0
+
+    def get_attributes(self, record: LogRecord):  # noqa ARG002
+        return {"rendered": True}
+
+    def capture(self, record: LogRecord):  # noqa ARG002
+        return None
+
+    def render(self, record: LogRecord, snapshot):  # noqa ARG002
+        self.renders += 1
+        raise ValueError("db down")
+
+
+class SlowProvider(AbstractProvider):
+    time_budget = 0.001
+
+    def get_attributes(self, record: LogRecord):  # noqa ARG002
+        time.sleep(0.005)
+        return {"slow": True}
+
+
+def read_stream_log_lines(stream) -> list[dict]:
+    return [json.loads(line) for line in stream.getvalue().splitlines()]
+
+
+def test_trips_open_after_failures():
+    provider = FlakyProvider()
+    breaker = ProviderCircuitBreaker(failure_threshold=2, cooldown=60)
+    logger, stream = logger_factory(JsonLogFormatter([provider], circuit_breaker=breaker))
+
+    for _ in range(5):
+        logger.info("hello world!")
+
+    records = read_stream_log_lines(stream)
+    assert provider.calls == 2  # Skipped while the circuit is open
+    assert breaker.get_state(provider) == "open"
+    assert "Circuit is open" not in records[0]["formatter_errors"]
+    assert "Circuit is open for 60s, after 2 failures, the last raising an exception" in records[1]["formatter_errors"]
+    assert "formatter_errors" not in records[2]
+    assert breaker.get_skipped(provider) == 3
+
+
+def test_half_open_trial():
+    provider = FlakyProvider()
+    breaker = ProviderCircuitBreaker(failure_threshold=1, cooldown=0.01)
+    logger, stream = logger_factory(JsonLogFormatter([provider], circuit_breaker=breaker))
+
+    logger.info("hello world!")
+    time.sleep(0.02)
+    assert breaker.get_state(provider) == "half-open"
+    logger.info("hello world!")  # The trial fails, opening the circuit again
+    assert breaker.get_state(provider) == "open"
+
+    time.sleep(0.02)
+    provider.failing = False
+    logger.info("hello world!")  # The trial succeeds, closing the circuit
+    logger.info("hello world!")
+
+    records = read_stream_log_lines(stream)
+    assert provider.calls == 4
+    assert breaker.get_state(provider) == "closed"
+    assert records[3]["flaky"] is True
+    assert "formatter_errors" not in records[3]
+
+
+def test_skip_not_reported_with_exception():
+    provider = FlakyProvider()
+    breaker = ProviderCircuitBreaker(failure_threshold=1, cooldown=60)
+    logger, stream = logger_factory(JsonLogFormatter([provider], circuit_breaker=breaker))
+
+    logger.info("hello world!")
+    try:
+        raise ValueError("oops")
+    except ValueError:
+        logger.exception("failed")
+
+    records = read_stream_log_lines(stream)
+    assert "formatter_errors" not in records[1]
+    assert breaker.get_skipped(provider) == 1
+
+
+def test_interrupted_trial():
+    provider = FlakyProvider()
+    breaker = ProviderCircuitBreaker(failure_threshold=1, cooldown=0.01)
+    guarded = breaker.guard(provider, provider.get_attributes)
+
+    with pytest.raises(ValueError, match="Something went wrong"):
+        guarded(None)
+    time.sleep(0.02)
+
+    def interrupt(record: LogRecord):  # noqa ARG001
+        raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        breaker.guard(provider, interrupt)(None)
+
+    assert breaker.get_state(provider) == "half-open"
+    provider.failing = False
+    assert guarded(None) == {"flaky": True}  # The next call is a trial again
+    assert breaker.get_state(provider) == "closed"
+
+
+def test_time_budget():
+    provider = SlowProvider()
+    breaker = ProviderCircuitBreaker(failure_threshold=2, cooldown=60)
+    logger, stream = logger_factory(JsonLogFormatter([provider], circuit_breaker=breaker))
+
+    for _ in range(3):
+        logger.info("hello world!")
+
+    records = read_stream_log_lines(stream)
+    assert records[0]["slow"] is True  # Over budget, but not interrupted
+    assert "formatter_errors" not in records[0]
+    assert "the last taking" in records[1]["formatter_errors"]
+    assert "(budget: 1.0ms)" in records[1]["formatter_errors"]
+    assert "slow" not in records[2]
+
+
+def test_reset():
+    provider = FlakyProvider()
+    breaker = ProviderCircuitBreaker(failure_threshold=1, cooldown=60)
+    logger, _ = logger_factory(JsonLogFormatter([provider], circuit_breaker=breaker))
+
+    logger.info("hello world!")
+    breaker.reset()
+
+    assert breaker.get_state(provider) == "closed"
+    logger.info("hello world!")
+    assert provider.calls == 2
+
+
+def test_background_capture():
+    provider = FlakyProvider()
+    breaker = ProviderCircuitBreaker(failure_threshold=1, cooldown=60)
+    logger, handler, stream = background_logger_factory(JsonLogFormatter([provider], circuit_breaker=breaker))
+
+    logger.info("hello world!")
+    logger.info("hello world!")
+    handler.close()
+
+    records = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert provider.calls == 1  # Skipped on the logging thread
+    assert "formatter_errors" not in records[1]
+    assert breaker.get_skipped(provider) == 3  # The second capture, and both renders on the worker
+
+
+def test_background_render_guarded():
+    provider = FailingRenderProvider()
+    breaker = ProviderCircuitBreaker(failure_threshold=2, cooldown=60)
+    formatter = JsonLogFormatter([provider], circuit_breaker=breaker, collect_stats=True)
+    logger, handler, stream = background_logger_factory(formatter)
+
+    for _ in range(10):
+        logger.info("hello world!")
+    handler.close()
+
+    records = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert provider.renders == 2  # Skipped on the worker once the circuit is open
+    assert breaker.get_state(provider) == "open"
+    assert "db down" in records[0]["formatter_errors"]
+    assert formatter.stats()["stages"]["provider:0:FailingRenderProvider"]["errors"] == 2
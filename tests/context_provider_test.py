@@ -1,8 +1,11 @@
+import logging
+import pickle
+
 import pytest
 
-from dans_log_formatter.formatter import JsonLogFormatter
+from dans_log_formatter.formatter import JsonLogFormatter, captured_snapshots
 from dans_log_formatter.providers.context import ContextProvider, inject_log_context
-from tests.utils import logger_factory, read_stream_log_line
+from tests.utils import background_logger_factory, logger_factory, read_stream_log_line
 
 
 def test_custom_context():
@@ -78,3 +81,34 @@ def test_custom_context_override_enable():
 
     record = read_stream_log_line(stream)
     assert record["a"] == 2
+
+
+def test_custom_context_captured():
+    formatter = JsonLogFormatter([ContextProvider()])
+    logger, handler, stream = background_logger_factory(formatter)
+
+    attributes = {"a": 1}
+    with inject_log_context(attributes):
+        logger.info("hello world!")
+    attributes["a"] = 2
+    handler.close()
+
+    record = read_stream_log_line(stream)
+    assert record["a"] == 1
+
+
+def test_capture_render():
+    formatter = JsonLogFormatter([ContextProvider()])
+    record = logging.LogRecord("test", logging.INFO, __file__, 1, "hello world!", None, None)
+
+    attributes = {"a": {"b": 1}}
+    with inject_log_context(attributes):
+        snapshot = formatter.capture(record)
+    attributes["a"]["b"] = 2  # Nested values are copied too
+
+    token = captured_snapshots.set({id(record): snapshot})
+    try:
+        assert formatter.get_attributes(record)["a"] == {"b": 1}
+    finally:
+        captured_snapshots.reset(token)
+    pickle.dumps(record)  # Nothing is stored on the record, so it can still be sent by a SocketHandler
@@ -1,12 +1,16 @@
+import json
+from types import SimpleNamespace
+from unittest.mock import patch
+
 import django
 from django.conf import settings
 from django.http import HttpResponse
-from django.test import Client
-from django.urls import path
+from django.test import Client, RequestFactory, override_settings
+from django.urls import path, resolve
 
-from dans_log_formatter.contrib.django.provider import DjangoRequestProvider
+from dans_log_formatter.contrib.django.provider import DjangoRequestProvider, resolve_route
 from dans_log_formatter.formatter import JsonLogFormatter
-from tests.utils import logger_factory, read_stream_log_line
+from tests.utils import background_logger_factory, logger_factory, read_stream_log_line
 
 settings.configure(
     DEBUG=True,
@@ -34,15 +38,29 @@ settings.configure(
 django.setup()
 
 logger, stream = logger_factory(JsonLogFormatter([DjangoRequestProvider()]))
+background_logger, background_handler, background_stream = background_logger_factory(
+    JsonLogFormatter([DjangoRequestProvider()])
+)
 
 
 def example_view(request, param):  # noqa ARG001
     logger.info("Test log message from view")
+    background_logger.info("Test log message from view")
+    return HttpResponse("Test Response")
+
+
+def change_user_view(request):
+    logger.info("Before user change")
+    background_logger.info("Before user change")
+    request.user = SimpleNamespace(id=123, is_authenticated=True, email="user@example.com")
+    logger.info("After user change")
+    background_logger.info("After user change")
     return HttpResponse("Test Response")
 
 
 urlpatterns = [
     path("api/resource/<int:param>/action", example_view, name="test_logging"),
+    path("api/user", change_user_view),
 ]
 
 
@@ -71,3 +89,63 @@ def test_django_integration():
     assert record["user.id"] == 0
     assert record["user.name"] == "AnonymousUser"
     assert record["user.email"] is None
+
+
+def test_django_captured_off_thread():
+    response = Client().get("/api/resource/1/action")
+    assert response.status_code == 200
+    background_handler.flush()
+
+    record = json.loads(background_stream.getvalue().splitlines()[-1])
+    assert record["resource"] == "GET api/resource/<int:param>/action"
+    assert record["http.url"] == "http://testserver/api/resource/1/action"
+    assert record["user.name"] == "AnonymousUser"
+
+
+def test_django_user_captured_on_logging_thread():
+    response = Client().get("/api/user")
+    assert response.status_code == 200
+    background_handler.flush()
+
+    before, after = (json.loads(line) for line in background_stream.getvalue().splitlines()[-2:])
+    assert before["user.id"] == 0  # Not the user set after the logging call
+    assert after["user.id"] == 123
+
+
+def test_django_request_attributes_cached():
+    resolve_route.cache_clear()
+    with patch("dans_log_formatter.contrib.django.provider.resolve", wraps=resolve) as resolve_mock:
+        response = Client().get("/api/user")
+    assert response.status_code == 200
+
+    stream.seek(0)
+    before, after = (json.loads(line) for line in stream.readlines()[-2:])
+    assert resolve_mock.call_count == 1
+    assert before["resource"] == after["resource"] == "GET api/user"
+    assert before["user.id"] == 0
+    assert after["user.id"] == 123
+    assert after["user.email"] == "user@example.com"
+
+
+def test_django_route_cache():
+    resolve_route.cache_clear()
+    provider = DjangoRequestProvider()
+    factory = RequestFactory()
+
+    with patch("dans_log_formatter.contrib.django.provider.resolve", wraps=resolve) as resolve_mock:
+        for _ in range(3):
+            assert provider.get_resource(factory.get("/api/resource/1/action")) == "GET api/resource/<int:param>/action"
+            assert provider.get_resource(factory.get("/not/found")) == "GET /not/found"
+
+    assert resolve_mock.call_count == 2
+    assert resolve_route.cache_info().hits == 4
+    assert resolve_route.cache_info().misses == 2
+
+
+def test_django_route_cache_urlconf_changed():
+    provider = DjangoRequestProvider()
+    provider.get_resource(RequestFactory().get("/api/user"))
+    assert resolve_route.cache_info().currsize > 0
+
+    with override_settings(ROOT_URLCONF=__name__):
+        assert resolve_route.cache_info().currsize == 0
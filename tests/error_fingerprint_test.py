@@ -0,0 +1,82 @@
+from dans_log_formatter.error_fingerprint import ErrorDeduplicator
+from dans_log_formatter.formatter import JsonLogFormatter, TextLogFormatter
+from tests.utils import logger_factory, read_stream_log_line
+
+
+def raise_error(message: str):
+    raise ValueError(message)
+
+
+def raise_other_error(message: str):
+    raise ValueError(message)
+
+
+def get_exc_info(function, message: str = "Something went wrong"):
+    try:
+        function(message)
+    except ValueError as e:
+        return ValueError, e, e.__traceback__
+
+
+def test_duplicate_traceback_suppressed():
+    logger, stream = logger_factory(JsonLogFormatter(error_deduplicator=ErrorDeduplicator()))
+
+    for index in range(3):
+        try:
+            raise_error(f"Something went wrong {index}")
+        except ValueError:
+            logger.exception("hello world!")
+
+    first = read_stream_log_line(stream)
+    second = read_stream_log_line(stream, seek=False)
+    third = read_stream_log_line(stream, seek=False)
+    assert first["error"].startswith("Traceback (most recent call last):")
+    assert second["error"] == "ValueError: Something went wrong 1"
+    assert third["error"] == "ValueError: Something went wrong 2"
+    assert first["error.fingerprint"] == second["error.fingerprint"] == third["error.fingerprint"]
+    assert [first["error.occurrences"], second["error.occurrences"], third["error.occurrences"]] == [1, 2, 3]
+
+
+def test_duplicate_traceback_suppressed_text():
+    formatter = TextLogFormatter("{status} | {message}", style="{", error_deduplicator=ErrorDeduplicator())
+    logger, stream = logger_factory(formatter)
+
+    for _ in range(2):
+        try:
+            raise_error("Something went wrong")
+        except ValueError:
+            logger.exception("hello world!")
+
+    assert stream.getvalue().endswith("ERROR | hello world!\nValueError: Something went wrong\n")
+
+
+def test_fingerprint():
+    deduplicator = ErrorDeduplicator()
+
+    first = deduplicator.fingerprint(get_exc_info(raise_error, "first"))
+    second = deduplicator.fingerprint(get_exc_info(raise_error, "second"))
+    other = deduplicator.fingerprint(get_exc_info(raise_other_error))
+
+    assert first == second
+    assert first != other
+
+
+def test_window():
+    deduplicator = ErrorDeduplicator(window=10)
+
+    assert deduplicator.count("fingerprint", 100) == 1
+    assert deduplicator.count("fingerprint", 105) == 2
+    assert deduplicator.count("fingerprint", 110) == 1
+    assert deduplicator.count("fingerprint", 111) == 2
+
+
+def test_recently_seen_bounded():
+    deduplicator = ErrorDeduplicator(size=2)
+
+    deduplicator.count("first", 100)
+    deduplicator.count("second", 100)
+    deduplicator.count("first", 100)
+    deduplicator.count("third", 100)
+
+    assert list(deduplicator._seen) == ["first", "third"]
+    assert deduplicator.count("second", 100) == 1
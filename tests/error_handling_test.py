@@ -2,7 +2,7 @@ from logging import LogRecord
 
 from dans_log_formatter.formatter import JsonLogFormatter, DEFAULT_STACK_SIZE_LIMIT
 from dans_log_formatter.providers.abstract import AbstractProvider
-from tests.utils import logger_factory, read_stream_log_line
+from tests.utils import background_logger_factory, logger_factory, read_stream_log_line
 
 
 class ExceptionProvider(AbstractProvider):
@@ -59,3 +59,62 @@ def test_provider_truncate_error_message():
     assert record["formatter_errors"].endswith("...[TRUNCATED]")
     assert record["message"] == "hello world!"
     assert record["status"] == "INFO"
+
+
+def test_provider_errors_scoped_to_record():
+    logger, stream = logger_factory(JsonLogFormatter([InternalErrorProvider()]))
+
+    logger.info("first")
+    logger.info("second")
+
+    first = read_stream_log_line(stream)
+    second = read_stream_log_line(stream, seek=False)
+    assert first["formatter_errors"] == second["formatter_errors"]
+    assert second["formatter_errors"].count("Something went wrong") == 1
+
+
+def test_formatter_errors_scoped_to_record():
+    formatter = JsonLogFormatter(message_size_limit=100)
+    logger, stream = logger_factory(formatter)
+
+    logger.info("*" * 200)
+    logger.info("hello world!")
+
+    read_stream_log_line(stream)
+    record = read_stream_log_line(stream, seek=False)
+    assert "formatter_errors" not in record
+
+
+def test_recent_errors_bounded():
+    formatter = JsonLogFormatter([InternalErrorProvider()], recent_errors_limit=3)
+    logger, _ = logger_factory(formatter)
+
+    for _ in range(10):
+        logger.info("hello world!")
+
+    assert len(formatter.recent_errors) == 3
+    assert formatter.recent_errors[-1].message.startswith("Provider index 0 (InternalErrorProvider): ")
+
+
+def test_recent_errors_without_exceptions():
+    formatter = JsonLogFormatter([ExceptionProvider()])
+    logger, stream = logger_factory(formatter)
+
+    logger.info("hello world!")
+
+    assert "ValueError: Something went wrong" in read_stream_log_line(stream)["formatter_errors"]
+    assert formatter.recent_errors[-1].exc_info == (None, None, None)  # No traceback is kept alive
+
+
+def test_provider_capture_errors():
+    logger, handler, stream = background_logger_factory(
+        JsonLogFormatter([InternalErrorProvider(), ExceptionProvider()])
+    )
+
+    logger.info("hello world!")
+    handler.close()
+
+    record = read_stream_log_line(stream)
+    assert "Provider index 0 (InternalErrorProvider): Something went wrong" in record["formatter_errors"]
+    assert "Provider index 1 (ExceptionProvider) raised an exception" in record["formatter_errors"]
+    assert record["something"] == 123
@@ -0,0 +1,145 @@
+import gc
+import json
+import logging
+import traceback
+import weakref
+from io import StringIO
+from unittest.mock import patch
+
+from dans_log_formatter.formatter import EXCEPTION_TEXT_ATTRIBUTE, JsonLogFormatter
+from tests.utils import collect_records, logger_factory, read_stream_log_line
+
+
+def raise_error():
+    raise ValueError("Something went wrong")
+
+
+def test_exception_formatted_once_per_record():
+    formatter = JsonLogFormatter()
+    logger, stream = logger_factory(formatter)
+    other_stream = StringIO()
+    other_handler = logging.StreamHandler(other_stream)
+    other_handler.setFormatter(formatter)
+    logger.addHandler(other_handler)
+
+    with patch.object(formatter, "formatException", wraps=formatter.formatException) as format_exception:
+        try:
+            raise_error()
+        except ValueError:
+            logger.exception("hello world!")
+
+    assert read_stream_log_line(stream)["error"] == read_stream_log_line(other_stream)["error"]
+    assert read_stream_log_line(stream)["error"].endswith("ValueError: Something went wrong")
+    assert format_exception.call_count == 1
+
+
+def test_exception_formatted_once_across_records():
+    logger, stream = logger_factory(JsonLogFormatter())
+    error = None
+
+    with patch("traceback.print_exception", wraps=traceback.print_exception) as print_exception:
+        try:
+            raise_error()
+        except ValueError as e:
+            error = e
+            for _ in range(3):
+                logger.exception("hello world!")
+
+    errors = [json.loads(line)["error"] for line in stream.getvalue().splitlines()]
+    assert errors == [errors[0]] * 3
+    assert print_exception.call_count == 1
+    assert error.__dict__[EXCEPTION_TEXT_ATTRIBUTE][1] == errors[0]
+
+
+def test_reraised_exception_formatted_again():
+    formatter = JsonLogFormatter()
+    logger, stream = logger_factory(formatter)
+
+    def inner():
+        try:
+            raise_error()
+        except ValueError:
+            logger.exception("inner")
+            raise
+
+    try:
+        inner()
+    except ValueError:
+        logger.exception("outer")
+
+    inner_error = read_stream_log_line(stream)["error"]
+    outer_error = read_stream_log_line(stream, seek=False)["error"]
+    assert inner_error != outer_error
+    assert "in test_reraised_exception_formatted_again" in outer_error
+
+
+def test_exc_text_shared_between_handlers():
+    formatter = JsonLogFormatter()
+    logger, stream = logger_factory(formatter)
+    records: list[logging.LogRecord] = []
+    logger.addFilter(collect_records(records))
+
+    try:
+        raise_error()
+    except ValueError:
+        logger.exception("hello world!")
+
+    assert records[0].exc_text == read_stream_log_line(stream)["error"]
+    with patch.object(logging.Formatter, "formatException") as format_exception:
+        assert logging.Formatter().format(records[0]).endswith("ValueError: Something went wrong")
+    format_exception.assert_not_called()
+
+
+def test_exc_text_honored():
+    formatter = JsonLogFormatter()
+    logger, stream = logger_factory(formatter)
+
+    def set_exc_text(record: logging.LogRecord) -> bool:
+        record.exc_text = "Already formatted"
+        return True
+
+    logger.addFilter(set_exc_text)
+    try:
+        raise_error()
+    except ValueError:
+        logger.exception("hello world!")
+
+    assert read_stream_log_line(stream)["error"] == "Already formatted"
+
+
+def test_cached_truncated_exception_recorded():
+    logger, stream = logger_factory(JsonLogFormatter(stack_size_limit=50))
+
+    try:
+        raise_error()
+    except ValueError:
+        logger.exception("first")
+        logger.exception("second")
+
+    for record in (read_stream_log_line(stream), read_stream_log_line(stream, seek=False)):
+        assert len(record["error"]) == 50
+        assert record["error"].endswith("...[TRUNCATED]")
+        assert "Attribute 'error' value is too long" in record["formatter_errors"]
+
+
+class Resource:
+    pass
+
+
+def raise_error_holding(resource: Resource):
+    raise ValueError(f"Something went wrong with {resource}")
+
+
+def test_exception_not_retained():
+    logger, _ = logger_factory(JsonLogFormatter())
+    resource = Resource()
+    resource_ref = weakref.ref(resource)
+
+    try:
+        raise_error_holding(resource)
+    except ValueError:
+        logger.exception("hello world!")
+    del resource
+    gc.collect()
+
+    assert resource_ref() is None  # The traceback's frames are not kept alive by the formatter
@@ -1,6 +1,11 @@
+import json
+import logging
+from io import StringIO
+from uuid import uuid4
+
 from dans_log_formatter.formatter import JsonLogFormatter
 from formatter_test import DEFAULT_ATTRIBUTES
-from dans_log_formatter.providers.extra import ExtraProvider
+from dans_log_formatter.providers.extra import ExtraLogger, ExtraProvider
 from tests.utils import logger_factory, read_stream_log_line
 
 
@@ -11,3 +16,42 @@ def test_extra_provider():
     record = read_stream_log_line(stream)
     assert record.keys() == DEFAULT_ATTRIBUTES | {"extra"}
     assert record["extra"] == "value"
+
+
+def test_extra_provider_ignores_builtin_attributes():
+    record = logging.LogRecord("name", logging.INFO, __file__, 1, "hello world!", (), None)
+    record.message = record.getMessage()
+    record.asctime = "00:00:00"
+
+    assert ExtraProvider().get_attributes(record) is None
+
+
+def test_extra_provider_keeps_order():
+    logger, stream = logger_factory(JsonLogFormatter([ExtraProvider()]))
+    logger.info("hello world!", extra={"b": 1, "a": 2, "c": 3})
+
+    record = read_stream_log_line(stream)
+    assert [key for key in record if key in {"a", "b", "c"}] == ["b", "a", "c"]
+
+
+def test_extra_logger_captures_extra_keys():
+    formatter = JsonLogFormatter([ExtraProvider()])
+    logger = ExtraLogger(str(uuid4()), logging.DEBUG)
+    stream = StringIO()
+    handler = logging.StreamHandler(stream)
+    handler.setFormatter(formatter)
+    logger.addHandler(handler)
+
+    def add_attribute(record: logging.LogRecord) -> bool:
+        record.filtered = "value"
+        return True
+
+    logger.addFilter(add_attribute)
+    logger.info("hello world!", extra={"extra": "value"})
+    logger.info("hello world!")
+
+    stream.seek(0)
+    first, second = (json.loads(line) for line in stream.readlines())
+    assert first.keys() == DEFAULT_ATTRIBUTES | {"extra"}
+    assert first["extra"] == "value"
+    assert second.keys() == DEFAULT_ATTRIBUTES
@@ -1,10 +1,13 @@
-from fastapi import FastAPI
+import json
+import logging
+
+from fastapi import FastAPI, Request
 from fastapi.testclient import TestClient
 
 from dans_log_formatter.contrib.fastapi.middleware import LogContextMiddleware
 from dans_log_formatter.contrib.fastapi.provider import FastAPIRequestProvider
 from dans_log_formatter.formatter import JsonLogFormatter
-from tests.utils import logger_factory, read_stream_log_line
+from tests.utils import background_logger_factory, logger_factory, read_stream_log_line
 
 
 def test_fastapi_integration():
@@ -45,3 +48,63 @@ def test_fastapi_integration():
     assert record["http.referrer"] == "http://example.com"
     assert record["http.useragent"] == "some user agent"
     assert record["http.remote_addr"] == "127.0.0.2"
+
+
+def test_fastapi_captured_off_thread():
+    logger, handler, stream = background_logger_factory(JsonLogFormatter([FastAPIRequestProvider()]))
+
+    app = FastAPI()
+    app.add_middleware(LogContextMiddleware)
+
+    @app.get("/resource/{id}/action")
+    async def read_root():
+        logger.info("hello world!")
+        return "hello world!"
+
+    response = TestClient(app).get("/resource/1/action")
+    assert response.status_code == 200
+    handler.close()
+
+    record = read_stream_log_line(stream)
+    assert record["resource"] == "GET /resource/{id}/action"
+    assert record["http.url"] == "http://testserver/resource/1/action"
+
+
+def test_fastapi_request_attributes_cached_per_route():
+    logger, stream = logger_factory(JsonLogFormatter([FastAPIRequestProvider()]))
+
+    app = FastAPI()
+
+    @app.middleware("http")
+    async def log_before_routing(request: Request, call_next):
+        logger.info("before routing")
+        return await call_next(request)
+
+    app.add_middleware(LogContextMiddleware)
+
+    @app.get("/resource/{id}/action")
+    def read_root():
+        logger.info("first")
+        logger.info("second")
+        return "hello world!"
+
+    response = TestClient(app).get("/resource/1/action")
+    assert response.status_code == 200
+
+    stream.seek(0)
+    before, first, second = (json.loads(line) for line in stream.readlines())
+    assert before["resource"] == "GET /resource/1/action"
+    assert first["resource"] == second["resource"] == "GET /resource/{id}/action"
+    assert first["http.url"] == "http://testserver/resource/1/action"
+
+
+def test_fastapi_cached_attributes_copied():
+    provider = FastAPIRequestProvider()
+    request = Request({"type": "http", "method": "GET", "path": "/", "headers": [], "query_string": b""})
+
+    record = logging.makeLogRecord({"msg": "hello world!"})
+
+    attributes = provider.get_context_attributes(record, request)
+    attributes["resource"] = "changed"
+
+    assert provider.get_context_attributes(record, request)["resource"] == "GET /"
@@ -0,0 +1,146 @@
+import json
+import logging
+import os
+import time
+from pathlib import Path
+
+import pytest
+
+from dans_log_formatter.formatter import JsonLogFormatter
+from dans_log_formatter.handlers.file import JsonLinesFileHandler
+from tests.utils import handler_logger_factory
+
+
+def read_lines(path: Path) -> list[dict]:
+    return [json.loads(line) for line in path.read_bytes().splitlines()]
+
+
+def file_logger_factory(path: Path, **kwargs) -> tuple[logging.Logger, JsonLinesFileHandler]:
+    handler = JsonLinesFileHandler(path, **kwargs)
+    handler.setFormatter(JsonLogFormatter())
+    return handler_logger_factory(handler), handler
+
+
+def test_file_handler(tmp_path: Path):
+    path = tmp_path / "app.jsonl"
+    logger, handler = file_logger_factory(path, flush_interval=None)
+
+    for index in range(10):
+        logger.info("hello world! %d", index)
+    assert path.read_bytes() == b""  # Buffered
+    handler.close()
+
+    assert [record["message"] for record in read_lines(path)] == [f"hello world! {index}" for index in range(10)]
+
+
+def test_file_handler_appends(tmp_path: Path):
+    path = tmp_path / "app.jsonl"
+    path.write_bytes(b'{"message": "existing"}\n')
+    logger, handler = file_logger_factory(path)
+
+    logger.info("hello world!")
+    handler.close()
+
+    assert [record["message"] for record in read_lines(path)] == ["existing", "hello world!"]
+
+
+def test_file_handler_flush_interval(tmp_path: Path):
+    path = tmp_path / "app.jsonl"
+    logger, handler = file_logger_factory(path, flush_interval=0.01)
+
+    logger.info("hello world!")
+    deadline = time.monotonic() + 5
+    while not path.read_bytes() and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    assert read_lines(path)[0]["message"] == "hello world!"
+    handler.close()
+
+
+def test_file_handler_unbuffered(tmp_path: Path):
+    path = tmp_path / "app.jsonl"
+    logger, handler = file_logger_factory(path, buffer_size=0, fsync="flush")
+
+    logger.info("hello world!")
+
+    assert read_lines(path)[0]["message"] == "hello world!"  # Written synchronously
+    handler.close()
+    handler.close()
+
+
+def test_size_rotation(tmp_path: Path):
+    path = tmp_path / "app.jsonl"
+    logger, handler = file_logger_factory(path, max_bytes=1_000, backup_count=2, buffer_size=300, fsync="rotate")
+
+    for index in range(50):
+        logger.info("hello world! %d", index)
+    handler.close()
+
+    files = [path.with_name("app.jsonl.2"), path.with_name("app.jsonl.1"), path]
+    assert not path.with_name("app.jsonl.3").exists()
+    for file in files:
+        assert 0 < file.stat().st_size <= 1_000
+        read_lines(file)  # Every line is complete
+
+    messages = [record["message"] for file in files for record in read_lines(file)]
+    assert messages == [f"hello world! {index}" for index in range(50 - len(messages), 50)]
+
+
+def test_oversized_line_gets_own_file(tmp_path: Path):
+    path = tmp_path / "app.jsonl"
+    logger, handler = file_logger_factory(path, max_bytes=100)
+
+    logger.info("first")
+    logger.info("*" * 500)
+    logger.info("last")
+    handler.close()
+
+    assert [record["message"] for record in read_lines(path.with_name("app.jsonl.2"))] == ["first"]
+    assert [record["message"] for record in read_lines(path.with_name("app.jsonl.1"))] == ["*" * 500]
+    assert [record["message"] for record in read_lines(path)] == ["last"]
+
+
+def test_time_rotation(tmp_path: Path):
+    path = tmp_path / "app.jsonl"
+    logger, handler = file_logger_factory(path, interval=60, backup_count=0)
+
+    logger.info("old")
+    logger.handle(logging.makeLogRecord({"msg": "new", "levelno": logging.INFO, "created": time.time() + 61}))
+    handler.close()
+
+    assert [record["message"] for record in read_lines(path)] == ["new"]
+    assert not path.with_name("app.jsonl.1").exists()
+    (backup,) = tmp_path.glob("app.jsonl.*")  # Kept, as backup_count=0 keeps every rotated file
+    assert [record["message"] for record in read_lines(backup)] == ["old"]
+
+
+def test_rotation_failure(tmp_path: Path):
+    path = tmp_path / "app.jsonl"
+    backup = path.with_name("app.jsonl.1")
+    backup.mkdir()
+    (backup / "file").write_bytes(b"")
+    logger, handler = file_logger_factory(path, max_bytes=100, backup_count=1)
+    failed: list[logging.LogRecord] = []
+    handler.handleError = failed.append  # type: ignore[assignment]
+
+    logger.info("first")
+    logger.info("*" * 100)  # Rotating fails, the previous file is kept
+    logger.info("last")  # Tried again after another max_bytes
+    handler.close()
+
+    assert [record.msg for record in failed] == ["*" * 100, "last"]
+    assert [record["message"] for record in read_lines(path)] == ["first", "*" * 100, "last"]
+    assert backup.is_dir()
+
+
+def test_emit_after_close(tmp_path: Path):
+    path = tmp_path / "app.jsonl"
+    logger, handler = file_logger_factory(path)
+    handler.close()
+
+    logger.info("hello world!")
+
+    assert read_lines(path)[0]["message"] == "hello world!"  # Written synchronously
+    with pytest.raises(OSError):
+        os.fstat(handler.stream)  # type: ignore[arg-type]  # Not left open
+    handler.close()
@@ -2,7 +2,7 @@ from flask import Flask
 
 from dans_log_formatter.contrib.flask.provider import FlaskRequestProvider
 from dans_log_formatter.formatter import JsonLogFormatter
-from tests.utils import logger_factory, read_stream_log_line
+from tests.utils import background_logger_factory, logger_factory, read_stream_log_line
 
 
 def test_flask_integration():
@@ -41,3 +41,22 @@ def test_flask_integration():
     assert record["http.referrer"] == "http://example.com"
     assert record["http.useragent"] == "some user agent"
     assert record["http.remote_addr"] == "127.0.0.1"
+
+
+def test_flask_captured_off_thread():
+    logger, handler, stream = background_logger_factory(JsonLogFormatter([FlaskRequestProvider()]))
+
+    app = Flask(__name__)
+
+    @app.route("/resource/<int:id>/action", methods=["GET"])
+    def read_root(id):  # noqa ARG001
+        logger.info("hello world!")
+        return "hello world!"
+
+    response = app.test_client().get("/resource/1/action")
+    assert response.status_code == 200
+    handler.close()
+
+    record = read_stream_log_line(stream)
+    assert record["resource"] == "GET /resource/1/action"
+    assert record["http.url"] == "http://localhost/resource/1/action"
@@ -0,0 +1,137 @@
+import json
+import logging
+from io import BytesIO
+
+import pytest
+
+from dans_log_formatter.contrib.orjson import OrJsonLogFormatter
+from dans_log_formatter.contrib.ujson import UJsonLogFormatter
+from dans_log_formatter.formatter import JsonLogFormatter, TextLogFormatter
+from dans_log_formatter.handlers.background import BackgroundStreamHandler
+from dans_log_formatter.providers.extra import ExtraProvider
+from tests.utils import handler_logger_factory
+
+FORMATTERS = [
+    pytest.param(JsonLogFormatter, id="json"),
+    pytest.param(UJsonLogFormatter, id="ujson"),
+    pytest.param(OrJsonLogFormatter, id="orjson"),
+]
+
+
+def make_record(index: int, **extra) -> logging.LogRecord:
+    record = logging.LogRecord("test", logging.INFO, __file__, 1, "hello world! %d", (index,), None)
+    record.__dict__.update(extra)
+    return record
+
+
+@pytest.mark.parametrize("formatter_class", FORMATTERS)
+def test_format_batch(formatter_class: type[JsonLogFormatter]):
+    formatter = formatter_class([ExtraProvider()])
+    records = [make_record(index) for index in range(10)]
+
+    data = formatter.format_batch(records)
+
+    assert data.endswith(b"\n")
+    assert data == b"".join(formatter.format_bytes(record) + b"\n" for record in records)
+    assert [json.loads(line)["message"] for line in data.splitlines()] == [f"hello world! {i}" for i in range(10)]
+
+
+@pytest.mark.parametrize("formatter_class", FORMATTERS)
+def test_format_batch_static_attributes(formatter_class: type[JsonLogFormatter]):
+    formatter = formatter_class([ExtraProvider()], static_attributes={"service": "my-service", "env": "prod"})
+    records = [make_record(0), make_record(1, env="staging")]
+
+    lines = [json.loads(line) for line in formatter.format_batch(records).splitlines()]
+
+    assert lines == [json.loads(formatter.format_bytes(record)) for record in records]
+    assert lines[0]["env"] == "prod"
+    assert lines[1]["env"] == "staging"
+    assert lines[1]["service"] == "my-service"
+
+
+def test_format_batch_empty():
+    assert JsonLogFormatter().format_batch([]) == b""
+
+
+def test_background_handler_uses_format_batch():
+    class CountingFormatter(JsonLogFormatter):
+        batches = 0
+
+        def format_batch(self, records, on_error=None):
+            CountingFormatter.batches += 1
+            return super().format_batch(records, on_error)
+
+    stream = BytesIO()
+    handler = BackgroundStreamHandler(stream)
+    handler.setFormatter(CountingFormatter())
+    logger = handler_logger_factory(handler)
+
+    for index in range(100):
+        logger.info("hello world! %d", index)
+    handler.close()
+
+    assert len(stream.getvalue().splitlines()) == 100
+    assert 1 <= CountingFormatter.batches <= 100
+
+
+def test_format_batch_on_error():
+    class FailingFormatter(JsonLogFormatter):
+        calls = 0
+
+        def get_attributes(self, record: logging.LogRecord) -> dict:
+            FailingFormatter.calls += 1
+            return super().get_attributes(record)
+
+        def dumps_bytes(self, attributes: dict) -> bytes:
+            if attributes["message"] == "fail":
+                raise ValueError("Something went wrong")
+            return super().dumps_bytes(attributes)
+
+    formatter = FailingFormatter()
+    records = [make_record(0), logging.makeLogRecord({"msg": "fail"}), make_record(2)]
+    failed: list[logging.LogRecord] = []
+
+    data = formatter.format_batch(records, on_error=failed.append)
+
+    assert [json.loads(line)["message"] for line in data.splitlines()] == ["hello world! 0", "hello world! 2"]
+    assert failed == [records[1]]
+    assert FailingFormatter.calls == 3  # Every record formatted once
+    with pytest.raises(ValueError, match="Something went wrong"):
+        formatter.format_batch(records)
+
+
+def test_background_handler_batch_fallback():
+    class FailingFormatter(JsonLogFormatter):
+        def dumps_bytes(self, attributes: dict) -> bytes:
+            if attributes["message"] == "fail":
+                raise ValueError("Something went wrong")
+            return super().dumps_bytes(attributes)
+
+    stream = BytesIO()
+    handler = BackgroundStreamHandler(stream)
+    handler.setFormatter(FailingFormatter())
+    failed: list[logging.LogRecord] = []
+    handler.handleError = failed.append  # type: ignore[assignment]
+    logger = handler_logger_factory(handler)
+
+    logger.info("first")
+    logger.info("fail")
+    logger.info("last")
+    handler.close()
+
+    messages = [json.loads(line)["message"] for line in stream.getvalue().splitlines()]
+    assert messages == ["first", "last"]
+    assert [record.msg for record in failed] == ["fail"]
+
+
+def test_text_formatter_batch():
+    stream = BytesIO()
+    handler = BackgroundStreamHandler(stream)
+    handler.setFormatter(TextLogFormatter("%(message)s"))
+    logger = handler_logger_factory(handler)
+
+    logger.info("first")
+    logger.info("second")
+    handler.close()
+
+    assert stream.getvalue() == b"first\nsecond\n"
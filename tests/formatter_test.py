@@ -3,6 +3,7 @@ import logging.config
 from io import StringIO
 
 from dans_log_formatter.formatter import JsonLogFormatter, TextLogFormatter
+from dans_log_formatter.providers.abstract import AbstractProvider
 from dans_log_formatter.providers.context import ContextProvider, inject_log_context
 from dans_log_formatter.providers.extra import ExtraProvider
 from tests.utils import logger_factory, read_stream_log_line
@@ -20,7 +21,7 @@ def test_formatter():
     assert datetime.fromisoformat(record["timestamp"])
     assert record["status"] == "INFO"
     assert record["message"] == "hello world!"
-    assert record["location"] == "formatter_test-test_formatter#16"
+    assert record["location"] == "formatter_test-test_formatter#17"
     assert record["file"] == __file__
     assert stream.readline() == ""
 
@@ -160,7 +161,7 @@ def test_text_formatter():
 
     stream.seek(0)
     record = stream.readline()
-    assert record == "INFO - formatter_test-test_text_formatter#159, extra value | hello world!\n"
+    assert record == "INFO - formatter_test-test_text_formatter#160, extra value | hello world!\n"
     assert stream.readline() == ""
 
 
@@ -201,3 +202,80 @@ def test_logging_dict_config():
     assert record["status"] == "INFO"
     assert record["message"] == "hello world!"
     assert record["context"] == "something"
+
+
+def test_reassign_providers():
+    formatter = JsonLogFormatter()
+    logger, stream = logger_factory(formatter)
+
+    formatter.providers = [ExtraProvider()]
+    logger.info("hello world!", extra={"extra": "value"})
+
+    record = read_stream_log_line(stream)
+    assert record["extra"] == "value"
+
+
+def test_mutate_providers_in_place():
+    formatter = JsonLogFormatter()
+    logger, stream = logger_factory(formatter)
+
+    formatter.providers.append(ExtraProvider())
+    logger.info("hello world!", extra={"extra": "value"})
+    formatter.providers.clear()
+    logger.info("hello world!", extra={"extra": "value"})
+
+    assert read_stream_log_line(stream)["extra"] == "value"
+    assert "extra" not in read_stream_log_line(stream, seek=False)
+
+
+def test_reorder_providers_in_place():
+    class ValueProvider(AbstractProvider):
+        def __init__(self, value: str):
+            self.value = value
+
+        def get_attributes(self, record: logging.LogRecord):  # noqa ARG002
+            return {"value": self.value}
+
+    formatter = JsonLogFormatter([ValueProvider("a"), ValueProvider("b")])
+    logger, stream = logger_factory(formatter)
+
+    formatter.providers.reverse()
+    logger.info("hello world!")
+    formatter.providers.sort(key=lambda provider: provider.value, reverse=True)  # type: ignore[attr-defined]
+    formatter.providers.reverse()
+    logger.info("hello world!")
+
+    assert read_stream_log_line(stream)["value"] == "a"  # The last provider wins
+    assert read_stream_log_line(stream, seek=False)["value"] == "b"
+
+
+def test_override_get_providers():
+    class PerLevelFormatter(JsonLogFormatter):
+        def get_providers(self, record: logging.LogRecord):
+            return self.providers if record.levelno >= logging.WARNING else []
+
+    logger, stream = logger_factory(PerLevelFormatter([ExtraProvider()]))
+    logger.info("info", extra={"extra": "value"})
+    logger.warning("warning", extra={"extra": "value"})
+
+    assert "extra" not in read_stream_log_line(stream)
+    assert read_stream_log_line(stream, seek=False)["extra"] == "value"
+
+
+def test_location_interned():
+    formatter = JsonLogFormatter()
+    first = logging.LogRecord("test", logging.INFO, __file__, 1, "hello world!", None, None, func="func")
+    second = logging.LogRecord("test", logging.INFO, __file__, 1, "hello world!", None, None, func="func")
+
+    assert formatter.format_location(first) == "formatter_test-func#1"
+    assert formatter.format_location(first) is formatter.format_location(second)
+
+
+def test_location_cache_bounded():
+    formatter = JsonLogFormatter(location_cache_size=10)
+
+    for lineno in range(100):
+        record = logging.LogRecord("test", logging.INFO, __file__, lineno, "hello world!", None, None, func="func")
+        assert formatter.format_location(record) == f"formatter_test-func#{lineno}"
+
+    assert len(formatter._location_cache) <= 10
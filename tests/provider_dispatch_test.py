@@ -0,0 +1,89 @@
+import logging
+from logging import LogRecord
+
+from dans_log_formatter.formatter import JsonLogFormatter
+from dans_log_formatter.providers.abstract import AbstractProvider
+from tests.utils import background_logger_factory, read_stream_log_line
+
+
+class CountingProvider(AbstractProvider):
+    def __init__(self, name: str):
+        self.name = name
+        self.calls = 0
+
+    def get_attributes(self, record: LogRecord):  # noqa ARG002
+        self.calls += 1
+        return {self.name: True}
+
+
+def test_applies_to():
+    provider = CountingProvider("a").when(
+        min_level=logging.WARNING, include_loggers=("myapp",), exclude_loggers=("myapp.noisy",)
+    )
+
+    assert provider.applies_to("myapp", logging.WARNING)
+    assert provider.applies_to("myapp.views", logging.ERROR)
+    assert not provider.applies_to("myapp.views", logging.INFO)
+    assert not provider.applies_to("myapplication", logging.ERROR)
+    assert not provider.applies_to("myapp.noisy.module", logging.ERROR)
+    assert not provider.applies_to("other", logging.ERROR)
+
+
+def test_gated_providers():
+    always = CountingProvider("always")
+    warnings = CountingProvider("warnings").when(min_level=logging.WARNING)
+    tasks = CountingProvider("tasks").when(include_loggers=("tasks",))
+    formatter = JsonLogFormatter([always, warnings, tasks])
+
+    info_record = logging.makeLogRecord({"name": "web.views", "levelno": logging.INFO, "msg": "hello"})
+    error_record = logging.makeLogRecord({"name": "tasks.send", "levelno": logging.ERROR, "msg": "hello"})
+    info_attributes = formatter.get_attributes(info_record)
+    error_attributes = formatter.get_attributes(error_record)
+
+    assert "warnings" not in info_attributes
+    assert "tasks" not in info_attributes
+    assert error_attributes["warnings"] is True
+    assert error_attributes["tasks"] is True
+    assert formatter.get_providers(info_record) == [always]
+    assert formatter.get_providers(error_record) == [always, warnings, tasks]
+    assert warnings.calls == 1
+
+
+def test_dispatch_table_cached():
+    formatter = JsonLogFormatter([CountingProvider("warnings").when(min_level=logging.WARNING)])
+    record = logging.makeLogRecord({"name": "web", "levelno": logging.WARNING, "msg": "hello"})
+
+    formatter.get_attributes(record)
+
+    assert formatter._dispatch_table == {("web", logging.WARNING): formatter._provider_plan}
+    assert formatter._dispatch(record) is formatter._dispatch_table["web", logging.WARNING]
+
+
+def test_ungated_providers_skip_dispatch():
+    formatter = JsonLogFormatter([CountingProvider("always")])
+
+    assert formatter._dispatch_table is None
+
+
+def test_compile_after_gating():
+    provider = CountingProvider("gated")
+    formatter = JsonLogFormatter([provider])
+    provider.when(min_level=logging.ERROR)
+    formatter.compile()
+
+    record = logging.makeLogRecord({"name": "web", "levelno": logging.INFO, "msg": "hello"})
+    assert "gated" not in formatter.get_attributes(record)
+
+
+def test_background_capture_gated():
+    provider = CountingProvider("warnings").when(min_level=logging.WARNING)
+    logger, handler, stream = background_logger_factory(JsonLogFormatter([provider]))
+
+    logger.info("hello world!")
+    logger.warning("hello world!")
+    handler.close()
+
+    stream.seek(0)
+    assert "warnings" not in read_stream_log_line(stream, seek=False)
+    assert read_stream_log_line(stream, seek=False)["warnings"] is True
+    assert provider.calls == 1
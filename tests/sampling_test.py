@@ -0,0 +1,161 @@
+import json
+import logging
+import sys
+from io import StringIO
+from typing import Optional
+from unittest.mock import patch
+
+import pytest
+
+from dans_log_formatter.formatter import JsonLogFormatter
+from dans_log_formatter.providers.context import ContextProvider, _context, inject_log_context
+from dans_log_formatter.sampling import Sampler, attribute_key, context_key
+from tests.utils import logger_factory, read_stream_log_line
+
+
+def sampled_logger_factory(sampler: Sampler, formatter: Optional[logging.Formatter] = None):
+    logger, stream = logger_factory(formatter or JsonLogFormatter())
+    logger.handlers[0].addFilter(sampler)
+    return logger, stream
+
+
+def test_level_rates():
+    formatter = JsonLogFormatter()
+    sampler = Sampler({logging.DEBUG: 0, logging.INFO: 0})
+    logger, stream = sampled_logger_factory(sampler, formatter)
+
+    with patch.object(formatter, "get_attributes", wraps=formatter.get_attributes) as get_attributes:
+        logger.debug("debug")
+        logger.info("info")
+        logger.warning("warning")
+        logger.error("error")
+
+    assert [json.loads(line)["message"] for line in stream.getvalue().splitlines()] == ["warning", "error"]
+    assert get_attributes.call_count == 2
+    assert sampler.dropped["sampled"] == 2
+
+
+def test_logger_rates():
+    sampler = Sampler({logging.INFO: 0}, {"noisy": 0, "noisy.important": 1})
+
+    def make_record(name: str) -> logging.LogRecord:
+        return logging.LogRecord(name, logging.INFO, __file__, 1, "hello world!", None, None)
+
+    assert sampler.filter(make_record("noisy.module")) is False
+    assert sampler.filter(make_record("noisy.important.module")) is True
+    assert sampler.filter(make_record("other")) is False
+    assert sampler.get_rate(make_record("noisy.important")) == 1
+
+
+def test_sample_rate_attribute():
+    logger, stream = sampled_logger_factory(Sampler({logging.INFO: 0.5}))
+
+    with patch("dans_log_formatter.sampling.random.random", return_value=0.1):
+        logger.info("hello world!")
+    logger.warning("warning")
+
+    assert read_stream_log_line(stream)["sample_rate"] == 0.5
+    assert "sample_rate" not in read_stream_log_line(stream, seek=False)
+
+
+def test_sample_by_key():
+    sampler = Sampler({logging.INFO: 0.5}, key=attribute_key(ContextProvider(), "request_id"))
+    logger, stream = sampled_logger_factory(sampler)
+
+    kept_requests = set()
+    for request_id in range(200):
+        with inject_log_context({"request_id": request_id}):
+            for _ in range(5):
+                logger.info("hello world!")
+        if stream.getvalue():
+            assert stream.getvalue().count("\n") == 5  # All or nothing for the request
+            kept_requests.add(request_id)
+        stream.seek(0)
+        stream.truncate()
+
+    assert 50 < len(kept_requests) < 150
+    assert sampler.dropped["sampled"] == (200 - len(kept_requests)) * 5
+
+
+def test_sample_by_context_key():
+    calls = []
+
+    class CountingProvider(ContextProvider):
+        def get_attributes(self, record: logging.LogRecord):
+            calls.append(record)
+            return super().get_attributes(record)
+
+    sampler = Sampler({logging.INFO: 0.5}, key=attribute_key(CountingProvider(), "request_id"))
+    logger, _ = sampled_logger_factory(sampler)
+    key_sampler = Sampler({logging.INFO: 0.5}, key=context_key(_context, lambda context: context["request_id"]))
+
+    with inject_log_context({"request_id": 1}):
+        logger.info("hello world!")
+        record = logging.makeLogRecord({"msg": "hello world!", "levelno": logging.INFO})
+        assert sampler.key(record) == key_sampler.key(record) == 1  # type: ignore[misc]
+
+    assert calls == []  # Read from the context, without calling the provider
+    assert key_sampler.key(record) is None  # type: ignore[misc]
+
+
+def test_sample_key_errors():
+    def broken_key(record: logging.LogRecord):  # noqa ARG001
+        raise RuntimeError("provider broke")
+
+    sampler = Sampler({logging.INFO: 0.5}, key=broken_key)
+    logger, _ = sampled_logger_factory(sampler)
+
+    for _ in range(10):
+        logger.info("hello world!")  # Never raised into the logging call
+
+    assert sampler.key_errors == 10
+
+
+@pytest.mark.skipif(sys.version_info < (3, 12), reason="filters return records since Python 3.12")
+def test_sample_rate_only_for_the_sampled_handler():
+    logger, stream = sampled_logger_factory(Sampler({logging.INFO: 0.5}))
+    other_stream = StringIO()
+    other_handler = logging.StreamHandler(other_stream)
+    other_handler.setFormatter(JsonLogFormatter())
+    logger.addHandler(other_handler)
+
+    with patch("dans_log_formatter.sampling.random.random", return_value=0.1):
+        logger.info("hello world!")
+
+    assert read_stream_log_line(stream)["sample_rate"] == 0.5
+    assert "sample_rate" not in read_stream_log_line(other_stream)
+
+
+def test_rate_limit_per_call_site():
+    sampler = Sampler(rate_limit=0.001, burst=3)
+    logger, stream = sampled_logger_factory(sampler)
+
+    for _ in range(10):
+        logger.info("first")
+    for _ in range(10):
+        logger.info("second")
+    logger.warning("warning")
+
+    stream.seek(0)
+    messages = [read_stream_log_line(stream, seek=False)["message"] for _ in range(7)]
+    assert messages == ["first"] * 3 + ["second"] * 3 + ["warning"]
+    assert sampler.dropped["rate_limited"] == 14
+
+
+def test_rate_limit_refill():
+    sampler = Sampler(rate_limit=10, burst=1)
+    record = logging.LogRecord("test", logging.INFO, __file__, 1, "hello world!", None, None)
+
+    with patch("dans_log_formatter.sampling.time.monotonic", side_effect=[100, 100.05, 100.2]):
+        assert sampler.filter(record) is True
+        assert sampler.filter(record) is False
+        assert sampler.filter(record) is True
+
+
+def test_rate_limit_call_sites_bounded():
+    sampler = Sampler(rate_limit=10, burst=0.5, call_sites_limit=10)  # A burst below 1 drops every record
+
+    for lineno in range(25):
+        assert sampler.filter(logging.LogRecord("test", logging.INFO, __file__, lineno, "hello", None, None)) is False
+
+    assert len(sampler._buckets) <= 10
@@ -0,0 +1,76 @@
+import json
+import logging
+
+import pytest
+
+from dans_log_formatter.contrib.orjson import OrJsonLogFormatter
+from dans_log_formatter.contrib.ujson import UJsonLogFormatter
+from dans_log_formatter.formatter import JsonLogFormatter
+from dans_log_formatter.providers.extra import ExtraProvider
+from tests.formatter_test import DEFAULT_ATTRIBUTES
+
+STATIC_ATTRIBUTES = {"service": "my-service", "env": "prod", "version": "1.2.3"}
+
+FORMATTERS = [
+    pytest.param(JsonLogFormatter, id="json"),
+    pytest.param(UJsonLogFormatter, id="ujson"),
+    pytest.param(OrJsonLogFormatter, id="orjson"),
+]
+
+
+def make_record(**extra) -> logging.LogRecord:
+    record = logging.LogRecord("test", logging.INFO, __file__, 1, "hello world!", None, None)
+    record.__dict__.update(extra)
+    return record
+
+
+@pytest.mark.parametrize("formatter_class", FORMATTERS)
+def test_static_attributes(formatter_class: type[JsonLogFormatter]):
+    formatter = formatter_class(static_attributes=STATIC_ATTRIBUTES)
+    record = make_record()
+
+    result = json.loads(formatter.format(record))
+    result_bytes = json.loads(formatter.format_bytes(record))
+
+    assert result == result_bytes
+    assert result.keys() == DEFAULT_ATTRIBUTES | STATIC_ATTRIBUTES.keys()
+    assert result["service"] == "my-service"
+    assert result["message"] == "hello world!"
+
+
+@pytest.mark.parametrize("formatter_class", FORMATTERS)
+def test_static_attributes_overridden_by_record(formatter_class: type[JsonLogFormatter]):
+    formatter = formatter_class([ExtraProvider()], static_attributes=STATIC_ATTRIBUTES)
+    record = make_record(env="staging")
+
+    result = json.loads(formatter.format(record))
+    result_bytes = json.loads(formatter.format_bytes(record))
+
+    assert result == result_bytes
+    assert result["env"] == "staging"
+    assert result["service"] == "my-service"
+
+
+def test_static_attributes_reassigned():
+    formatter = JsonLogFormatter(static_attributes=STATIC_ATTRIBUTES)
+
+    formatter.static_attributes = {"service": "other-service"}
+
+    result = json.loads(formatter.format(make_record()))
+    assert result["service"] == "other-service"
+    assert "env" not in result
+
+
+def test_static_attributes_serialized_once():
+    serialized: list[dict] = []
+
+    class CountingFormatter(JsonLogFormatter):
+        def dumps(self, attributes):
+            serialized.append(attributes)
+            return super().dumps(attributes)
+
+    formatter = CountingFormatter(static_attributes=STATIC_ATTRIBUTES)
+    for _ in range(3):
+        formatter.format(make_record())
+
+    assert sum("service" in attributes for attributes in serialized) == 2  # str and bytes fragments
@@ -0,0 +1,129 @@
+import logging
+import threading
+from typing import Optional
+
+from dans_log_formatter.formatter import JsonLogFormatter, TextLogFormatter
+from dans_log_formatter.providers.abstract import AbstractProvider
+from dans_log_formatter.providers.extra import ExtraProvider
+from dans_log_formatter.stats import render_prometheus
+from tests.utils import logger_factory, read_stream_log_line
+
+
+class BrokenProvider(AbstractProvider):
+    def get_attributes(self, record: logging.LogRecord) -> Optional[dict]:  # noqa ARG002
+        raise ValueError("broken")
+
+
+def test_stats_disabled():
+    formatter = JsonLogFormatter([ExtraProvider()])
+
+    assert formatter.stats() == {}
+    assert "format" not in formatter.__dict__  # Nothing is wrapped
+
+
+def test_stage_stats():
+    formatter = JsonLogFormatter([ExtraProvider(), BrokenProvider()], collect_stats=True)
+    logger, stream = logger_factory(formatter)
+
+    logger.info("hello world!", extra={"user_id": 123})
+    try:
+        raise ValueError("oops")
+    except ValueError:
+        logger.exception("failed")
+
+    stats = formatter.stats()
+    stages = stats["stages"]
+    assert stages["format"]["calls"] == 2
+    assert stages["provider:0:ExtraProvider"]["calls"] == 2
+    assert stages["provider:0:ExtraProvider"]["errors"] == 0
+    assert stages["provider:1:BrokenProvider"]["errors"] == 2
+    assert stages["message"]["calls"] == 2
+    assert stages["error"]["calls"] == 1
+    assert stages["serialization"]["calls"] == 2
+    assert stages["timestamp"]["histogram"]["+Inf"] == 2
+    assert stages["format"]["seconds"] > 0
+    assert stats["output_characters"] == len(stream.getvalue()) - 2  # Without the newlines
+    assert stats["output_bytes"] == 0
+    assert stats["formatter_errors"] == 2
+    assert read_stream_log_line(stream)["user_id"] == 123
+
+
+def test_truncation_stats():
+    formatter = TextLogFormatter("%(message)s", message_size_limit=20, collect_stats=True)
+    logger, _ = logger_factory(formatter)
+
+    logger.info("*" * 100)
+    logger.info("short")
+
+    stats = formatter.stats()
+    assert stats["truncations"] == {"message": 1}
+    assert stats["stages"]["message"]["calls"] == 2
+    assert stats["stages"]["serialization"]["calls"] == 2
+    assert stats["stages"]["timestamp"]["calls"] == 0  # Not referenced by the format string
+
+
+def test_output_units():
+    formatter = JsonLogFormatter(collect_stats=True)
+    record = logging.makeLogRecord({"msg": "héllo world!"})
+
+    text = formatter.format(record)
+    data = formatter.format_bytes(record)
+    batch = formatter.format_batch([record, record])
+
+    stats = formatter.stats()
+    assert stats["stages"]["format"]["calls"] == 1
+    assert stats["stages"]["format_bytes"]["calls"] == 1
+    assert stats["stages"]["format_batch"]["calls"] == 1
+    assert stats["output_characters"] == len(text)
+    assert stats["output_bytes"] == len(data) + len(batch)
+
+
+def test_stats_merged_across_threads():
+    formatter = JsonLogFormatter([ExtraProvider()], message_size_limit=20, collect_stats=True)
+    logger, _ = logger_factory(formatter)
+
+    def emit() -> None:
+        for _ in range(10):
+            logger.info("*" * 100)
+
+    threads = [threading.Thread(target=emit) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    emit()  # After the threads are gone, so their stats are merged
+
+    stats = formatter.stats()
+    assert stats["stages"]["format"]["calls"] == 50
+    assert stats["stages"]["provider:0:ExtraProvider"]["calls"] == 50
+    assert stats["truncations"] == {"message": 50}
+    assert stats["formatter_errors"] == 50
+    assert len(formatter.stats_collector._threads) == 1  # type: ignore[union-attr]
+
+
+def test_compile_does_not_wrap_twice():
+    formatter = JsonLogFormatter([ExtraProvider()], collect_stats=True)
+    formatter.compile()
+    logger, _ = logger_factory(formatter)
+
+    logger.info("hello world!")
+
+    assert formatter.stats()["stages"]["format"]["calls"] == 1
+
+
+def test_render_prometheus():
+    formatter = JsonLogFormatter([ExtraProvider()], message_size_limit=20, collect_stats=True)
+    logger, _ = logger_factory(formatter)
+
+    logger.info("*" * 100)
+
+    text = render_prometheus(formatter.stats())
+    assert "# TYPE dans_log_formatter_stage_seconds histogram" in text
+    assert 'dans_log_formatter_stage_calls_total{stage="provider:0:ExtraProvider"} 1' in text
+    assert 'dans_log_formatter_stage_seconds_bucket{stage="format",le="+Inf"} 1' in text
+    assert 'dans_log_formatter_stage_seconds_count{stage="format"} 1' in text
+    assert 'dans_log_formatter_truncations_total{attribute="message"} 1' in text
+    assert "dans_log_formatter_formatter_errors_total 1" in text
+    assert "dans_log_formatter_output_characters_total " in text
+    assert "dans_log_formatter_output_bytes_total 0" in text
+    assert text.endswith("\n")
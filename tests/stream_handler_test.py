@@ -0,0 +1,70 @@
+import json
+import logging
+import os
+from io import BytesIO
+
+import pytest
+
+from dans_log_formatter.contrib.orjson import OrJsonLogFormatter
+from dans_log_formatter.contrib.ujson import UJsonLogFormatter
+from dans_log_formatter.formatter import JsonLogFormatter, TextLogFormatter
+from dans_log_formatter.handlers.stream import BytesStreamHandler
+from tests.utils import handler_logger_factory
+
+
+@pytest.mark.parametrize(
+    "formatter",
+    [
+        pytest.param(JsonLogFormatter(), id="json"),
+        pytest.param(UJsonLogFormatter(), id="ujson"),
+        pytest.param(OrJsonLogFormatter(), id="orjson"),
+    ],
+)
+def test_format_bytes(formatter: JsonLogFormatter):
+    record = logging.LogRecord("test", logging.INFO, __file__, 1, "héllo wörld!", None, None)
+
+    result = formatter.format_bytes(record)
+
+    assert isinstance(result, bytes)
+    assert json.loads(result)["message"] == "héllo wörld!"
+    assert result.decode("utf-8") == formatter.format(record)
+
+
+def test_bytes_stream_handler():
+    stream = BytesIO()
+    handler = BytesStreamHandler(stream)
+    handler.setFormatter(OrJsonLogFormatter())
+    logger = handler_logger_factory(handler)
+
+    logger.info("hello world!")
+    logger.info("héllo wörld!")
+
+    lines = stream.getvalue().splitlines()
+    assert len(lines) == 2
+    assert json.loads(lines[0])["message"] == "hello world!"
+    assert json.loads(lines[1])["message"] == "héllo wörld!"
+
+
+def test_bytes_stream_handler_fd():
+    read_fd, write_fd = os.pipe()
+    handler = BytesStreamHandler(write_fd)
+    handler.setFormatter(JsonLogFormatter())
+    logger = handler_logger_factory(handler)
+
+    logger.info("hello world!")
+    os.close(write_fd)
+
+    with os.fdopen(read_fd, "rb") as reader:
+        record = json.loads(reader.readline())
+    assert record["message"] == "hello world!"
+
+
+def test_bytes_stream_handler_text_formatter():
+    stream = BytesIO()
+    handler = BytesStreamHandler(stream)
+    handler.setFormatter(TextLogFormatter("{status} | {message}", style="{"))
+    logger = handler_logger_factory(handler)
+
+    logger.info("hello world!")
+
+    assert stream.getvalue() == b"INFO | hello world!\n"
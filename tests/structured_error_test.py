@@ -0,0 +1,138 @@
+import sys
+
+import pytest
+
+from dans_log_formatter.error_fingerprint import ErrorDeduplicator
+from dans_log_formatter.formatter import JsonLogFormatter, TextLogFormatter
+from dans_log_formatter.structured_error import StructuredErrorFormatter
+from tests.utils import logger_factory, read_stream_log_line
+
+
+def recurse(depth: int):
+    if depth == 0:
+        raise ValueError("Something went wrong")
+    recurse(depth - 1)
+
+
+def test_structured_error():
+    logger, stream = logger_factory(JsonLogFormatter(structured_errors=StructuredErrorFormatter()))
+
+    try:
+        recurse(3)
+    except ValueError:
+        logger.exception("hello world!")
+
+    record = read_stream_log_line(stream)
+    assert "error" not in record
+    assert record["error.kind"] == "ValueError"
+    assert record["error.message"] == "Something went wrong"
+    assert record["error.stack"].startswith("Traceback (most recent call last):\n")
+    assert record["error.stack"].count(", in recurse\n") == 4
+    assert record["error.stack"].endswith("ValueError: Something went wrong")
+
+
+def test_structured_error_frame_limit():
+    logger, stream = logger_factory(JsonLogFormatter(structured_errors=StructuredErrorFormatter(frame_limit=4)))
+
+    try:
+        recurse(100)
+    except ValueError:
+        logger.exception("hello world!")
+
+    stack = read_stream_log_line(stream)["error.stack"]
+    assert stack.count("  File ") == 4
+    assert "  ... 98 frames omitted ...\n" in stack
+    assert 'raise ValueError("Something went wrong")' in stack  # The innermost frames are kept
+    assert "formatter_errors" not in read_stream_log_line(stream)
+
+
+def test_structured_error_size_limit():
+    logger, stream = logger_factory(
+        JsonLogFormatter(structured_errors=StructuredErrorFormatter(), stack_size_limit=500)
+    )
+
+    try:
+        recurse(100)
+    except ValueError:
+        logger.exception("hello world!")
+        logger.exception("hello world!")
+
+    for record in (read_stream_log_line(stream), read_stream_log_line(stream, seek=False)):
+        assert len(record["error.stack"]) == 500
+        assert record["error.stack"].endswith("...[TRUNCATED]")
+        assert "Attribute 'error.stack' value is too long" in record["formatter_errors"]
+
+
+def test_structured_error_chain():
+    logger, stream = logger_factory(JsonLogFormatter(structured_errors=StructuredErrorFormatter(chain_limit=2)))
+
+    try:
+        try:
+            try:
+                recurse(0)
+            except ValueError as e:
+                raise KeyError("first") from e
+        except KeyError:
+            raise RuntimeError("second")  # noqa B904
+    except RuntimeError:
+        logger.exception("hello world!")
+
+    record = read_stream_log_line(stream)
+    assert record["error.kind"] == "RuntimeError"
+    assert record["error.message"] == "second"
+    stack = record["error.stack"]
+    assert "ValueError" not in stack  # Beyond the chain limit
+    assert (
+        stack.index("KeyError: 'first'")
+        < stack.index("During handling of the above exception")
+        < stack.index("RuntimeError: second")
+    )
+
+
+@pytest.mark.skipif(sys.version_info < (3, 11), reason="ExceptionGroup is added in Python 3.11")
+def test_structured_error_group():
+    logger, stream = logger_factory(JsonLogFormatter(structured_errors=StructuredErrorFormatter(chain_limit=2)))
+
+    try:
+        if sys.version_info >= (3, 11):  # Also skipped by the type checkers of older versions
+            raise ExceptionGroup("group", [ValueError("first"), TypeError("second"), KeyError("third")])  # noqa F821
+    except Exception:
+        logger.exception("hello world!")
+
+    record = read_stream_log_line(stream)
+    assert record["error.kind"] == "ExceptionGroup"
+    assert "| ValueError: first\n" in record["error.stack"]
+    assert "| TypeError: second\n" in record["error.stack"]
+    assert record["error.stack"].endswith("| and 1 more exceptions")
+
+
+def test_structured_error_deduplicated():
+    logger, stream = logger_factory(
+        JsonLogFormatter(structured_errors=StructuredErrorFormatter(), error_deduplicator=ErrorDeduplicator())
+    )
+
+    for _ in range(2):
+        try:
+            recurse(0)
+        except ValueError:
+            logger.exception("hello world!")
+
+    first = read_stream_log_line(stream)
+    second = read_stream_log_line(stream, seek=False)
+    assert "error.stack" in first
+    assert "error.stack" not in second
+    assert second["error.kind"] == "ValueError"
+    assert second["error.occurrences"] == 2
+
+
+def test_structured_error_text():
+    formatter = TextLogFormatter("{status} | {message}", style="{", structured_errors=StructuredErrorFormatter())
+    logger, stream = logger_factory(formatter)
+
+    try:
+        recurse(0)
+    except ValueError:
+        logger.exception("hello world!")
+
+    assert stream.getvalue().startswith("ERROR | hello world!\nTraceback (most recent call last):\n")
+    assert stream.getvalue().endswith("\nValueError: Something went wrong\n")
@@ -0,0 +1,88 @@
+import logging
+from typing import Literal
+from unittest.mock import patch
+
+import pytest
+
+from dans_log_formatter.formatter import TextLogFormatter
+from dans_log_formatter.providers.context import ContextProvider, inject_log_context
+from dans_log_formatter.providers.extra import ExtraProvider
+from tests.utils import collect_records, logger_factory
+
+
+@pytest.mark.parametrize(
+    "fmt, style",
+    [
+        pytest.param("%(status)s %(user_id)s | %(message)s", "%", id="percent"),
+        pytest.param("{status} {user_id} | {message}", "{", id="format"),
+        pytest.param("$status ${user_id} | $message", "$", id="template"),
+    ],
+)
+def test_text_formatter_styles(fmt: str, style: Literal["%", "{", "$"]):
+    logger, stream = logger_factory(TextLogFormatter(fmt, style=style, providers=[ContextProvider()]))
+
+    with inject_log_context({"user_id": 123}):
+        logger.info("hello %s!", "world")
+
+    assert stream.getvalue() == "INFO 123 | hello world!\n"
+
+
+def test_text_formatter_does_not_modify_record():
+    logger, stream = logger_factory(
+        TextLogFormatter("{asctime} {status} {extra} | {message}", style="{", providers=[ExtraProvider()])
+    )
+    records: list[logging.LogRecord] = []
+    logger.addFilter(collect_records(records))
+
+    logger.info("hello world!", extra={"extra": "value"})
+
+    assert stream.getvalue().endswith(" INFO value | hello world!\n")
+    assert records[0].__dict__.keys() == logging.makeLogRecord({}).__dict__.keys() | {"extra"}
+
+
+def test_text_formatter_computes_referenced_attributes():
+    class CountingFormatter(TextLogFormatter):
+        calls = 0
+
+        def format_location(self, record: logging.LogRecord):
+            CountingFormatter.calls += 1
+            return super().format_location(record)
+
+    logger, stream = logger_factory(CountingFormatter("{status} | {message}", style="{"))
+    logger.info("hello world!")
+
+    assert stream.getvalue() == "INFO | hello world!\n"
+    assert CountingFormatter.calls == 0
+
+
+def test_text_formatter_exception():
+    formatter = TextLogFormatter("{status} | {message}", style="{")
+    logger, stream = logger_factory(formatter)
+
+    with patch.object(formatter, "formatException", wraps=formatter.formatException) as format_exception:
+        try:
+            raise ValueError("Something went wrong")
+        except ValueError:
+            logger.exception("hello world!")
+
+    lines = stream.getvalue().splitlines()
+    assert lines[0] == "ERROR | hello world!"
+    assert lines[1] == "Traceback (most recent call last):"
+    assert lines[-1] == "ValueError: Something went wrong"
+    assert format_exception.call_count == 1
+
+
+def test_text_formatter_not_truncated_by_default():
+    logger, stream = logger_factory(TextLogFormatter("{status} | {message}", style="{"))
+
+    logger.info("*" * 100_000)
+
+    assert stream.getvalue() == f"INFO | {'*' * 100_000}\n"
+
+
+def test_text_formatter_truncated_when_limited():
+    logger, stream = logger_factory(TextLogFormatter("{status} | {message}", style="{", message_size_limit=20))
+
+    logger.info("*" * 100)
+
+    assert stream.getvalue() == "INFO | ******...[TRUNCATED]\n"
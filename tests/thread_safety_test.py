@@ -0,0 +1,164 @@
+import asyncio
+import json
+import logging
+import sys
+import threading
+import time
+from collections.abc import Iterator
+from io import BytesIO
+from logging import LogRecord
+from typing import Any, Optional
+
+import pytest
+
+from dans_log_formatter.error_fingerprint import ErrorDeduplicator
+from dans_log_formatter.formatter import JsonLogFormatter
+from dans_log_formatter.handlers.background import BackgroundStreamHandler
+from dans_log_formatter.providers.abstract import AbstractProvider
+from dans_log_formatter.providers.context import ContextProvider, inject_log_context
+from dans_log_formatter.providers.extra import ExtraProvider
+from dans_log_formatter.providers.runtime import RuntimeProvider
+from tests.utils import handler_logger_factory, logger_factory
+
+THREADS = 16
+TASKS = 50
+RECORDS = 200
+
+
+class InterleavingProvider(AbstractProvider):
+    """Record an error, and yield to other threads before returning, to interleave concurrent format() calls."""
+
+    def get_attributes(self, record: LogRecord) -> Optional[dict[str, Any]]:
+        worker = record.__dict__["worker"]  # From the extra argument
+        self.record_error(f"error of {worker}")
+        time.sleep(0)
+        if worker.endswith("0"):
+            raise ValueError(f"exception of {worker}")
+        return {"provider_worker": worker}
+
+
+@pytest.fixture(autouse=True)
+def frequent_thread_switches() -> Iterator[None]:
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        yield
+    finally:
+        sys.setswitchinterval(interval)
+
+
+def formatter_factory(**kwargs) -> JsonLogFormatter:
+    return JsonLogFormatter([ContextProvider(), ExtraProvider(), RuntimeProvider(), InterleavingProvider()], **kwargs)
+
+
+def assert_isolated(line: dict) -> None:
+    worker = line["worker"]
+    assert line["context_worker"] == worker
+    assert line["message"] == f"hello from {worker}"
+    assert f"error of {worker}" in line["formatter_errors"]
+    assert line["formatter_errors"].count("error of") == 1
+    if worker.endswith("0"):
+        assert f"exception of {worker}" in line["formatter_errors"]
+        assert "provider_worker" not in line
+    else:
+        assert line["provider_worker"] == worker
+        assert "exception of" not in line["formatter_errors"]
+
+
+def emit(logger: logging.Logger, worker: str, count: int) -> None:
+    with inject_log_context({"context_worker": worker}):
+        for _ in range(count):
+            logger.info("hello from %s", worker, extra={"worker": worker})
+
+
+def run_threads(target, count: int) -> None:
+    barrier = threading.Barrier(count)
+
+    def run(index: int) -> None:
+        barrier.wait()
+        target(index)
+
+    threads = [threading.Thread(target=run, args=(index,)) for index in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def test_shared_formatter_threads():
+    formatter = formatter_factory()
+    logger, stream = logger_factory(formatter)
+
+    run_threads(lambda index: emit(logger, f"thread-{index}", RECORDS), THREADS)
+
+    lines = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert len(lines) == THREADS * RECORDS
+    for line in lines:
+        assert_isolated(line)
+    assert len(formatter.recent_errors) == formatter.recent_errors.maxlen
+
+
+def test_shared_formatter_asyncio_tasks():
+    logger, stream = logger_factory(formatter_factory())
+
+    async def task(index: int) -> None:
+        worker = f"task-{index}"
+        with inject_log_context({"context_worker": worker}):
+            for _ in range(RECORDS // 10):
+                logger.info("hello from %s", worker, extra={"worker": worker})
+                await asyncio.sleep(0)
+
+    async def main() -> None:
+        await asyncio.gather(*(task(index) for index in range(TASKS)))
+
+    asyncio.run(main())
+
+    lines = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert len(lines) == TASKS * RECORDS // 10
+    for line in lines:
+        assert_isolated(line)
+
+
+def test_shared_formatter_background_handler():
+    stream = BytesIO()
+    handler = BackgroundStreamHandler(stream, max_queue_size=100)
+    handler.setFormatter(formatter_factory())
+    logger = handler_logger_factory(handler)
+
+    run_threads(lambda index: emit(logger, f"thread-{index}", RECORDS), THREADS)
+    handler.close()
+
+    lines = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert len(lines) == THREADS * RECORDS
+    for line in lines:
+        assert_isolated(line)
+
+
+def test_shared_background_handler_drop_count():
+    stream = BytesIO()
+    handler = BackgroundStreamHandler(stream, max_queue_size=10, overflow="drop")
+    handler.setFormatter(formatter_factory())
+    logger = handler_logger_factory(handler)
+
+    run_threads(lambda index: emit(logger, f"thread-{index}", RECORDS), THREADS)
+    handler.close()
+
+    assert stream.getvalue().count(b"\n") + handler.dropped == THREADS * RECORDS
+
+
+def test_shared_error_deduplicator_threads():
+    deduplicator = ErrorDeduplicator()
+    logger, stream = logger_factory(JsonLogFormatter(error_deduplicator=deduplicator))
+
+    def log_exceptions(_: int) -> None:
+        for _ in range(RECORDS):
+            try:
+                raise ValueError("Something went wrong")
+            except ValueError:
+                logger.exception("hello world!")
+
+    run_threads(log_exceptions, THREADS)
+
+    lines = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert sorted(line["error.occurrences"] for line in lines) == list(range(1, THREADS * RECORDS + 1))
+    assert sum(line["error"].startswith("Traceback") for line in lines) == 1
@@ -0,0 +1,74 @@
+import logging
+import random
+from datetime import datetime, timezone
+
+import pytest
+
+from dans_log_formatter.formatter import JsonLogFormatter, TextLogFormatter
+from dans_log_formatter.timestamp import TimestampFormatter
+from tests.utils import logger_factory, read_stream_log_line
+
+TIMESTAMPS = [1_735_689_600.0, 1_735_689_600.5, 1_735_689_600.9999999, 1_735_689_601.123456] + [
+    random.uniform(0, 2_000_000_000) for _ in range(100)
+]
+
+
+def test_iso():
+    formatter = TimestampFormatter("iso")
+
+    for created in TIMESTAMPS:
+        timestamp = formatter.format(created)
+        assert isinstance(timestamp, str)
+        assert datetime.fromisoformat(timestamp) == datetime.fromtimestamp(created)
+
+
+def test_iso_utc():
+    formatter = TimestampFormatter("iso_utc")
+
+    for created in TIMESTAMPS:
+        result = formatter.format(created)
+        assert isinstance(result, str)
+        assert result.endswith("Z")
+        assert datetime.fromisoformat(result[:-1]).replace(tzinfo=timezone.utc) == datetime.fromtimestamp(
+            created, timezone.utc
+        )
+
+
+def test_cached_second():
+    formatter = TimestampFormatter("iso_utc")
+
+    assert formatter.format(1_735_689_600.25) == "2025-01-01T00:00:00.250000Z"
+    assert formatter.format(1_735_689_600.5) == "2025-01-01T00:00:00.500000Z"
+    assert formatter.format(1_735_689_601.0) == "2025-01-01T00:00:01.000000Z"
+    assert formatter.format(1_735_689_600.75) == "2025-01-01T00:00:00.750000Z"
+
+
+def test_epoch():
+    assert TimestampFormatter("epoch_millis").format(1_735_689_600.123456) == 1_735_689_600_123
+    assert TimestampFormatter("epoch_nanos").format(1_735_689_600.5) == 1_735_689_600_500_000_000
+
+
+def test_unknown_format():
+    with pytest.raises(ValueError, match="Unknown timestamp format"):
+        TimestampFormatter("unknown")  # type: ignore[arg-type]
+
+
+def test_json_formatter_timestamp_format():
+    logger, stream = logger_factory(JsonLogFormatter(timestamp_format="epoch_millis"))
+
+    logger.info("hello world!")
+
+    record = read_stream_log_line(stream)
+    assert isinstance(record["timestamp"], int)
+
+
+@pytest.mark.parametrize("datefmt", [None, "%H:%M:%S", "%Y-%m-%d %H:%M:%S"])
+def test_text_formatter_format_time(datefmt):
+    formatter = TextLogFormatter()
+    vanilla_formatter = logging.Formatter()
+    record = logging.LogRecord("test", logging.INFO, __file__, 1, "hello world!", None, None)
+
+    for created in TIMESTAMPS:
+        record.created = created
+        record.msecs = int((created - int(created)) * 1000) + 0.0
+        assert formatter.formatTime(record, datefmt) == vanilla_formatter.formatTime(record, datefmt)
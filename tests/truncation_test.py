@@ -0,0 +1,132 @@
+import json
+import logging
+
+import pytest
+
+from dans_log_formatter.contrib.orjson import OrJsonLogFormatter
+from dans_log_formatter.contrib.ujson import UJsonLogFormatter
+from dans_log_formatter.formatter import JsonLogFormatter
+from tests.utils import collect_records, logger_factory, read_stream_log_line
+
+
+def test_truncate_bytes():
+    logger, stream = logger_factory(JsonLogFormatter(message_size_limit=50, size_unit="bytes"))
+
+    logger.info("é" * 40)  # 80 bytes in UTF-8
+
+    record = read_stream_log_line(stream)
+    assert record["message"] == "é" * 18 + "...[TRUNCATED]"
+    assert len(record["message"].encode("utf-8")) == 50
+    assert "Attribute 'message' value is too long: 80 (limit: 50)" in record["formatter_errors"]
+
+
+def test_truncate_bytes_utf8_boundary():
+    logger, stream = logger_factory(JsonLogFormatter(message_size_limit=51, size_unit="bytes"))
+
+    logger.info("€" * 40)  # 3 bytes per character
+
+    message = read_stream_log_line(stream)["message"]
+    assert message == "€" * 12 + "...[TRUNCATED]"
+    assert len(message.encode("utf-8")) <= 51
+
+
+@pytest.mark.parametrize("message", ["a" * 50, "é" * 25, "€" * 16 + "ab"])
+def test_truncate_bytes_fits(message: str):
+    logger, stream = logger_factory(JsonLogFormatter(message_size_limit=50, size_unit="bytes"))
+
+    logger.info(message)
+
+    record = read_stream_log_line(stream)
+    assert record["message"] == message
+    assert "formatter_errors" not in record
+
+
+@pytest.mark.parametrize("formatter_class", [JsonLogFormatter, UJsonLogFormatter, OrJsonLogFormatter])
+def test_truncate_bytes_serialized_size(formatter_class: type[JsonLogFormatter]):
+    formatter = formatter_class(message_size_limit=1000, size_unit="bytes")
+    record = logging.makeLogRecord({"msg": "é" * 1000})
+
+    line = formatter.format_bytes(record)
+
+    message = json.loads(line)["message"]
+    assert len(message.encode("utf-8")) <= 1000
+    assert len(line) < 1500  # Not escaped as \u00e9, 6 bytes per character
+    assert formatter.format(record).encode("utf-8") == line
+
+
+def test_truncate_bytes_lone_surrogate():
+    formatter = JsonLogFormatter(size_unit="bytes")
+
+    line = formatter.format_bytes(logging.makeLogRecord({"msg": "caf\udce9"}))
+
+    assert json.loads(line)["message"] == "caf\udce9"
+
+
+def test_truncate_characters():
+    logger, stream = logger_factory(JsonLogFormatter(message_size_limit=50))
+
+    logger.info("é" * 50)
+
+    record = read_stream_log_line(stream)
+    assert record["message"] == "é" * 50
+    assert "formatter_errors" not in record
+
+
+def test_truncate_error_bytes():
+    logger, stream = logger_factory(JsonLogFormatter(stack_size_limit=200, size_unit="bytes"))
+
+    try:
+        raise ValueError("é" * 200)
+    except ValueError:
+        logger.exception("hello world!")
+
+    record = read_stream_log_line(stream)
+    assert len(record["error"].encode("utf-8")) <= 200
+    assert record["error"].endswith("...[TRUNCATED]")
+    assert "Attribute 'error' value is too long" in record["formatter_errors"]
+
+
+def test_bounded_message():
+    logger, stream = logger_factory(JsonLogFormatter(message_size_limit=100, bounded_message=True))
+    records: list[logging.LogRecord] = []
+    logger.addFilter(collect_records(records))
+
+    logger.info("payload %s, %r, %s, %d", "*" * 1_000_000, b"*" * 1_000_000, list(range(1_000_000)), 123)
+
+    record = read_stream_log_line(stream)
+    assert record["message"] == records[0].getMessage()[:86] + "...[TRUNCATED]"
+
+
+def test_bounded_message_mapping():
+    logger, stream = logger_factory(JsonLogFormatter(message_size_limit=100, bounded_message=True))
+
+    logger.info("%(short)s %(long)s", {"short": "hello", "long": "*" * 1_000_000})
+
+    assert read_stream_log_line(stream)["message"] == "hello " + "*" * 80 + "...[TRUNCATED]"
+
+
+def test_bounded_message_argument_at_limit():
+    logger, stream = logger_factory(JsonLogFormatter(message_size_limit=100, bounded_message=True))
+
+    logger.info("%s", "a" * 500)
+
+    record = read_stream_log_line(stream)
+    assert record["message"] == "a" * 86 + "...[TRUNCATED]"
+    assert record["formatter_errors"] == "Attribute 'message' value is too long: 500 (limit: 100)"
+
+
+@pytest.mark.parametrize(
+    "args",
+    [
+        pytest.param(("value", 1, 1.5, None), id="scalars"),
+        pytest.param(([1, 2, 3], {"a": 1}, (1,), {1}), id="containers"),
+        pytest.param((b"bytes", "string"), id="strings"),
+    ],
+)
+def test_bounded_message_small_arguments(args: tuple):
+    logger, stream = logger_factory(JsonLogFormatter(bounded_message=True))
+
+    logger.info(" ".join(["%s"] * len(args)) + " %r", *args, args[0])
+
+    record = logging.makeLogRecord({"msg": " ".join(["%s"] * len(args)) + " %r", "args": (*args, args[0])})
+    assert read_stream_log_line(stream)["message"] == record.getMessage()
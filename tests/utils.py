@@ -1,9 +1,11 @@
 import json
 import logging
-from io import StringIO
-from typing import TextIO
+from io import BytesIO, StringIO
+from typing import IO, Any, Callable
 from uuid import uuid4
 
+from dans_log_formatter.handlers.background import BackgroundStreamHandler
+
 
 def logger_factory(formatter: logging.Formatter) -> tuple[logging.Logger, StringIO]:
     logger = logging.getLogger(str(uuid4()))
@@ -16,7 +18,32 @@ def logger_factory(formatter: logging.Formatter) -> tuple[logging.Logger, String
     return logger, stream
 
 
-def read_stream_log_line(stream: TextIO, *, seek: bool = True) -> dict:
+def handler_logger_factory(handler: logging.Handler) -> logging.Logger:
+    logger = logging.getLogger(str(uuid4()))
+    logger.propagate = False
+    logger.setLevel(logging.DEBUG)
+    logger.addHandler(handler)
+    return logger
+
+
+def background_logger_factory(formatter: logging.Formatter) -> tuple[logging.Logger, BackgroundStreamHandler, BytesIO]:
+    stream = BytesIO()
+    handler = BackgroundStreamHandler(stream)
+    handler.setFormatter(formatter)
+    return handler_logger_factory(handler), handler, stream
+
+
+def collect_records(records: list[logging.LogRecord]) -> Callable[[logging.LogRecord], bool]:
+    """A logger filter appending every record to the list."""
+
+    def collect(record: logging.LogRecord) -> bool:
+        records.append(record)
+        return True
+
+    return collect
+
+
+def read_stream_log_line(stream: IO[Any], *, seek: bool = True) -> dict:
     if seek:
         stream.seek(0)
     line = stream.readline()
@@ -0,0 +1,83 @@
+import json
+
+from dans_log_formatter.formatter import JsonLogFormatter
+from dans_log_formatter.providers.context import ContextProvider, inject_log_context
+from dans_log_formatter.providers.extra import ExtraProvider
+from dans_log_formatter.value_budget import ValueBudget
+from tests.utils import logger_factory, read_stream_log_line
+
+
+class Unbounded(list):
+    """A list that fails when iterated past the first items."""
+
+    def __iter__(self):
+        for index, item in enumerate(super().__iter__()):
+            assert index <= 10, "Iterated past the limit"
+            yield item
+
+
+def test_attribute_size_limit():
+    logger, stream = logger_factory(
+        JsonLogFormatter([ExtraProvider()], value_budget=ValueBudget(attribute_size_limit=100))
+    )
+
+    logger.info("hello world!", extra={"large": "*" * 1_000_000, "small": "value"})
+
+    record = read_stream_log_line(stream)
+    assert record["large"] == "*" * 84 + "...[TRUNCATED]"
+    assert record["small"] == "value"
+    assert "Attribute 'large' value is limited by size" in record["formatter_errors"]
+
+
+def test_nested_limits():
+    logger, stream = logger_factory(
+        JsonLogFormatter([ExtraProvider()], value_budget=ValueBudget(max_depth=2, max_length=3))
+    )
+
+    logger.info(
+        "hello world!",
+        extra={"nested": {"a": {"b": {"c": 1}}, "list": [1, 2, 3, 4, 5]}, "items": Unbounded(range(1_000_000))},
+    )
+
+    record = read_stream_log_line(stream)
+    assert record["nested"] == {"a": {"b": "...[TRUNCATED]"}, "list": [1, 2, 3, "...[2 more items]"]}
+    assert record["items"] == [0, 1, 2, "...[999997 more items]"]
+    assert "Attribute 'nested' value is limited by depth, length" in record["formatter_errors"]
+    assert "Attribute 'items' value is limited by length" in record["formatter_errors"]
+
+
+def test_record_size_limit():
+    logger, stream = logger_factory(
+        JsonLogFormatter([ExtraProvider()], value_budget=ValueBudget(record_size_limit=200))
+    )
+
+    logger.info("hello world!", extra={"first": ["*" * 50] * 3, "second": "*" * 100, "third": 1})
+
+    record = read_stream_log_line(stream)
+    assert record["first"] == ["*" * 50] * 3
+    assert len(json.dumps(record["second"])) < 100
+    assert record["third"] == "...[TRUNCATED]"
+    assert "Attribute 'third' value is dropped" in record["formatter_errors"]
+
+
+def test_within_budget_unchanged():
+    context = {"user": {"id": 123, "roles": ["admin", "user"]}, "request_id": "abc"}
+    logger, stream = logger_factory(JsonLogFormatter([ContextProvider()], value_budget=ValueBudget()))
+
+    with inject_log_context(context):
+        logger.info("hello world!")
+
+    record = read_stream_log_line(stream)
+    assert record["user"] == context["user"]
+    assert record["request_id"] == "abc"
+    assert "formatter_errors" not in record
+
+
+def test_provider_values_not_modified():
+    nested = {"values": list(range(10))}
+    logger, stream = logger_factory(JsonLogFormatter([ExtraProvider()], value_budget=ValueBudget(max_length=2)))
+
+    logger.info("hello world!", extra={"nested": nested})
+
+    assert read_stream_log_line(stream)["nested"] == {"values": [0, 1, "...[8 more items]"]}
+    assert nested == {"values": list(range(10))}